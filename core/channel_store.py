@@ -0,0 +1,424 @@
+import sys
+from array import array
+
+from core.search_index import SearchIndex
+from core.mirror_index import MirrorIndex
+from core.facet_index import FacetIndex, HEALTH, HEALTH_UNCHECKED, HEALTH_ONLINE
+
+# Attributes that have their own column in ChannelStore
+_COLUMN_ATTRIBUTES = ('tvg-id', 'tvg-logo', 'group-title')
+
+# Separates keys and values of rows whose extra attributes are kept packed
+# in a single string (as loaded from the playlist cache)
+EXTRAS_SEPARATOR = '\x01'
+
+# Attribute values up to this length are interned; short values such as
+# tvg-country, tvg-language or catchup repeat across most of a playlist
+_INTERN_MAX_LENGTH = 16
+
+class Channel:
+    """Channel record shared by the parser, the channel lists and saved playlists.
+    
+    Channels read from a ChannelStore remember their row, so the less common
+    M3U attributes (tvg-name, catchup, tvg-shift, ...) are only looked up the
+    first time they are accessed.
+    """
+    
+    __slots__ = ('name', 'url', 'logo', 'group', 'quality', 'tvg_id', '_attributes', '_store', '_row')
+    
+    def __init__(self, name="", url="", logo="", group="", quality="", tvg_id="", attributes=None):
+        self.name = name
+        self.url = url
+        self.logo = logo
+        self.group = group
+        self.quality = quality
+        self.tvg_id = tvg_id
+        self._attributes = attributes
+        self._store = None
+        self._row = -1
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Create a channel from a dictionary produced by to_dict()"""
+        return cls(
+            name=data['name'],
+            url=data['url'],
+            logo=data.get('logo', ''),
+            group=data.get('group', ''),
+            quality=data.get('quality', ''),
+            tvg_id=data.get('tvg_id', ''),
+            attributes=data.get('attributes')
+        )
+    
+    @property
+    def attributes(self):
+        """All M3U attributes of the channel, loaded on first access"""
+        if self._attributes is None:
+            if self._store is not None:
+                self._attributes = self._store.attributes(self._row)
+            else:
+                self._attributes = {}
+        return self._attributes
+    
+    @property
+    def row(self):
+        """Row of the channel in its ChannelStore, or -1 if it has none"""
+        return self._row
+    
+    @property
+    def store(self):
+        """ChannelStore the channel was read from, or None"""
+        return self._store
+    
+    def get(self, key, default=""):
+        """Get a single M3U attribute such as 'tvg-name' or 'catchup'"""
+        return self.attributes.get(key, default)
+    
+    def to_dict(self):
+        """Convert channel to dictionary"""
+        data = {
+            'name': self.name,
+            'url': self.url,
+            'logo': self.logo,
+            'group': self.group,
+            'quality': self.quality,
+            'tvg_id': self.tvg_id
+        }
+        attributes = {key: value for key, value in self.attributes.items()
+                      if key not in _COLUMN_ATTRIBUTES}
+        if attributes:
+            data['attributes'] = attributes
+        return data
+    
+    def __str__(self):
+        return f"{self.name} ({self.group})"
+
+class ChannelStore:
+    """Columnar storage for a channel list.
+    
+    Every field lives in its own parallel list instead of one object or dict
+    per channel. Group names are interned once and referenced by small integer
+    codes, and the less common M3U attributes are kept as compact key/value
+    tuples (or packed strings, unpacked on access). Channel objects are only
+    created when a row is accessed.
+    
+    Stream health columns (status, latency in ms, bitrate hint in kbit/s)
+    are only allocated once the first health check result arrives; rows
+    past their end are unchecked. Likewise the quality labels that saved
+    playlists may carry are only allocated for the first channel that has
+    one; rows past the end of qualities have none.
+    """
+    
+    def __init__(self):
+        self.names = []
+        self.urls = []
+        self.logos = []
+        self.tvg_ids = []
+        self.group_codes = array('I')
+        self.extras = []
+        self.qualities = None  # Quality labels of saved channels, '' if none
+        
+        self.group_names = []
+        self._group_lookup = {}
+        self._groups = None  # Group names in use, built on first use
+        
+        self.health = None  # array('B') of HEALTH_* statuses
+        self.latencies = None  # array('I'), ms
+        self.bitrates = None  # array('I'), kbit/s, 0 if unknown
+        
+        self._search_index = None
+        self._facet_index = None
+        self._mirror_index = None
+    
+    @classmethod
+    def from_channels(cls, channels):
+        """Build a store from an iterable of Channel objects"""
+        store = cls()
+        for channel in channels:
+            store.append_channel(channel)
+        return store
+    
+    def __len__(self):
+        return len(self.urls)
+    
+    def __getitem__(self, row):
+        return self.channel(row)
+    
+    def __iter__(self):
+        for row in range(len(self.urls)):
+            yield self.channel(row)
+    
+    @property
+    def groups(self):
+        """Set of group names present in the store"""
+        if self._groups is None:
+            self._groups = {self.group_names[code] for code in set(self.group_codes)}
+        return self._groups
+    
+    def clear(self):
+        """Remove all channels"""
+        self.__init__()
+    
+    def intern_group(self, group):
+        """Return the integer code for a group name, registering it if new"""
+        code = self._group_lookup.get(group)
+        if code is None:
+            code = len(self.group_names)
+            self.group_names.append(group)
+            self._group_lookup[group] = code
+        return code
+    
+    def append(self, name, url, logo="", group="", tvg_id="", attributes=None, quality=""):
+        """Append a channel and return its row number"""
+        row = len(self.urls)
+        if quality:
+            self._pad_qualities(row)
+            self.qualities.append(sys.intern(quality))
+        self.names.append(name)
+        self.urls.append(url)
+        # Thousands of channels usually share a handful of logo URLs
+        self.logos.append(sys.intern(logo) if logo else "")
+        self.tvg_ids.append(tvg_id)
+        self.group_codes.append(self.intern_group(group))
+        if self._groups is not None:
+            self._groups.add(group)
+        
+        extras = None
+        if attributes:
+            extras = []
+            for key, value in attributes.items():
+                if key not in _COLUMN_ATTRIBUTES:
+                    extras.append(sys.intern(key))
+                    extras.append(sys.intern(value) if len(value) <= _INTERN_MAX_LENGTH else value)
+            extras = tuple(extras) or None
+        self.extras.append(extras)
+        return row
+    
+    def extend(self, other):
+        """Append all rows of another store, keeping their order"""
+        # Translate the other store's group codes into this store's codes
+        remap = [self.intern_group(group) for group in other.group_names]
+        self.names.extend(other.names)
+        self.urls.extend(other.urls)
+        # Stores built in other processes have their own copies of shared strings
+        self.logos.extend(map(sys.intern, other.logos))
+        self.tvg_ids.extend(other.tvg_ids)
+        self.group_codes.extend(array('I', map(remap.__getitem__, other.group_codes)))
+        self.extras.extend(other.extras)
+        self._groups = None
+        if other.qualities:
+            self._pad_qualities(len(self.urls) - len(other))
+            self.qualities.extend(other.qualities)
+    
+    def _pad_qualities(self, rows):
+        """Allocate the quality column and fill it with '' up to rows"""
+        if self.qualities is None:
+            self.qualities = []
+        self.qualities.extend([""] * (rows - len(self.qualities)))
+    
+    def append_channel(self, channel):
+        """Append a Channel object and return its row number"""
+        return self.append(channel.name, channel.url, channel.logo, channel.group,
+                           channel.tvg_id, channel.attributes, channel.quality)
+    
+    def remove(self, row):
+        """Remove a row; rows after it shift down by one"""
+        for column in (self.names, self.urls, self.logos, self.tvg_ids, self.group_codes, self.extras):
+            del column[row]
+        if self.health is not None and row < len(self.health):
+            for column in (self.health, self.latencies, self.bitrates):
+                del column[row]
+        if self.qualities is not None and row < len(self.qualities):
+            del self.qualities[row]
+        self._groups = None
+        for index in (self._search_index, self._facet_index, self._mirror_index):
+            if index is not None:
+                index.remove(row)
+    
+    def find_url(self, url):
+        """Get the first row with the given URL, or -1"""
+        try:
+            return self.urls.index(url)
+        except ValueError:
+            return -1
+    
+    def channel(self, row):
+        """Create a Channel view of a row"""
+        channel = Channel(
+            name=self.names[row],
+            url=self.urls[row],
+            logo=self.logos[row],
+            group=self.group_names[self.group_codes[row]],
+            quality=self.quality_of(row),
+            tvg_id=self.tvg_ids[row]
+        )
+        channel._store = self
+        channel._row = row
+        return channel
+    
+    def group_of(self, row):
+        """Get the group name of a row"""
+        return self.group_names[self.group_codes[row]]
+    
+    def quality_of(self, row):
+        """Get the quality label of a row, '' if it has none"""
+        if self.qualities is None or row >= len(self.qualities):
+            return ""
+        return self.qualities[row]
+    
+    def extra_attributes(self, row):
+        """Get the M3U attributes of a row that have no column of their own"""
+        extras = self.extras[row]
+        if not extras:
+            return {}
+        if isinstance(extras, str):
+            extras = extras.split(EXTRAS_SEPARATOR)
+        return dict(zip(extras[::2], extras[1::2]))
+    
+    def attributes(self, row):
+        """Get all M3U attributes of a row as a dictionary"""
+        attributes = self.extra_attributes(row)
+        if self.tvg_ids[row]:
+            attributes['tvg-id'] = self.tvg_ids[row]
+        if self.logos[row]:
+            attributes['tvg-logo'] = self.logos[row]
+        attributes['group-title'] = self.group_of(row)
+        return attributes
+    
+    def health_of(self, row):
+        """Get (status, latency ms, bitrate kbit/s) of a row from the last health check"""
+        if self.health is None or row >= len(self.health):
+            return HEALTH_UNCHECKED, 0, 0
+        return self.health[row], self.latencies[row], self.bitrates[row]
+    
+    def set_health(self, results):
+        """Store health check results, an iterable of (row, status, latency ms, bitrate kbit/s)"""
+        results = list(results)
+        if not results:
+            return
+        if self.health is None:
+            self.health = array('B')
+            self.latencies = array('I')
+            self.bitrates = array('I')
+        end = max(row for row, _, _, _ in results) + 1
+        if end > len(self.health):
+            padding = end - len(self.health)
+            self.health.extend(array('B', bytes(padding)))
+            self.latencies.extend(array('I', bytes(4 * padding)))
+            self.bitrates.extend(array('I', bytes(4 * padding)))
+        
+        for row, status, latency, bitrate in results:
+            self.health[row] = status
+            self.latencies[row] = latency
+            self.bitrates[row] = bitrate
+        if self._facet_index is not None:
+            self._facet_index.set_values(HEALTH, ((row, status) for row, status, _, _ in results))
+    
+    def sorted_rows(self, rows, key):
+        """Sort rows by 'name', 'latency' (fastest online first) or 'bitrate' (highest first)"""
+        if key == 'name':
+            names = self.names
+            return sorted(rows, key=lambda row: names[row].casefold())
+        if key not in ('latency', 'bitrate'):
+            return list(rows)
+        
+        # Rows that are not online or were never checked come last
+        health = self.health or ()
+        checked = len(health)
+        online = [row for row in rows if row < checked and health[row] == HEALTH_ONLINE]
+        others = [row for row in rows if row >= checked or health[row] != HEALTH_ONLINE]
+        if key == 'latency':
+            online.sort(key=self.latencies.__getitem__)
+        else:
+            online.sort(key=self.bitrates.__getitem__, reverse=True)
+        return online + others
+    
+    def rows_for_group(self, group):
+        """Get the rows that belong to a group, in store order
+        
+        Looked up in the group index of search_index, which the playlist
+        loader fills while parsing.
+        """
+        code = self._group_lookup.get(group)
+        if code is None:
+            return []
+        return self.search_index.rows_for_group(code).tolist()
+    
+    @property
+    def search_index(self):
+        """SearchIndex over the names and groups of the store, created on first use"""
+        if self._search_index is None:
+            self._search_index = SearchIndex(self)
+        return self._search_index
+    
+    @property
+    def facet_index(self):
+        """FacetIndex over the groups, countries, languages, qualities and catch-up of the store"""
+        if self._facet_index is None:
+            self._facet_index = FacetIndex(self)
+        return self._facet_index
+    
+    @property
+    def mirror_index(self):
+        """MirrorIndex grouping the rows of the same channel, created on first use"""
+        if self._mirror_index is None:
+            self._mirror_index = MirrorIndex(self)
+        return self._mirror_index
+    
+    def mirrors(self, channel):
+        """Get the rows holding the same channel as channel (same tvg-id, or same normalized name)"""
+        return self.mirror_index.mirrors(channel.tvg_id, channel.name)
+    
+    def filter(self, selection):
+        """Get the rows matching a {facet: set of values} selection, in store order
+        
+        Facets are named in core.facet_index (GROUP, COUNTRY, LANGUAGE,
+        QUALITY, CATCHUP, HEALTH); a row must have one of the selected values of
+        every facet in selection.
+        """
+        return self.facet_index.filter(selection)
+    
+    def facet_counts(self, selection=None):
+        """Get {facet: {value: number of rows}} for the rows matching selection"""
+        return self.facet_index.counts(selection)
+    
+    def fuzzy_search(self, query, rows=None, limit=None):
+        """Get up to limit rows whose name resembles query, most similar first"""
+        return self.search_index.fuzzy_search(query, rows, limit)
+    
+    def search(self, query, rows=None):
+        """Get the rows whose name or group contains query, ignoring case, accents and diacritics"""
+        return self.search_index.search(query, rows)
+    
+    def memory_footprint(self):
+        """Estimate the memory used by the store, in bytes per column"""
+        footprint = {}
+        columns = {
+            'names': self.names,
+            'urls': self.urls,
+            'logos': self.logos,
+            'tvg_ids': self.tvg_ids,
+            'extras': self.extras,
+            'group_names': self.group_names,
+        }
+        for column, values in columns.items():
+            size = sys.getsizeof(values)
+            seen = set()
+            for value in values:
+                # Interned strings are shared, so count each object once
+                items = value if isinstance(value, tuple) else (value,)
+                if isinstance(value, tuple):
+                    size += sys.getsizeof(value)
+                for item in items:
+                    if item is None or id(item) in seen:
+                        continue
+                    seen.add(id(item))
+                    size += sys.getsizeof(item)
+            footprint[column] = size
+        footprint['group_codes'] = sys.getsizeof(self.group_codes)
+        if self.qualities is not None:
+            footprint['qualities'] = sys.getsizeof(self.qualities)
+        if self.health is not None:
+            footprint['health'] = sum(map(sys.getsizeof, (self.health, self.latencies, self.bitrates)))
+        footprint['total'] = sum(footprint.values())
+        return footprint
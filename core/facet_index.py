@@ -0,0 +1,275 @@
+import re
+import threading
+
+# Facets channels can be filtered by
+GROUP = 'group'
+COUNTRY = 'country'
+LANGUAGE = 'language'
+QUALITY = 'quality'
+CATCHUP = 'catchup'
+HEALTH = 'health'
+FACETS = (GROUP, COUNTRY, LANGUAGE, QUALITY, CATCHUP, HEALTH)
+
+# Quality labels, best first
+QUALITIES = ('4K', 'FHD', 'HD', 'SD')
+
+# Stream health found by the health checker, as stored in ChannelStore.health
+HEALTH_UNCHECKED = 0
+HEALTH_ONLINE = 1
+HEALTH_OFFLINE = 2  # Connection refused, HTTP error or not a stream
+HEALTH_TIMEOUT = 3
+HEALTH_STATUSES = (HEALTH_ONLINE, HEALTH_TIMEOUT, HEALTH_OFFLINE, HEALTH_UNCHECKED)
+
+# Names of the health statuses, to be translated with tr() where they are shown
+HEALTH_TEXTS = {
+    HEALTH_ONLINE: "Online",
+    HEALTH_TIMEOUT: "Timeout",
+    HEALTH_OFFLINE: "Offline",
+    HEALTH_UNCHECKED: "Unchecked"
+}
+
+# Quality markers in channel names ("beIN Sports 1 FHD", "Movies 4K")
+_QUALITY_RE = re.compile(r'\b(4k|uhd|2160p|fhd|1080[pi]?|hd|720p|sd|576[pi]?|480[pi]?)\b', re.IGNORECASE)
+_QUALITY_LABELS = {
+    '4k': '4K', 'uhd': '4K', '2160p': '4K',
+    'fhd': 'FHD', '1080': 'FHD', '1080p': 'FHD', '1080i': 'FHD',
+    'hd': 'HD', '720p': 'HD',
+    'sd': 'SD', '576': 'SD', '576p': 'SD', '576i': 'SD', '480': 'SD', '480p': 'SD', '480i': 'SD'
+}
+
+# Separates the values of multi-valued attributes ("US;CA", "Arabic,English")
+_VALUE_SEPARATOR_RE = re.compile(r'[;,|]')
+
+# M3U attributes the country, language and catch-up facets are read from
+_FACET_ATTRIBUTES = ('tvg-country', 'tvg-language', 'catchup', 'catchup-days', 'tvg-rec', 'timeshift')
+
+# Values of the catchup attribute that mean it is not available
+_NO_CATCHUP = {'', '0', 'no', 'none', 'false', 'disabled'}
+
+# Positions of the set bits of every byte value
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+# Runs of non-zero bytes of a bitset
+_NONZERO_RUN_RE = re.compile(rb'[^\x00]+')
+
+# Number of set bits of an int (int.bit_count() needs Python 3.10)
+_popcount = getattr(int, 'bit_count', None) or (lambda bits: bin(bits).count('1'))
+
+def parse_quality(name):
+    """Get the quality label (4K, FHD, HD or SD) mentioned in a channel name, or ''"""
+    matches = _QUALITY_RE.findall(name)
+    if not matches:
+        return ""
+    # Names mentioning several qualities get the best one
+    return min((_QUALITY_LABELS[match.lower()] for match in matches), key=QUALITIES.index)
+
+def has_catchup(attributes):
+    """Check whether the M3U attributes of a channel offer catch-up (archive) playback"""
+    catchup = attributes.get('catchup')
+    if catchup and catchup.strip().lower() not in _NO_CATCHUP:
+        return True
+    for key in ('catchup-days', 'tvg-rec', 'timeshift'):
+        value = attributes.get(key)
+        if value:
+            try:
+                if float(value) > 0:
+                    return True
+            except ValueError:
+                pass
+    return False
+
+def _split_values(value):
+    """Split a multi-valued attribute into its non-empty values"""
+    return [part.strip() for part in _VALUE_SEPARATOR_RE.split(value) if part.strip()]
+
+def _bits_to_rows(bits, size):
+    """Get the positions of the set bits of a bitset, in ascending order"""
+    data = bits.to_bytes((size + 7) // 8, 'little')
+    rows = []
+    for match in _NONZERO_RUN_RE.finditer(data):
+        base = match.start() * 8
+        for byte in match.group():
+            rows.extend([base + bit for bit in _BYTE_BITS[byte]])
+            base += 8
+    return rows
+
+class FacetIndex:
+    """Bitset index of the facets of a ChannelStore.
+    
+    Every value of every facet (a group, a tvg-country, a tvg-language, the
+    quality saved with the channel or named in its name, catch-up
+    availability, the stream health) has a bitset with one bit per row. A
+    filter is a {facet: set of values} selection: rows must match one of
+    the selected values of every selected facet, so answering it takes one
+    OR per value and one AND per facet, whatever the number of rows. Facet
+    counts are AND and popcount of the same bitsets.
+    
+    The index follows the store as it grows: rows appended since the last
+    update() are indexed on the next update(), filter() or counts(),
+    set_values() moves rows whose stream health changed, and remove()
+    takes out a row removed from the store.
+    """
+    
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.Lock()
+        self._indexed = 0  # Rows [0, _indexed) are in the index
+        
+        self._bits = {facet: {} for facet in FACETS}  # Facet -> value -> bytearray bitset
+        self._ints = {}  # (facet, value) -> bitset as an int, for the current _indexed
+        # Raw country, language and catch-up attributes -> bitsets of their
+        # facet values; playlists repeat a few combinations of them
+        self._attribute_bits = {}
+    
+    def __len__(self):
+        return self._indexed
+    
+    def update(self):
+        """Index the rows appended to the store since the last update"""
+        with self._lock:
+            self._update()
+    
+    def _update(self):
+        """Index the new rows; the lock must be held"""
+        store = self._store
+        end = len(store.group_codes)
+        if end <= self._indexed:
+            return
+        
+        size = (end + 7) // 8
+        for values in self._bits.values():
+            for bits in values.values():
+                bits.extend(bytes(size - len(bits)))
+        
+        group_bits = [self._value_bitset(GROUP, group, size) for group in store.group_names]
+        health_bits = {status: self._value_bitset(HEALTH, status, size) for status in HEALTH_STATUSES}
+        attribute_bits = self._attribute_bits
+        health = store.health if store.health is not None else ()
+        checked = len(health)
+        
+        names = store.names
+        qualities = store.qualities if store.qualities is not None else ()
+        saved = len(qualities)
+        group_codes = store.group_codes
+        for row in range(self._indexed, end):
+            index = row >> 3
+            mask = 1 << (row & 7)
+            
+            group_bits[group_codes[row]][index] |= mask
+            health_bits[health[row] if row < checked else HEALTH_UNCHECKED][index] |= mask
+            quality = parse_quality(qualities[row]) if row < saved and qualities[row] else ""
+            quality = quality or parse_quality(names[row])
+            if quality:
+                self._value_bitset(QUALITY, quality, size)[index] |= mask
+            
+            key = tuple(map(store.extra_attributes(row).get, _FACET_ATTRIBUTES))
+            bitsets = attribute_bits.get(key)
+            if bitsets is None:
+                bitsets = attribute_bits[key] = self._attribute_bitsets(key, size)
+            for bits in bitsets:
+                bits[index] |= mask
+        
+        self._indexed = end
+        self._ints.clear()
+    
+    def _attribute_bitsets(self, key, size):
+        """Get the bitsets of the country, language and catch-up values of raw attributes
+        
+        key holds the values of _FACET_ATTRIBUTES (None when missing).
+        """
+        attributes = {name: value for name, value in zip(_FACET_ATTRIBUTES, key) if value is not None}
+        values = [(COUNTRY, country.upper()) for country in _split_values(attributes.get('tvg-country', ''))]
+        values += [(LANGUAGE, language) for language in _split_values(attributes.get('tvg-language', ''))]
+        values.append((CATCHUP, has_catchup(attributes)))
+        return [self._value_bitset(facet, value, size) for facet, value in dict.fromkeys(values)]
+    
+    def _value_bitset(self, facet, value, size):
+        """Get the bytearray bitset of a facet value, creating it if new"""
+        bits = self._bits[facet].get(value)
+        if bits is None:
+            bits = self._bits[facet][value] = bytearray(size)
+        return bits
+    
+    def _value_bits(self, facet, value):
+        """Get the bitset of a facet value as an int"""
+        bits = self._ints.get((facet, value))
+        if bits is None:
+            data = self._bits[facet].get(value)
+            bits = int.from_bytes(data, 'little') if data is not None else 0
+            self._ints[(facet, value)] = bits
+        return bits
+    
+    def _selection_bits(self, selection, skip=None):
+        """Get the bitset of the rows matching selection, ignoring facet skip"""
+        bits = (1 << self._indexed) - 1
+        for facet, values in selection.items():
+            if facet == skip or not values:
+                continue
+            facet_bits = 0
+            for value in values:
+                facet_bits |= self._value_bits(facet, value)
+            bits &= facet_bits
+        return bits
+    
+    def set_values(self, facet, values):
+        """Change the value of rows of a single-valued facet such as HEALTH
+        
+        values is an iterable of (row, new value). Rows not indexed yet are
+        indexed with their value on the next update.
+        """
+        with self._lock:
+            bitsets = self._bits[facet]
+            size = (self._indexed + 7) // 8
+            for row, value in values:
+                if row >= self._indexed:
+                    continue
+                index = row >> 3
+                mask = 1 << (row & 7)
+                for bits in bitsets.values():
+                    bits[index] &= ~mask
+                self._value_bitset(facet, value, size)[index] |= mask
+            for key in [key for key in self._ints if key[0] == facet]:
+                del self._ints[key]
+    
+    def remove(self, row):
+        """Take out a row removed from the store; the rows after it shift down by one"""
+        with self._lock:
+            if row >= self._indexed:
+                return
+            self._indexed -= 1
+            size = (self._indexed + 7) // 8
+            low = (1 << row) - 1
+            for bitsets in self._bits.values():
+                for bits in bitsets.values():
+                    number = int.from_bytes(bits, 'little')
+                    number = (number & low) | (number >> (row + 1) << row)
+                    # In place, as _attribute_bits shares the bitsets
+                    bits[:] = number.to_bytes(size, 'little')
+            self._ints.clear()
+    
+    def values(self, facet):
+        """Get the values of a facet present in the store"""
+        self.update()
+        return list(self._bits[facet])
+    
+    def filter(self, selection):
+        """Get the rows matching a {facet: set of values} selection, in store order"""
+        with self._lock:
+            self._update()
+            return _bits_to_rows(self._selection_bits(selection), self._indexed)
+    
+    def counts(self, selection=None):
+        """Get {facet: {value: number of rows}} for the rows matching selection
+        
+        The counts of a facet ignore the values selected in that facet, so
+        they tell how many rows choosing another value would show.
+        """
+        selection = selection or {}
+        with self._lock:
+            self._update()
+            counts = {}
+            for facet in FACETS:
+                bits = self._selection_bits(selection, skip=facet)
+                counts[facet] = {value: _popcount(self._value_bits(facet, value) & bits)
+                                 for value in self._bits[facet]}
+            return counts
@@ -1,8 +1,29 @@
 import os
 import sys
+import codecs
+import threading
 import chardet
 from pathlib import Path
 
+# Byte order marks, longest first so UTF-32 is not mistaken for UTF-16
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Chunk size used while validating UTF-8
+_VALIDATE_CHUNK_SIZE = 1024 * 1024
+
+# Bytes taken from each end of the file for chardet
+ENCODING_SAMPLE_SIZE = 256 * 1024
+
+# Detected encodings keyed by absolute path, valid while (size, mtime) match
+_encoding_cache = {}
+_encoding_cache_lock = threading.Lock()
+
 def normalize_path(file_path):
     """Normalize file path to handle different encodings and formats"""
     try:
@@ -13,14 +34,92 @@ def normalize_path(file_path):
         print(f"Error normalizing path: {e}")
         return file_path
 
+def detect_file_encoding(file_path):
+    """Detect the text encoding of a file without decoding all of it.
+    
+    Works through cheap checks first: a remembered result for the same path,
+    size and mtime, then a byte order mark, then strict UTF-8 validation, and
+    only if all of those fail runs chardet on a sample taken from the start
+    and the end of the file.
+    """
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    
+    with _encoding_cache_lock:
+        cached = _encoding_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    
+    with open(path, 'rb') as f:
+        head = f.read(4)
+        encoding = _encoding_from_bom(head)
+        if not encoding:
+            f.seek(0)
+            if _is_valid_utf8(f):
+                encoding = 'utf-8'
+            else:
+                encoding = _detect_from_sample(f, stat.st_size)
+    
+    with _encoding_cache_lock:
+        _encoding_cache[path] = (key, encoding)
+    return encoding
+
+def _encoding_from_bom(head):
+    """Return the encoding announced by a byte order mark, if any"""
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+def _is_valid_utf8(f):
+    """Check that a binary stream decodes as strict UTF-8"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        for chunk in iter(lambda: f.read(_VALIDATE_CHUNK_SIZE), b''):
+            decoder.decode(chunk)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+def _detect_from_sample(f, size):
+    """Run chardet on the first and last ENCODING_SAMPLE_SIZE bytes"""
+    f.seek(0)
+    if size <= 2 * ENCODING_SAMPLE_SIZE:
+        sample = f.read()
+    else:
+        sample = f.read(ENCODING_SAMPLE_SIZE)
+        f.seek(size - ENCODING_SAMPLE_SIZE)
+        sample += b'\n' + f.read(ENCODING_SAMPLE_SIZE)
+    
+    result = chardet.detect(sample)
+    return result['encoding'] or 'utf-8'
+
+def detect_bytes_encoding(sample):
+    """Detect the encoding of a stream from its first bytes.
+    
+    Uses the same order of checks as detect_file_encoding(); a multi-byte
+    character cut off at the end of the sample does not count as invalid UTF-8.
+    """
+    encoding = _encoding_from_bom(sample)
+    if encoding:
+        return encoding
+    
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    
+    result = chardet.detect(sample)
+    return result['encoding'] or 'utf-8'
+
 def read_file_with_auto_encoding(file_path):
     """Read a file with automatic encoding detection"""
     try:
         # First detect the encoding
-        with open(file_path, 'rb') as f:
-            raw_data = f.read()
-            result = chardet.detect(raw_data)
-            encoding = result['encoding'] or 'utf-8'
+        encoding = detect_file_encoding(file_path)
         
         # Then read with detected encoding
         with open(file_path, 'r', encoding=encoding) as f:
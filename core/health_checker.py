@@ -0,0 +1,244 @@
+import re
+import threading
+from collections import deque, Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from core.facet_index import HEALTH_ONLINE, HEALTH_OFFLINE, HEALTH_TIMEOUT, HEALTH_UNCHECKED
+from core.playback_profiles import HLS, stream_type
+
+# Bytes of a response read to recognise an HLS manifest
+MANIFEST_BYTES = 64 * 1024
+
+# HTTP statuses of servers that refuse HEAD but may serve GET
+_HEAD_REJECTED = {400, 403, 405, 501}
+
+_BANDWIDTH_RE = re.compile(r'#EXT-X-STREAM-INF:[^\n]*?\bBANDWIDTH=(\d+)')
+_SEGMENT_RE = re.compile(r'#EXTINF:\s*([\d.]+)[^\n]*\n(?:#[^\n]*\n)*([^#\s][^\n]*)')
+
+def probe(session, url, timeout=(5, 5)):
+    """Check whether a stream URL answers; returns (status, latency ms, bitrate kbit/s)
+    
+    HTTP URLs get a HEAD request, or a partial GET when HEAD is refused or
+    the URL is an HLS manifest, which is read to make sure it is one and to
+    find a bitrate hint. Other schemes (UDP, RTMP, ...) cannot be checked
+    over HTTP and stay unchecked. latency is the time to the response
+    headers; bitrate is 0 when unknown.
+    """
+    if urlparse(url).scheme.lower() not in ('http', 'https'):
+        return HEALTH_UNCHECKED, 0, 0
+    
+    try:
+        if stream_type(url) != HLS:
+            response = session.head(url, timeout=timeout, allow_redirects=True)
+            response.close()
+            if response.status_code not in _HEAD_REJECTED and not _is_manifest_type(response):
+                status = HEALTH_ONLINE if response.status_code < 400 else HEALTH_OFFLINE
+                return status, _latency(response), _header_bitrate(response.headers)
+        
+        response = session.get(url, timeout=timeout, stream=True,
+                               headers={'Range': f'bytes=0-{MANIFEST_BYTES - 1}'})
+        try:
+            latency = _latency(response)
+            if response.status_code >= 400:
+                return HEALTH_OFFLINE, latency, 0
+            start = response.raw.read(MANIFEST_BYTES, decode_content=True)
+        finally:
+            response.close()
+    except requests.Timeout:
+        return HEALTH_TIMEOUT, 0, 0
+    except (requests.RequestException, OSError):
+        return HEALTH_OFFLINE, 0, 0
+    
+    if start.lstrip(b'\xef\xbb\xbf \r\n\t').startswith(b'#EXTM3U'):
+        return _probe_manifest(session, response.url, start.decode('utf-8', 'replace'), timeout, latency)
+    if stream_type(url) == HLS or _is_manifest_type(response):
+        # Answers, but with an error page instead of a playlist
+        return HEALTH_OFFLINE, latency, 0
+    return HEALTH_ONLINE, latency, _header_bitrate(response.headers)
+
+def _probe_manifest(session, url, text, timeout, latency):
+    """Get the result of an HLS manifest from its variant bandwidths or first segment"""
+    bandwidths = [int(bandwidth) for bandwidth in _BANDWIDTH_RE.findall(text)]
+    if bandwidths:
+        # Master playlist: players pick the best variant the network allows
+        return HEALTH_ONLINE, latency, max(bandwidths) // 1000
+    
+    segment = _SEGMENT_RE.search(text)
+    if segment is None:
+        return HEALTH_OFFLINE, latency, 0
+    duration = float(segment.group(1))
+    bitrate = 0
+    try:
+        response = session.head(urljoin(url, segment.group(2).strip()), timeout=timeout, allow_redirects=True)
+        response.close()
+        size = int(response.headers.get('Content-Length', 0))
+        if response.status_code < 400 and size and duration > 0:
+            bitrate = int(size * 8 / duration / 1000)
+    except (requests.RequestException, OSError, ValueError):
+        pass
+    return HEALTH_ONLINE, latency, bitrate
+
+def _is_manifest_type(response):
+    """Check whether a response announces an HLS manifest"""
+    return 'mpegurl' in response.headers.get('Content-Type', '').lower()
+
+def _header_bitrate(headers):
+    """Get the bitrate announced by a streaming server (Icecast/SHOUTcast icy-br), or 0"""
+    try:
+        return int(headers.get('icy-br', '0').split(',')[0])
+    except ValueError:
+        return 0
+
+def _latency(response):
+    """Get the time from sending a request to its response headers, in ms"""
+    return int(response.elapsed.total_seconds() * 1000)
+
+class HealthChecker(QObject):
+    """Checks whether the streams of a channel list are alive.
+    
+    Probes (see probe()) run on a pool of worker threads, at most
+    PER_HOST_LIMIT at a time per host, since most playlists come from a
+    handful of providers that refuse or throttle many parallel connections.
+    Hosts take turns for the free workers, so a large provider does not
+    hold up the others.
+    
+    Results are delivered on the GUI thread in batches every
+    BATCH_INTERVAL ms as lists of (row, status, latency ms, bitrate
+    kbit/s), ready for ChannelStore.set_health().
+    """
+    
+    # Signals
+    results_ready = pyqtSignal(object)  # list of (row, status, latency, bitrate)
+    progress = pyqtSignal(int, int)  # rows checked, rows to check
+    finished = pyqtSignal()
+    
+    MAX_WORKERS = 16
+    PER_HOST_LIMIT = 4
+    
+    CONNECT_TIMEOUT = 5
+    READ_TIMEOUT = 5
+    
+    BATCH_INTERVAL = 250  # ms
+    
+    def __init__(self, max_workers=None, per_host_limit=None, timeout=None, parent=None):
+        super().__init__(parent)
+        
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.per_host_limit = per_host_limit or self.PER_HOST_LIMIT
+        self.timeout = timeout or (self.CONNECT_TIMEOUT, self.READ_TIMEOUT)
+        
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="health-check")
+        
+        self._lock = threading.Lock()
+        self._generation = 0  # Incremented by every check() or cancel()
+        self._queues = {}  # Host -> deque of (row, url) waiting
+        self._hosts = deque()  # Hosts with waiting rows, in turn order
+        self._active = Counter()  # Host -> probes running
+        self._running = 0
+        self._results = []  # Results not delivered yet
+        self._done = 0
+        self._total = 0
+        
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.BATCH_INTERVAL)
+        self._timer.timeout.connect(self._deliver)
+    
+    def check(self, store, rows=None):
+        """Check the URLs of the given rows of a ChannelStore (all rows when None)"""
+        rows = range(len(store)) if rows is None else rows
+        urls = store.urls
+        with self._lock:
+            self._generation += 1
+            self._queues = {}
+            self._hosts = deque()
+            self._results = []
+            self._done = 0
+            self._total = 0
+            for row in rows:
+                host = urlparse(urls[row]).netloc.lower()
+                queue = self._queues.get(host)
+                if queue is None:
+                    queue = self._queues[host] = deque()
+                    self._hosts.append(host)
+                queue.append((row, urls[row]))
+                self._total += 1
+            self._dispatch()
+        self._timer.start()
+    
+    def cancel(self):
+        """Stop checking; probes already running finish but are not reported"""
+        with self._lock:
+            self._generation += 1
+            self._queues = {}
+            self._hosts = deque()
+            self._results = []
+        self._timer.stop()
+    
+    def is_running(self):
+        """Check whether a check is in progress"""
+        return self._timer.isActive()
+    
+    def shutdown(self):
+        """Stop the worker threads"""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
+    
+    def _dispatch(self):
+        """Start waiting probes while workers and host slots are free; the lock must be held"""
+        skipped = 0
+        while self._hosts and self._running < self.max_workers and skipped < len(self._hosts):
+            host = self._hosts[0]
+            self._hosts.rotate(-1)
+            if self._active[host] >= self.per_host_limit:
+                skipped += 1
+                continue
+            skipped = 0
+            
+            queue = self._queues[host]
+            row, url = queue.popleft()
+            if not queue:
+                del self._queues[host]
+                self._hosts.remove(host)
+            self._active[host] += 1
+            self._running += 1
+            self._executor.submit(self._probe, self._generation, host, row, url)
+    
+    def _probe(self, generation, host, row, url):
+        """Probe one URL, then start the next waiting probe (worker thread)"""
+        try:
+            result = probe(self._session, url, self.timeout)
+        except Exception as e:
+            print(f"Error checking {url}: {e}")
+            result = (HEALTH_OFFLINE, 0, 0)
+        
+        with self._lock:
+            self._active[host] -= 1
+            self._running -= 1
+            if generation == self._generation:
+                self._results.append((row,) + result)
+                self._done += 1
+            # The freed worker may be all a newer check is waiting for
+            self._dispatch()
+    
+    def _deliver(self):
+        """Emit the results gathered since the last batch (GUI thread)"""
+        with self._lock:
+            results, self._results = self._results, []
+            done, total = self._done, self._total
+            finished = not self._hosts and self._running == 0 and done == total
+        
+        if results:
+            self.results_ready.emit(results)
+            self.progress.emit(done, total)
+        if finished:
+            self._timer.stop()
+            self.finished.emit()
@@ -39,8 +39,32 @@ _translations = {
     "ar": {
         "Modern IPTV Player": "مشغل IPTV الحديث",
         "Search channels...": "بحث عن القنوات...",
+        "Fuzzy": "تقريبي",
+        "Rank channels by similarity, tolerating typos": "ترتيب القنوات حسب التشابه مع تجاوز الأخطاء الإملائية",
         "All Channels": "كل القنوات",
         "Category:": "التصنيف:",
+        "Country:": "الدولة:",
+        "Language:": "اللغة:",
+        "Quality:": "الجودة:",
+        "Catch-up": "إعادة المشاهدة",
+        "Catch-up ({count})": "إعادة المشاهدة ({count})",
+        "Status:": "الحالة:",
+        "Group:": "المجموعة:",
+        "Unknown": "غير معروف",
+        "Sort:": "الترتيب:",
+        "Playlist order": "ترتيب القائمة",
+        "Response time": "زمن الاستجابة",
+        "Bitrate": "معدل البت",
+        "Check Streams": "فحص البث",
+        "Check which channels are online": "التحقق من القنوات التي تعمل",
+        "Stop Checking": "إيقاف الفحص",
+        "Checking {count} channels...": "جاري فحص {count} قناة...",
+        "Checked {done} of {total} channels": "تم فحص {done} من {total} قناة",
+        "{online} of {total} channels online": "{online} من {total} قناة تعمل",
+        "Online": "يعمل",
+        "Offline": "متوقف",
+        "Timeout": "انتهت المهلة",
+        "Unchecked": "لم يُفحص",
         "All": "الكل",
         "Ready": "جاهز",
         "&File": "&ملف",
@@ -50,6 +74,27 @@ _translations = {
         "&Playback": "&تشغيل",
         "&Play/Pause": "&تشغيل/إيقاف مؤقت",
         "&Stop": "إي&قاف",
+        "&Next Channel": "القناة ال&تالية",
+        "P&revious Channel": "القناة ال&سابقة",
+        "&Last Channel": "آ&خر قناة",
+        "Fast Zapping": "التنقل السريع بين القنوات",
+        "Off": "إيقاف",
+        "{count} standby channels": "{count} قنوات جاهزة مسبقًا",
+        "Playback Profile": "وضع التشغيل",
+        "Automatic": "تلقائي",
+        "Low latency": "تأخير منخفض",
+        "Smooth": "سلس",
+        "First frame after {seconds:.2f} s ({profile})": "أول إطار بعد {seconds:.2f} ثانية ({profile})",
+        "Show &Statistics": "عرض الإ&حصائيات",
+        "Waiting for statistics...": "في انتظار الإحصائيات...",
+        "Input: {kbps:.0f} kb/s  Demux: {demux:.0f} kb/s": "الإدخال: {kbps:.0f} ك.ب/ث  الفك: {demux:.0f} ك.ب/ث",
+        "Frames: {decoded} decoded, {lost} lost": "الإطارات: {decoded} مفكوكة، {lost} مفقودة",
+        "Audio buffers lost: {lost}": "مخازن الصوت المفقودة: {lost}",
+        "Start: {milestones}": "البدء: {milestones}",
+        "Rebuffering: {count}": "إعادة التخزين المؤقت: {count}",
+        "Stalls: {stalls}  Recovered: {recoveries}  Reconnects: {reconnects}": "التوقفات: {stalls}  الاستعادات: {recoveries}  إعادات الاتصال: {reconnects}",
+        "Reconnecting in {seconds} s (attempt {attempt})": "إعادة الاتصال خلال {seconds} ث (المحاولة {attempt})",
+        "Recovered after {seconds:.1f} s": "تمت الاستعادة بعد {seconds:.1f} ث",
         "&Settings": "الإ&عدادات",
         "Language": "اللغة",
         "English": "English",
@@ -65,9 +110,19 @@ _translations = {
         "Add to Playlist": "إضافة إلى قائمة التشغيل",
         "No channel selected": "لم يتم اختيار قناة",
         "Playing: {channel_name}": "يتم تشغيل: {channel_name}",
+        "Stream failed, trying another source: {channel_name}": "فشل البث، جارٍ تجربة مصدر آخر: {channel_name}",
+        "Opening...": "جاري الفتح...",
+        "Buffering {percent}%": "جاري التخزين المؤقت {percent}%",
+        "Playing": "قيد التشغيل",
+        "Paused": "متوقف مؤقتًا",
+        "Stopped": "متوقف",
+        "Ended": "انتهى",
         "Loading playlist: {file_path}...": "جاري تحميل قائمة التشغيل: {file_path}...",
         "Loading playlist from URL...": "جاري تحميل قائمة التشغيل من الرابط...",
         "Loaded {count} channels": "تم تحميل {count} قناة",
+        "Loading... {count} channels": "جاري التحميل... {count} قناة",
+        "Loading cancelled after {count} channels": "تم إلغاء التحميل بعد {count} قناة",
+        "Cancelling...": "جاري الإلغاء...",
         "Error": "خطأ",
         "Failed to load playlist": "فشل تحميل قائمة التشغيل",
         "Failed to load playlist from URL": "فشل تحميل قائمة التشغيل من الرابط",
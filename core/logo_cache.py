@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+class LogoMemoryCache:
+    """Least recently used cache of logo pixmaps with a byte budget.
+    
+    Holds the scaled QPixmaps shown in channel lists. Pixmaps may only be
+    used on the GUI thread, so the cache is not locked.
+    """
+    
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._pixmaps = OrderedDict()
+    
+    @staticmethod
+    def _cost(pixmap):
+        """Estimate the memory used by a pixmap, in bytes"""
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+    
+    def __contains__(self, key):
+        return key in self._pixmaps
+    
+    def __len__(self):
+        return len(self._pixmaps)
+    
+    def get(self, key):
+        """Get a cached pixmap and mark it recently used, or None"""
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+        return pixmap
+    
+    def put(self, key, pixmap):
+        """Add a pixmap, evicting the least recently used ones over budget"""
+        old = self._pixmaps.pop(key, None)
+        if old is not None:
+            self.size -= self._cost(old)
+        self._pixmaps[key] = pixmap
+        self.size += self._cost(pixmap)
+        
+        while self.size > self.max_bytes and len(self._pixmaps) > 1:
+            _, evicted = self._pixmaps.popitem(last=False)
+            self.size -= self._cost(evicted)
+    
+    def clear(self):
+        """Remove all pixmaps"""
+        self._pixmaps.clear()
+        self.size = 0
+
+class LogoDiskCache:
+    """On-disk store of scaled logo thumbnails.
+    
+    Thumbnails are stored once per content hash under blobs/, so logo URLs
+    that serve the same image share a file. Each URL has a small JSON entry
+    under urls/ pointing at its thumbnail, together with the server's
+    ETag/Last-Modified and the time it was last checked. Entries younger
+    than max_age are used without contacting the server; older ones are
+    revalidated with a conditional request.
+    
+    The least recently used thumbnails are removed once the store grows
+    past max_bytes, along with the URL entries pointing at them. Safe to
+    use from several threads.
+    """
+    
+    THUMBNAIL_SUFFIX = '.png'
+    
+    def __init__(self, cache_dir=os.path.join("cache", "logos"), max_bytes=64 * 1024 * 1024,
+                 max_age=24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        
+        self._blob_dir = os.path.join(cache_dir, "blobs")
+        self._url_dir = os.path.join(cache_dir, "urls")
+        self._lock = threading.Lock()
+        self._size = None  # Total size of the thumbnails, computed on first write
+    
+    def _entry_path(self, url):
+        """Get the path of the JSON entry of a URL"""
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self._url_dir, f"{digest}.json")
+    
+    def _blob_path(self, digest):
+        """Get the path of a thumbnail from its content hash"""
+        return os.path.join(self._blob_dir, digest + self.THUMBNAIL_SUFFIX)
+    
+    def load(self, url, size):
+        """Get (thumbnail bytes, entry) for a URL, or (None, None)
+        
+        size is the thumbnail size in pixels; thumbnails cached at another
+        size are ignored.
+        """
+        try:
+            with open(self._entry_path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if entry.get('url') != url or entry.get('size') != size:
+                return None, None
+            
+            path = self._blob_path(entry['digest'])
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Mark the thumbnail as recently used for eviction
+            os.utime(path)
+            return data, entry
+        except (OSError, ValueError, KeyError):
+            return None, None
+    
+    def is_fresh(self, entry):
+        """Check whether an entry can be used without revalidation"""
+        return time.time() - entry.get('checked', 0) < self.max_age
+    
+    @staticmethod
+    def request_headers(entry):
+        """Get conditional request headers to revalidate an entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def save(self, url, size, data, headers):
+        """Store the thumbnail of a URL along with its response validators"""
+        digest = hashlib.sha256(data).hexdigest()
+        entry = {
+            'url': url,
+            'size': size,
+            'digest': digest,
+            'etag': headers.get('ETag', ''),
+            'last_modified': headers.get('Last-Modified', ''),
+            'checked': time.time()
+        }
+        try:
+            os.makedirs(self._blob_dir, exist_ok=True)
+            os.makedirs(self._url_dir, exist_ok=True)
+            
+            path = self._blob_path(digest)
+            added = 0
+            if not os.path.exists(path):
+                self._write(path, data)
+                added = len(data)
+            self._write(self._entry_path(url), json.dumps(entry).encode('utf-8'))
+        except OSError as e:
+            print(f"Error caching logo {url}: {e}")
+            return
+        
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_size()
+            else:
+                self._size += added
+            if self._size > self.max_bytes:
+                self._evict()
+    
+    def revalidated(self, url, entry):
+        """Record that the server confirmed an entry is unchanged"""
+        entry = dict(entry, checked=time.time())
+        try:
+            self._write(self._entry_path(url), json.dumps(entry).encode('utf-8'))
+        except OSError as e:
+            print(f"Error caching logo {url}: {e}")
+    
+    @staticmethod
+    def _write(path, data):
+        """Write a file atomically, so readers never see a partial file"""
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    
+    def _disk_size(self):
+        """Get the total size of the stored thumbnails"""
+        try:
+            with os.scandir(self._blob_dir) as entries:
+                return sum(entry.stat().st_size for entry in entries
+                           if entry.name.endswith(self.THUMBNAIL_SUFFIX))
+        except OSError:
+            return 0
+    
+    def _evict(self):
+        """Remove the least recently used thumbnails until the store is within 90% of the budget"""
+        try:
+            with os.scandir(self._blob_dir) as entries:
+                blobs = [(entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                         for entry in entries if entry.name.endswith(self.THUMBNAIL_SUFFIX)]
+        except OSError:
+            return
+        
+        blobs.sort()
+        target = self.max_bytes * 9 // 10
+        self._size = sum(size for _, size, _ in blobs)
+        removed = False
+        for _, size, path in blobs:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+                removed = True
+            except OSError:
+                pass
+        if removed:
+            self._evict_urls()
+    
+    def _evict_urls(self):
+        """Remove the URL entries whose thumbnail is gone"""
+        try:
+            with os.scandir(self._url_dir) as entries:
+                paths = [entry.path for entry in entries if entry.name.endswith('.json')]
+        except OSError:
+            return
+        
+        for path in paths:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    digest = json.load(f)['digest']
+                if os.path.exists(self._blob_path(digest)):
+                    continue
+            except (OSError, ValueError, KeyError, TypeError):
+                # Unreadable entries are of no use either
+                pass
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def clear(self):
+        """Remove all cached logos"""
+        with self._lock:
+            for directory in (self._blob_dir, self._url_dir):
+                if not os.path.isdir(directory):
+                    continue
+                for name in os.listdir(directory):
+                    os.remove(os.path.join(directory, name))
+            self._size = None
@@ -0,0 +1,202 @@
+import os
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, unquote
+from PyQt6.QtCore import QObject, Qt, QBuffer, QByteArray, QIODevice, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+
+from core.logo_cache import LogoMemoryCache, LogoDiskCache
+
+def _is_temporary(error):
+    """Check whether a logo download failed for a reason that may pass"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        # Missing or forbidden logos stay so; server errors and rate limits pass
+        status = error.response.status_code
+        return status >= 500 or status in (408, 429)
+    if isinstance(error, requests.RequestException):
+        # Timeouts, connection and DNS errors, interrupted downloads; malformed
+        # URLs (InvalidURL, MissingSchema, ...) would fail the same way again
+        return isinstance(error, (requests.ConnectionError, requests.Timeout,
+                                  requests.exceptions.ChunkedEncodingError))
+    # Local files that could not be read
+    return isinstance(error, OSError)
+
+class LogoLoader(QObject):
+    """Loads channel logos on a small pool of worker threads.
+    
+    Logos are fetched over one shared HTTP connection pool (or read from disk
+    for local paths), then decoded and scaled to icon size off the GUI thread.
+    Finished logos are kept in two caches: a LogoMemoryCache of pixmaps,
+    looked up with pixmap(), and a LogoDiskCache of scaled thumbnails, so a
+    playlist opened again shows its logos without downloading them.
+    
+    Only the logos passed to the latest request() call are wanted: queued
+    fetches for logos that scrolled out of view are dropped before they start.
+    
+    Logos that are missing or not images are not requested again. Logos
+    that failed for a reason that may pass (timeouts, connection errors,
+    server errors) are retried once RETRY_DELAY has passed.
+    """
+    
+    # Signals
+    logo_loaded = pyqtSignal(str)  # logo path or URL, now available from pixmap()
+    
+    # Delivers images from the worker threads to the GUI thread
+    _image_ready = pyqtSignal(str, QImage)
+    
+    MAX_WORKERS = 6
+    ICON_SIZE = 24
+    
+    CONNECT_TIMEOUT = 5
+    READ_TIMEOUT = 10
+    
+    # Larger downloads are not logos; stop reading instead of decoding them
+    MAX_LOGO_BYTES = 2 * 1024 * 1024
+    
+    # Seconds before a logo that failed temporarily is requested again
+    RETRY_DELAY = 300
+    
+    def __init__(self, memory_cache=None, disk_cache=None, parent=None):
+        super().__init__(parent)
+        
+        self.memory_cache = memory_cache if memory_cache is not None else LogoMemoryCache()
+        self.disk_cache = disk_cache if disk_cache is not None else LogoDiskCache()
+        self._image_ready.connect(self._on_image_ready)
+        
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.MAX_WORKERS, pool_maxsize=self.MAX_WORKERS)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        
+        self._executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS,
+                                            thread_name_prefix="logo-loader")
+        self._lock = threading.Lock()
+        self._wanted = set()  # Logos requested by the latest request() call
+        self._queued = set()  # Logos submitted to the pool and not finished yet
+        self._failed = {}  # Logos that could not be loaded -> time.monotonic() they may be retried, None for never
+    
+    def pixmap(self, logo):
+        """Get the loaded pixmap of a logo, or None (GUI thread only)"""
+        return self.memory_cache.get(logo)
+    
+    def request(self, logos):
+        """Load the given logos, replacing any earlier request
+        
+        Logos from an earlier call that have not started downloading yet are
+        skipped, so only what is currently on screen keeps the pool busy.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._wanted = set(logos)
+            submit = [logo for logo in self._wanted
+                      if logo and logo not in self._queued and logo not in self.memory_cache
+                      and self._may_retry(logo, now)]
+            self._queued.update(submit)
+        
+        for logo in submit:
+            self._executor.submit(self._load, logo)
+    
+    def shutdown(self):
+        """Stop the worker threads, dropping queued requests"""
+        with self._lock:
+            self._wanted = set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
+    
+    def _may_retry(self, logo, now):
+        """Check whether a logo has not failed, or failed temporarily long enough ago (lock held)"""
+        if logo not in self._failed:
+            return True
+        retry_at = self._failed[logo]
+        if retry_at is None or now < retry_at:
+            return False
+        del self._failed[logo]
+        return True
+    
+    def _on_image_ready(self, logo, image):
+        """Turn a loaded image into a cached pixmap (GUI thread)"""
+        self.memory_cache.put(logo, QPixmap.fromImage(image))
+        self.logo_loaded.emit(logo)
+    
+    def _load(self, logo):
+        """Load one logo from the disk cache, the network or a file (runs on a worker thread)"""
+        with self._lock:
+            if logo not in self._wanted:
+                # Scrolled out of view while queued; may be requested again later
+                self._queued.discard(logo)
+                return
+        
+        image = None
+        retry_at = None
+        try:
+            if urlparse(logo).scheme.lower() in ('http', 'https'):
+                image = self._load_url(logo)
+            else:
+                data = self._read_file(logo)
+                if data:
+                    image = self._scale(QImage.fromData(data))
+        except Exception as e:
+            print(f"Error loading logo {logo}: {e}")
+            if _is_temporary(e):
+                retry_at = time.monotonic() + self.RETRY_DELAY
+        
+        with self._lock:
+            self._queued.discard(logo)
+            if image is None or image.isNull():
+                self._failed[logo] = retry_at
+                return
+        
+        self._image_ready.emit(logo, image)
+    
+    def _load_url(self, url):
+        """Get the scaled image of a remote logo, revalidating the disk cache"""
+        cached, entry = self.disk_cache.load(url, self.ICON_SIZE)
+        if cached is not None and self.disk_cache.is_fresh(entry):
+            return QImage.fromData(cached)
+        
+        headers = self.disk_cache.request_headers(entry) if cached is not None else {}
+        with self._session.get(url, headers=headers, stream=True,
+                               timeout=(self.CONNECT_TIMEOUT, self.READ_TIMEOUT)) as response:
+            if response.status_code == 304 and cached is not None:
+                self.disk_cache.revalidated(url, entry)
+                return QImage.fromData(cached)
+            response.raise_for_status()
+            data = response.raw.read(self.MAX_LOGO_BYTES + 1, decode_content=True)
+            response_headers = response.headers
+        
+        if len(data) > self.MAX_LOGO_BYTES:
+            return None
+        image = self._scale(QImage.fromData(data))
+        if not image.isNull():
+            self.disk_cache.save(url, self.ICON_SIZE, self._encode(image), response_headers)
+        return image
+    
+    def _scale(self, image):
+        """Scale an image down to icon size"""
+        if image.isNull():
+            return image
+        return image.scaled(self.ICON_SIZE, self.ICON_SIZE,
+                            Qt.AspectRatioMode.KeepAspectRatio,
+                            Qt.TransformationMode.SmoothTransformation)
+    
+    @staticmethod
+    def _encode(image):
+        """Encode a thumbnail as PNG"""
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        image.save(buffer, "PNG")
+        buffer.close()
+        return bytes(data)
+    
+    def _read_file(self, logo):
+        """Get the raw bytes of a local logo file"""
+        scheme = urlparse(logo).scheme.lower()
+        path = unquote(urlparse(logo).path) if scheme == 'file' else logo
+        if not os.path.isfile(path) or os.path.getsize(path) > self.MAX_LOGO_BYTES:
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
@@ -1,131 +1,385 @@
 import os
 import re
+import mmap
+import codecs
+import itertools
+import multiprocessing
 import requests
-from urllib.parse import unquote
-import urllib.request
-import chardet
+from concurrent.futures import ProcessPoolExecutor
+from core.file_utils import detect_file_encoding, detect_bytes_encoding
+from core.channel_store import Channel, ChannelStore
 
-class Channel:
-    def __init__(self, name="", url="", logo="", group="", quality=""):
-        self.name = name
-        self.url = url
-        self.logo = logo
-        self.group = group
-        self.quality = quality
-        
-    def __str__(self):
-        return f"{self.name} ({self.group})"
+# Duration that follows "#EXTINF:"
+_EXTINF_DURATION_RE = re.compile(r'\s*(-?\d+(?:\.\d+)?)')
+
+# One token of the rest of an #EXTINF line: a key="value" (or bare key=value)
+# attribute, or the ",Display Name" that ends the line
+_EXTINF_TOKEN_RE = re.compile(r'([\w-]+)=(?:"([^"]*)"|([^\s",]*))|,(.*)')
+
+def parse_extinf(line):
+    """Tokenize an #EXTINF line in a single scan.
+    
+    Returns a (duration, attributes, name) tuple, where attributes holds every
+    key="value" pair found on the line (tvg-id, tvg-name, tvg-logo, tvg-chno,
+    group-title, catchup, tvg-shift, ...), or None if the line is malformed.
+    """
+    match = _EXTINF_DURATION_RE.match(line, 8)
+    if not match:
+        return None
+    
+    attributes = {}
+    name = ""
+    for key, quoted, bare, title in _EXTINF_TOKEN_RE.findall(line, match.end()):
+        if key:
+            attributes[key] = quoted or bare
+        else:
+            name = title.strip()
+    
+    return match.group(1), attributes, name
+
+def _parse_entries(lines, store):
+    """Parse #EXTINF/URL pairs from lines into store, yielding each new row"""
+    channel = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith('#EXTINF:'):
+            # Extract channel info
+            try:
+                parsed = parse_extinf(line)
+                if parsed:
+                    duration, attributes, name = parsed
+                    channel = (name or "Unknown", attributes)
+            except Exception as e:
+                print(f"Error parsing EXTINF line: {e}")
+                channel = None
+
+        elif not line.startswith('#') and channel:
+            # This is a URL line
+            name, attributes = channel
+            yield store.append(
+                name,
+                line,
+                logo=attributes.get('tvg-logo', ""),
+                group=attributes.get('group-title', "Unknown"),
+                tvg_id=attributes.get('tvg-id', ""),
+                attributes=attributes
+            )
+            channel = None
+
+def _parse_chunk(file_path, start, end, encoding):
+    """Parse one byte range of an M3U file into its own ChannelStore.
+    
+    Runs in a worker process; the range must begin at an #EXTINF line (or at
+    the start of the file) so that no entry is split between two chunks.
+    """
+    store = ChannelStore()
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = mm[start:end].decode(encoding)
+    # Split like the serial parser's text mode files, which end lines at
+    # \n, \r\n and \r only (splitlines() would also split at \x0b, \x85, ...)
+    lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    for _ in _parse_entries(lines, store):
+        pass
+    return store
 
 class M3UParser:
     """Parser for M3U playlist files"""
     
-    def __init__(self):
-        self.channels = []
-        self.groups = set()
+    # Files smaller than this are always parsed serially, since starting the
+    # worker processes would take longer than the parse itself
+    PARALLEL_MIN_SIZE = 32 * 1024 * 1024
+    
+    # Lower bound for the byte ranges handed to each worker process
+    PARALLEL_CHUNK_SIZE = 8 * 1024 * 1024
+    
+    # Timeouts in seconds for establishing a connection and between received bytes
+    CONNECT_TIMEOUT = 10
+    READ_TIMEOUT = 30
     
-    def load_from_file(self, file_path):
-        """Load M3U playlist from a file"""
+    # Size of the (decompressed) chunks read from a playlist download
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
+    
+    def __init__(self, cache=None):
+        self.channels = ChannelStore()
+        # Optional PlaylistCache used to skip re-parsing unchanged playlists
+        self.cache = cache
+    
+    @property
+    def groups(self):
+        """Set of group names in the loaded playlist"""
+        return self.channels.groups
+    
+    def load_from_file(self, file_path, parallel=False):
+        """Load M3U playlist from a file
+        
+        With parallel=True, large files are split and parsed on all CPU cores;
+        small files and encodings that cannot be split safely use the serial
+        parser. The channels are left unchanged if the file cannot be loaded.
+        """
+        previous = self.channels
         try:
-            # Detect file encoding to properly handle Arabic and other non-ASCII characters
-            with open(file_path, 'rb') as f:
-                raw_data = f.read()
-                result = chardet.detect(raw_data)
-                encoding = result['encoding']
-            
-            with open(file_path, 'r', encoding=encoding) as f:
-                content = f.read()
-            
-            return self._parse_content(content)
+            for _ in self.iter_file_rows(file_path, parallel=parallel):
+                pass
+            return True
         except UnicodeDecodeError as e:
             print(f"Unicode decode error: {e}. Trying with UTF-8...")
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                return self._parse_content(content)
+                for _ in self.iter_file_rows(file_path, encoding='utf-8'):
+                    pass
+                return True
             except Exception as e:
                 print(f"Failed to load playlist: {e}")
-                return False
         except Exception as e:
             print(f"Error loading playlist {file_path}: {e}")
+        # Parsing fills a new store; drop it and keep the last playlist loaded
+        self.channels = previous
+        return False
+    
+    def _load_cached_file(self, file_path):
+        """Use the cached parse of a file if it is still current"""
+        if not self.cache:
+            return False
+        cached = self.cache.load_file(file_path)
+        if cached is None:
             return False
+        self.channels = cached
+        return True
+    
+    def _cache_file(self, file_path):
+        """Save the current channels as the cached parse of a file"""
+        if self.cache:
+            self.cache.save_file(file_path, self.channels)
+    
+    def _plan_parallel(self, file_path, max_workers=None):
+        """Get (byte ranges, encoding, workers) to parse a file in worker processes, or None to parse it serially"""
+        size = os.path.getsize(file_path)
+        workers = max_workers or os.cpu_count() or 1
+        if size < self.PARALLEL_MIN_SIZE or workers < 2:
+            return None
+        
+        # Chunks are split at "\n#EXTINF" bytes, which only works for encodings
+        # that keep ASCII as single bytes
+        encoding = detect_file_encoding(file_path)
+        if codecs.lookup(encoding).name.startswith(('utf-16', 'utf-32')):
+            return None
+        
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                header = mm.readline().decode(encoding, errors='replace')
+                if not header.lstrip('\ufeff').strip().startswith('#EXTM3U'):
+                    raise ValueError("Invalid M3U format: Missing #EXTM3U header")
+                ranges = self._split_ranges(mm, size, max(self.PARALLEL_CHUNK_SIZE, size // (workers * 4)))
+        return ranges, encoding, workers
+    
+    def _iter_parallel(self, file_path, ranges, encoding, workers, progress=None):
+        """Parse byte ranges of a file in worker processes into self.channels, yielding each new row
+        
+        The rows of a chunk are yielded as soon as it is merged, so callers
+        can show them and stop between chunks; chunks not started yet are
+        dropped when the generator is closed.
+        """
+        size = ranges[-1][1]
+        self.channels = store = ChannelStore()
+        # Forking the multithreaded GUI process could copy a lock held by
+        # another thread into the workers; spawned workers start clean
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(ranges)),
+                                       mp_context=multiprocessing.get_context('spawn'))
+        try:
+            futures = [executor.submit(_parse_chunk, file_path, start, end, encoding)
+                       for start, end in ranges]
+            # Merge in submission order to keep the playlist order
+            for future, (start, end) in zip(futures, ranges):
+                first = len(store)
+                store.extend(future.result())
+                if progress:
+                    progress(end, size)
+                yield from range(first, len(store))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    @staticmethod
+    def _split_ranges(mm, size, chunk_size):
+        """Split a mapped file into byte ranges that each start at an #EXTINF line"""
+        ranges = []
+        start = 0
+        position = chunk_size
+        while position < size:
+            index = mm.find(b'\n#EXTINF', position)
+            if index < 0:
+                break
+            ranges.append((start, index + 1))
+            start = index + 1
+            position = start + chunk_size
+        ranges.append((start, size))
+        return ranges
+    
+    def iter_file(self, file_path, encoding=None):
+        """Stream channels from an M3U file, yielding each one as it is parsed.
+        
+        The file is decoded incrementally and consumed one line at a time, so
+        peak memory is bounded by the current line plus the channel list
+        instead of by the size of the file.
+        """
+        for row in self.iter_file_rows(file_path, encoding):
+            yield self.channels[row]
+    
+    def iter_file_rows(self, file_path, encoding=None, parallel=False, progress=None):
+        """Stream an M3U file into self.channels, yielding each new row number.
+        
+        parallel and progress behave as in load_from_file() and iter_url().
+        """
+        if self._load_cached_file(file_path):
+            yield from range(len(self.channels))
+            return
+        
+        size = os.path.getsize(file_path)
+        if parallel:
+            parsed = 0
+            try:
+                plan = self._plan_parallel(file_path)
+                if plan is not None:
+                    for row in self._iter_parallel(file_path, *plan, progress=progress):
+                        parsed += 1
+                        yield row
+            except Exception as e:
+                if parsed:
+                    raise
+                print(f"Parallel parse of {file_path} failed, parsing serially: {e}")
+                plan = None
+            if plan is not None:
+                self._cache_file(file_path)
+                return
+        
+        if encoding is None:
+            # Detect file encoding to properly handle Arabic and other non-ASCII characters
+            encoding = detect_file_encoding(file_path)
+        
+        with open(file_path, 'r', encoding=encoding) as f:
+            lines = self._iter_with_progress(f, size, progress) if progress else f
+            yield from self._parse_lines(lines)
+        
+        self._cache_file(file_path)
+    
+    @staticmethod
+    def _iter_with_progress(f, size, progress, every=4096):
+        """Iterate the lines of a text file, reporting the byte position every few lines"""
+        for count, line in enumerate(f):
+            if count % every == 0:
+                progress(f.buffer.tell(), size)
+            yield line
+        progress(size, size)
     
     def load_from_url(self, url):
-        """Load M3U playlist from a URL"""
+        """Load M3U playlist from a URL; the channels are left unchanged if it cannot be loaded"""
+        previous = self.channels
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            content = response.text
-            return self._parse_content(content)
+            for _ in self.iter_url_rows(url):
+                pass
+            return True
         except Exception as e:
             print(f"Error loading playlist from URL {url}: {e}")
+            self.channels = previous
             return False
     
-    def _parse_content(self, content):
-        """Parse M3U playlist content"""
-        lines = content.splitlines()
-        if not lines or not lines[0].strip().startswith('#EXTM3U'):
-            print("Invalid M3U format: Missing #EXTM3U header")
-            return False
+    def iter_url(self, url, progress=None):
+        """Stream channels from a URL, yielding each one while the download continues.
         
-        self.channels = []
-        self.groups = set()
-        
-        channel = None
-        for i in range(1, len(lines)):
-            line = lines[i].strip()
-            if not line:
-                continue
-            
-            if line.startswith('#EXTINF:'):
-                # Extract channel info
-                try:
-                    # Extract duration and attributes
-                    extinf_pattern = r'#EXTINF:(-?\d+)\s*(.*?)(?:,(.*))?$'
-                    match = re.match(extinf_pattern, line)
-                    if match:
-                        duration = match.group(1)
-                        attributes = match.group(2) or ""
-                        name = match.group(3) or "Unknown"
-                        
-                        # Extract group-title if available
-                        group_match = re.search(r'group-title="(.*?)"', attributes)
-                        group = group_match.group(1) if group_match else "Unknown"
-                        
-                        # Extract tvg-logo if available
-                        logo_match = re.search(r'tvg-logo="(.*?)"', attributes)
-                        logo = logo_match.group(1) if logo_match else ""
-                        
-                        # Extract tvg-id if available
-                        tvg_id_match = re.search(r'tvg-id="(.*?)"', attributes)
-                        tvg_id = tvg_id_match.group(1) if tvg_id_match else ""
-                        
-                        channel = {
-                            'name': name,
-                            'group': group,
-                            'logo': logo,
-                            'tvg_id': tvg_id,
-                            'duration': duration,
-                            'url': None
-                        }
-                        
-                        self.groups.add(group)
-                except Exception as e:
-                    print(f"Error parsing EXTINF line: {e}")
-                    channel = None
-            
-            elif not line.startswith('#') and channel:
-                # This is a URL line
-                channel['url'] = line
-                self.channels.append(channel)
-                channel = None
+        The body is read in chunks (gzip/deflate transfer encodings are
+        decoded on the fly) and fed straight into the line parser, so the first
+        channels are available long before the download finishes. progress, if
+        given, is called with (bytes_received, total_bytes); total_bytes is 0
+        when the server does not send a Content-Length.
+        """
+        for row in self.iter_url_rows(url, progress):
+            yield self.channels[row]
+    
+    def iter_url_rows(self, url, progress=None, revalidate=True):
+        """Stream a URL into self.channels, yielding each new row number"""
+        headers = {'Accept-Encoding': 'gzip, deflate'}
         
-        return True
+        # Revalidate a cached copy instead of downloading it again
+        validator = self.cache.url_validator(url) if self.cache and revalidate else None
+        if validator:
+            if validator.get('etag'):
+                headers['If-None-Match'] = validator['etag']
+            if validator.get('last_modified'):
+                headers['If-Modified-Since'] = validator['last_modified']
+        
+        with requests.get(url, headers=headers, stream=True,
+                          timeout=(self.CONNECT_TIMEOUT, self.READ_TIMEOUT)) as response:
+            if response.status_code == 304:
+                cached = self.cache.load_url(url)
+                if cached is not None:
+                    self.channels = cached
+                    yield from range(len(cached))
+                    return
+            else:
+                response.raise_for_status()
+                total = int(response.headers.get('Content-Length') or 0)
+                chunks = self._iter_download(response, total, progress)
+                yield from self._parse_lines(self._iter_stream_lines(chunks, response.headers))
+                
+                if self.cache:
+                    self.cache.save_url(url, response.headers, self.channels)
+                return
+        
+        # The cache entry went away after the server confirmed it; fetch it again
+        yield from self.iter_url_rows(url, progress, revalidate=False)
+    
+    @classmethod
+    def _iter_download(cls, response, total, progress):
+        """Yield decoded body chunks, reporting bytes received on the wire"""
+        for chunk in response.iter_content(chunk_size=cls.DOWNLOAD_CHUNK_SIZE):
+            if progress:
+                progress(response.raw.tell(), total)
+            yield chunk
+    
+    @staticmethod
+    def _iter_stream_lines(chunks, headers):
+        """Decode a stream of byte chunks incrementally and yield complete lines"""
+        chunks = iter(chunks)
+        first = next(chunks, b'')
+        
+        # Only trust an explicit charset; requests would otherwise assume Latin-1
+        content_type = headers.get('Content-Type', '')
+        encoding = None
+        if 'charset=' in content_type:
+            encoding = content_type.split('charset=', 1)[1].split(';', 1)[0].strip(' "\'')
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)(errors='replace') if encoding else None
+        except LookupError:
+            decoder = None
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(detect_bytes_encoding(first))(errors='replace')
+        
+        pending = ''
+        for chunk in itertools.chain((first,), chunks):
+            lines = (pending + decoder.decode(chunk)).split('\n')
+            pending = lines.pop()
+            yield from lines
+        
+        pending += decoder.decode(b'', final=True)
+        if pending:
+            yield pending
+    
+    def _parse_lines(self, lines):
+        """Parse M3U lines from any iterable, yielding store rows as they complete"""
+        lines = iter(lines)
+        header = next(lines, '')
+        if not header.lstrip('\ufeff').strip().startswith('#EXTM3U'):
+            raise ValueError("Invalid M3U format: Missing #EXTM3U header")
+        
+        self.channels = ChannelStore()
+        yield from _parse_entries(lines, self.channels)
     
     def get_channels_by_group(self, group):
         """Get channels filtered by group"""
-        return [c for c in self.channels if c['group'] == group]
+        return [self.channels[row] for row in self.channels.rows_for_group(group)]
     
     def search_channels(self, query):
-        """Search channels by name"""
-        query = query.lower()
-        return [c for c in self.channels if query in c['name'].lower()]
+        """Search channels by name or group"""
+        return [self.channels[row] for row in self.channels.search(query)]
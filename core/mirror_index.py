@@ -0,0 +1,105 @@
+import re
+import threading
+
+from core.text_utils import fold_text
+
+# Runs of characters ignored when comparing channel names ("beIN Sports-1" = "bein sports 1")
+_NAME_SEPARATOR_RE = re.compile(r'[\W_]+')
+
+def normalize_name(name):
+    """Get the key under which names of the same channel compare equal"""
+    return _normalize_folded(fold_text(name))
+
+def _normalize_folded(key):
+    """Get the normalize_name() key of a name already folded with fold_text()"""
+    return _NAME_SEPARATOR_RE.sub(' ', key).strip()
+
+def _add(groups, key, row):
+    """Add a row to the group of key"""
+    rows = groups.get(key)
+    if rows is None:
+        groups[key] = row
+    elif isinstance(rows, list):
+        rows.append(row)
+    else:
+        groups[key] = [rows, row]
+
+class MirrorIndex:
+    """Index of the rows of a ChannelStore that carry the same channel.
+    
+    Playlists often list a channel several times, with a URL per provider
+    or server. Rows are grouped by tvg-id and by normalized name (see
+    normalize_name()), so finding the mirrors of a channel takes a dict
+    lookup. Groups of a single row, by far the most common, are kept as
+    the bare row number. Names come folded from the search index of the
+    store, which folds them anyway.
+    
+    The index follows the store as it grows: rows appended since the last
+    update() are indexed on the next update() or mirrors(), and remove()
+    takes out a row removed from the store.
+    """
+    
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.Lock()
+        self._indexed = 0  # Rows [0, _indexed) are in the index
+        
+        self._tvg_ids = {}  # tvg-id -> row, or list of rows
+        self._names = {}  # Normalized name -> row, or list of rows
+    
+    def __len__(self):
+        return self._indexed
+    
+    def update(self):
+        """Index the rows appended to the store since the last update"""
+        with self._lock:
+            store = self._store
+            # The search index folded every name already
+            folded = store.search_index.folded_names(self._indexed)
+            tvg_ids = store.tvg_ids
+            for row, name in enumerate(folded, self._indexed):
+                tvg_id = tvg_ids[row]
+                if tvg_id:
+                    _add(self._tvg_ids, tvg_id, row)
+                key = _normalize_folded(name)
+                if key:
+                    _add(self._names, key, row)
+            self._indexed += len(folded)
+    
+    def remove(self, row):
+        """Take out a row removed from the store; the rows after it shift down by one"""
+        with self._lock:
+            if row >= self._indexed:
+                return
+            self._indexed -= 1
+            for groups in (self._tvg_ids, self._names):
+                removed = None
+                for key, rows in groups.items():
+                    if rows.__class__ is int:
+                        if rows > row:
+                            groups[key] = rows - 1
+                        elif rows == row:
+                            removed = key
+                    else:
+                        rows[:] = [other - (other > row) for other in rows if other != row]
+                        if len(rows) == 1:
+                            groups[key] = rows[0]
+                # A row has one tvg-id and one name, so at most one group empties
+                if removed is not None:
+                    del groups[removed]
+    
+    def mirrors(self, tvg_id, name):
+        """Get the rows of a channel, in store order
+        
+        Rows match on tvg-id when the channel has one, otherwise on the
+        normalized name.
+        """
+        self.update()
+        if tvg_id:
+            rows = self._tvg_ids.get(tvg_id)
+        else:
+            key = normalize_name(name)
+            rows = self._names.get(key) if key else None
+        if rows is None:
+            return []
+        return list(rows) if isinstance(rows, list) else [rows]
@@ -0,0 +1,81 @@
+from urllib.parse import urlsplit
+
+# Playback profiles
+LOW_LATENCY = 'low-latency'  # Live TV: start fast and stay close to the live edge
+SMOOTH = 'smooth'  # Large buffers that ride out network hiccups, at the cost of delay
+PROFILES = (LOW_LATENCY, SMOOTH)
+
+# Stream types the profiles are tuned for
+HLS = 'hls'
+HTTP_TS = 'http-ts'
+UDP = 'udp'
+RTMP = 'rtmp'
+OTHER = 'other'
+
+# File extensions of on-demand media (movies, series episodes), which gain
+# nothing from a low latency
+_VOD_EXTENSIONS = ('.mp4', '.mkv', '.avi', '.mov', '.m4v', '.wmv', '.flv', '.webm', '.mpg', '.mpeg')
+
+# Media options of each profile and stream type. Caching values are in ms.
+# HLS delivers whole segments, so it needs more caching than continuous
+# streams for the same latency.
+_OPTIONS = {
+    LOW_LATENCY: {
+        HLS: [':network-caching=1000', ':live-caching=1000'],
+        HTTP_TS: [':network-caching=300', ':live-caching=300'],
+        UDP: [':network-caching=200', ':live-caching=200'],
+        RTMP: [':network-caching=300', ':live-caching=300'],
+        OTHER: [':network-caching=500', ':live-caching=500']
+    },
+    SMOOTH: {
+        HLS: [':network-caching=5000', ':live-caching=5000'],
+        HTTP_TS: [':network-caching=3000', ':live-caching=3000'],
+        UDP: [':network-caching=2000', ':live-caching=2000'],
+        RTMP: [':network-caching=3000', ':live-caching=3000'],
+        OTHER: [':network-caching=3000', ':live-caching=3000']
+    }
+}
+
+# Options shared by every stream type of a profile. Low latency disables
+# clock jitter compensation and resynchronisation, which would otherwise
+# grow the delay. Both decode on the GPU when one is available, which gets
+# the first frame out sooner.
+_PROFILE_OPTIONS = {
+    LOW_LATENCY: [':clock-jitter=0', ':clock-synchro=0', ':avcodec-hw=any'],
+    SMOOTH: [':avcodec-hw=any']
+}
+
+def stream_type(url):
+    """Get the stream type of a URL from its scheme and extension"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    path = parts.path.lower()
+    
+    if scheme in ('udp', 'rtp'):
+        return UDP
+    if scheme.startswith('rtmp'):
+        return RTMP
+    if path.endswith(('.m3u8', '.m3u')) or '/hls/' in path:
+        return HLS
+    if scheme in ('http', 'https') and (path.endswith('.ts') or '.' not in path.rsplit('/', 1)[-1]):
+        # Xtream style live URLs (/live/user/pass/1234) serve MPEG-TS
+        return HTTP_TS
+    return OTHER
+
+def is_vod(url):
+    """Check whether a URL points at on-demand media rather than a live stream"""
+    path = urlsplit(url).path.lower()
+    return '/movie/' in path or '/series/' in path or path.endswith(_VOD_EXTENSIONS)
+
+def select_profile(url):
+    """Get the profile suited to a URL: smooth for on-demand media, low latency for live streams"""
+    return SMOOTH if is_vod(url) else LOW_LATENCY
+
+def media_options(url, profile=None):
+    """Get the libVLC media options to open a URL with, and the profile they belong to
+    
+    profile is chosen from the URL when None.
+    """
+    if profile not in PROFILES:
+        profile = select_profile(url)
+    return _OPTIONS[profile][stream_type(url)] + _PROFILE_OPTIONS[profile], profile
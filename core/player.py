@@ -1,16 +1,70 @@
 import os
 import sys
+import time
 import platform
-from PyQt6.QtCore import QTimer, pyqtSignal, QObject
+from collections import OrderedDict
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject
+
+from core.playback_profiles import PROFILES, media_options, is_vod
+from core.telemetry import PlaybackSession
+from core.stall_watchdog import StallWatchdog, STALLED, RECONNECT, RECOVERED, GAVE_UP
+
+# Media states reported by media_state_changed (the values of vlc.State)
+STATE_NOTHING_SPECIAL = 0
+STATE_OPENING = 1
+STATE_BUFFERING = 2
+STATE_PLAYING = 3
+STATE_PAUSED = 4
+STATE_STOPPED = 5
+STATE_ENDED = 6
+STATE_ERROR = 7
 
 class Player(QObject):
-    """VLC-based media player wrapper"""
+    """VLC-based media player wrapper
+    
+    Playback status comes from the libVLC event manager rather than polling.
+    libVLC calls back on its own threads, so every event is forwarded to the
+    GUI thread through a queued signal before the public signals are emitted.
+    
+    For fast zapping, up to standby_count extra libVLC players keep the
+    channels most likely to be watched next (see prepare()) open, muted and
+    rendering into hidden widgets. Playing one of them swaps it in with no
+    connect, probe or buffering delay, and the channel left behind stays
+    open as a standby.
+    
+    Streams are opened with the media options of a playback profile (see
+    core.playback_profiles), chosen from the URL unless one is forced, and
+    the time from play() to the first video frame is recorded per profile.
+    
+    Each channel watched is a telemetry session (core.telemetry): start-up
+    milestones are timed from the player events, the media statistics are
+    sampled every TELEMETRY_INTERVAL ms while it plays, and the session is
+    written to disk as JSON lines when it ends.
+    
+    A stall watchdog (core.stall_watchdog) follows the same events and
+    statistics, and reopens streams that stall or drop with exponential
+    backoff, resuming on-demand media where it stopped.
+    """
     
     # Signals
-    time_changed = pyqtSignal(int)
-    position_changed = pyqtSignal(float)
-    media_state_changed = pyqtSignal(int)
+    time_changed = pyqtSignal(int)  # ms, emitted once per second of playback
+    position_changed = pyqtSignal(float)  # 0.0-1.0, only for seekable media
+    length_changed = pyqtSignal(int)  # ms
+    media_state_changed = pyqtSignal(int)  # One of the STATE_* values
+    buffering_changed = pyqtSignal(float)  # Percent of the buffer filled
+    seekable_changed = pyqtSignal(bool)  # False for live streams
     error_occurred = pyqtSignal(str)
+    surface_changed = pyqtSignal(object)  # Widget the active player renders into
+    first_frame_shown = pyqtSignal(str, int)  # Profile, ms from play() to the first frame
+    telemetry_sampled = pyqtSignal(object)  # Sample dict of the current session
+    session_ended = pyqtSignal(object)  # PlaybackSession of the channel left
+    reconnecting = pyqtSignal(int, int)  # Attempt, ms until the stalled stream is reopened
+    stream_recovered = pyqtSignal(int)  # ms the stream was stalled
+    
+    TELEMETRY_INTERVAL = 1000  # ms
+    
+    # Carries libVLC events from its threads to the GUI thread
+    _vlc_event = pyqtSignal(object, object)  # media player, (event name, value)
     
     def __init__(self):
         super().__init__()
@@ -18,6 +72,34 @@ class Player(QObject):
         # Don't set up VLC path here - it should be handled in main.py before import
         self._vlc_available = False
         
+        # Zapping: standby players pre-opening likely next channels
+        self.standby_count = 0
+        self._url = None  # URL of the active player
+        self._volume = 100
+        self._candidates = []  # URLs to keep open, most likely first
+        self._standby = OrderedDict()  # URL -> libVLC player holding it open
+        self._idle = []  # Standby players without media
+        self._surfaces = {}  # libVLC player -> widget it renders into
+        self._surface_factory = None
+        self._last_reported = {}  # libVLC player -> [second, position] last forwarded
+        
+        # Playback profiles and their time to first frame
+        self.profile = None  # Forced profile, or None to choose from the URL
+        self.current_profile = None
+        self.first_frame_times = {profile: [] for profile in PROFILES}  # ms
+        self._started = None  # (profile, start time) until the first frame of a play()
+        self._standby_profiles = {}  # URL -> profile it was opened with
+        
+        # Quality of service telemetry of the channel being watched
+        self.session = None
+        self._buffering = None  # Last buffer fill percent of the session
+        self._stats_timer = QTimer(self)
+        self._stats_timer.setInterval(self.TELEMETRY_INTERVAL)
+        self._stats_timer.timeout.connect(self._sample_stats)
+        
+        # Recovery of stalled streams, checked on every statistics sample
+        self.watchdog = StallWatchdog()
+        
         # Clear problematic environment variables that might cause issues
         if 'PYTHON_VLC_MODULE_PATH' in os.environ:
             del os.environ['PYTHON_VLC_MODULE_PATH']
@@ -45,10 +127,10 @@ class Player(QObject):
                 
                 self.media_player = self.instance.media_player_new()
                 
-                # Create timer for updating position
-                self.update_timer = QTimer()
-                self.update_timer.setInterval(1000)  # Update every second
-                self.update_timer.timeout.connect(self._update_status)
+                # Forward playback events instead of polling for them
+                self._vlc = vlc
+                self._vlc_event.connect(self._on_vlc_event, Qt.ConnectionType.QueuedConnection)
+                self._attach_events(self.media_player)
                 
                 self._vlc_available = True
                 print("VLC initialized successfully")
@@ -65,18 +147,39 @@ class Player(QObject):
             return False
             
         try:
-            if platform.system() == "Linux":
-                self.media_player.set_xwindow(widget.winId())
-            elif platform.system() == "Windows":
-                self.media_player.set_hwnd(int(widget.winId()))
-            elif platform.system() == "Darwin":
-                self.media_player.set_nsobject(int(widget.winId()))
+            self._render_to(self.media_player, widget)
             return True
         except Exception as e:
             self.error_occurred.emit(f"Error setting video widget: {str(e)}")
             print(f"Error setting video widget: {e}")
             return False
     
+    def set_surface_factory(self, factory):
+        """Set the callable creating a hidden widget for each standby player to render into
+        
+        Standby players are only created once a factory is set.
+        """
+        self._surface_factory = factory
+    
+    def set_standby_count(self, count):
+        """Set how many channels are kept open for zapping (0 disables it)"""
+        self.standby_count = max(count, 0)
+        if not hasattr(self, '_vlc_available') or not self._vlc_available:
+            return
+        self._fill_standby()
+    
+    def prepare(self, urls):
+        """Keep the first standby_count of urls open, most likely next channel first
+        
+        They are opened once the current channel plays, so they do not slow
+        down its start.
+        """
+        self._candidates = [url for url in dict.fromkeys(urls) if url and url != self._url]
+        if not hasattr(self, '_vlc_available') or not self._vlc_available:
+            return
+        if self._url is None or self.get_state() == STATE_PLAYING:
+            self._fill_standby()
+    
     def play(self, url, name=""):
         """Play media from URL"""
         if not hasattr(self, '_vlc_available') or not self._vlc_available:
@@ -84,11 +187,19 @@ class Player(QObject):
             return False
             
         try:
-            import vlc
-            media = self.instance.media_new(url)
+            if url in self._standby:
+                self._swap(url)
+                return True
+            
+            media, profile = self._new_media(url)
             self.media_player.set_media(media)
+            self._url = url
+            self.current_profile = profile
+            self._started = (profile, time.monotonic())
+            self._start_session()
+            self.watchdog.start(live=not is_vod(url))
+            self._last_reported.pop(self.media_player, None)
             self.media_player.play()
-            self.update_timer.start()
             return True
         except Exception as e:
             self.error_occurred.emit(str(e))
@@ -105,12 +216,46 @@ class Player(QObject):
         if not hasattr(self, '_vlc_available') or not self._vlc_available:
             return
         self.media_player.stop()
-        self.update_timer.stop()
+        self.watchdog.stop()
+        self.end_session()
+        self._url = None
+        self._started = None
+        self._candidates = []
+        self._fill_standby()
+    
+    def end_session(self):
+        """End the telemetry session of the current channel and write it to disk"""
+        self._stats_timer.stop()
+        if self.session is not None:
+            session, self.session = self.session, None
+            self.session_ended.emit(session)
+            session.dump()
+    
+    def set_profile(self, profile):
+        """Force a playback profile for the next streams, or None to choose it from each URL"""
+        self.profile = profile if profile in PROFILES else None
+        if not hasattr(self, '_vlc_available') or not self._vlc_available:
+            return
+        
+        # Reopen the standby channels opened with another profile
+        for url in list(self._standby):
+            if media_options(url, self.profile)[1] != self._standby_profiles.get(url):
+                media_player = self._standby.pop(url)
+                self._standby_profiles.pop(url, None)
+                media_player.stop()
+                self._idle.append(media_player)
+        self._fill_standby()
+    
+    def first_frame_stats(self):
+        """Get {profile: (number of starts, average ms to the first frame)} of the measured starts"""
+        return {profile: (len(times), sum(times) // len(times))
+                for profile, times in self.first_frame_times.items() if times}
     
     def set_volume(self, volume):
         """Set volume (0-100)"""
         if not hasattr(self, '_vlc_available') or not self._vlc_available:
             return
+        self._volume = volume
         self.media_player.audio_set_volume(volume)
     
     def get_volume(self):
@@ -143,6 +288,18 @@ class Player(QObject):
             return
         self.media_player.set_time(ms)
     
+    def is_seekable(self):
+        """Check if the current media can be seeked (live streams cannot)"""
+        if not hasattr(self, '_vlc_available') or not self._vlc_available:
+            return False
+        return bool(self.media_player.is_seekable())
+    
+    def get_state(self):
+        """Get the current STATE_* value"""
+        if not hasattr(self, '_vlc_available') or not self._vlc_available:
+            return STATE_NOTHING_SPECIAL
+        return self.media_player.get_state().value
+    
     def get_position(self):
         """Get current position as float 0.0-1.0"""
         if not hasattr(self, '_vlc_available') or not self._vlc_available:
@@ -155,13 +312,269 @@ class Player(QObject):
             return
         self.media_player.set_position(position)
     
-    def _update_status(self):
-        """Update time and position"""
-        if not hasattr(self, '_vlc_available') or not self._vlc_available:
+    def _render_to(self, media_player, widget):
+        """Make a libVLC player render into a widget"""
+        if platform.system() == "Linux":
+            media_player.set_xwindow(widget.winId())
+        elif platform.system() == "Windows":
+            media_player.set_hwnd(int(widget.winId()))
+        elif platform.system() == "Darwin":
+            media_player.set_nsobject(int(widget.winId()))
+        self._surfaces[media_player] = widget
+    
+    def _swap(self, url):
+        """Make the standby player holding url the active one"""
+        previous = self.media_player
+        previous.audio_set_mute(True)
+        media_player = self._standby.pop(url)
+        
+        # The channel left behind stays open as the last watched one
+        if self._url is not None and self.standby_count:
+            self._standby[self._url] = previous
+            self._standby_profiles[self._url] = self.current_profile
+        else:
+            previous.stop()
+            self._idle.append(previous)
+        
+        self.media_player = media_player
+        self._url = url
+        self.current_profile = self._standby_profiles.pop(url, None)
+        self._started = None  # The first frame was shown while on standby
+        self._last_reported.pop(media_player, None)
+        self._start_session()
+        self.session.standby = True
+        self.watchdog.start(live=not is_vod(url))
+        if self.get_state() == STATE_PLAYING:
+            self.session.mark('playing')
+            self.watchdog.playing()
+        media_player.audio_set_mute(False)
+        media_player.audio_set_volume(self._volume)
+        
+        # Bring the display up to date with the new player
+        self.surface_changed.emit(self._surfaces[media_player])
+        self.media_state_changed.emit(self.get_state())
+        self.seekable_changed.emit(self.is_seekable())
+        self.length_changed.emit(max(media_player.get_length(), 0))
+        self.time_changed.emit(max(media_player.get_time(), 0))
+    
+    def _start_session(self):
+        """Start the telemetry session of the channel just played"""
+        self.end_session()
+        self.session = PlaybackSession(self._url, self.current_profile)
+        self._buffering = None
+        self._stats_timer.start()
+    
+    def _sample_stats(self):
+        """Add a sample of the media statistics to the session and check for a stall"""
+        if self.session is None:
             return
-            
-        current_time = self.get_time()
-        self.time_changed.emit(current_time)
+        media = self.media_player.get_media()
+        stats = self._vlc.MediaStats()
+        if media is not None and media.get_stats(stats):
+            self.telemetry_sampled.emit(self.session.sample(stats, self._buffering))
+            self.watchdog.data_read(stats.read_bytes)
+        self._on_watchdog(self.watchdog.poll())
+    
+    def _watch_event(self, name, value):
+        """Feed a player event of the active player to the stall watchdog"""
+        watchdog = self.watchdog
+        if name == 'state':
+            if value == STATE_PLAYING:
+                return watchdog.playing()
+            if value == STATE_PAUSED:
+                return watchdog.paused()
+            if value == STATE_ENDED:
+                return watchdog.ended()
+            if value == STATE_ERROR:
+                return watchdog.failed()
+        elif name == 'time':
+            return watchdog.time_changed(value)
+        elif name == 'buffering':
+            return watchdog.buffering(value)
+        return None
+    
+    def _on_watchdog(self, action):
+        """Carry out the action asked for by the stall watchdog"""
+        watchdog = self.watchdog
+        if action == STALLED:
+            print(f"Stream stalled, reconnecting in {watchdog.delay:.0f} s (attempt {watchdog.attempts + 1})")
+            self.reconnecting.emit(watchdog.attempts + 1, int(watchdog.delay * 1000))
+        elif action == RECONNECT:
+            self._reconnect()
+        elif action == RECOVERED:
+            print(f"Stream recovered after {watchdog.last_downtime:.1f} s")
+            self.stream_recovered.emit(int(watchdog.last_downtime * 1000))
+        elif action == GAVE_UP:
+            print(f"Giving up on stalled stream: {self._url}")
+            self.error_occurred.emit("Stream lost")
+    
+    def _reconnect(self):
+        """Reopen the media of the active player, where it stopped if it is on-demand"""
+        if self._url is None:
+            return
+        try:
+            media, _ = self._new_media(self._url)
+            position = self.watchdog.position
+            if not self.watchdog.live and position:
+                media.add_option(f":start-time={position / 1000:.1f}")
+            self.media_player.set_media(media)
+            self._last_reported.pop(self.media_player, None)
+            self.media_player.play()
+        except Exception as e:
+            print(f"Error reconnecting stream: {e}")
+    
+    def _fill_standby(self):
+        """Open the candidate channels on standby players, releasing unneeded ones"""
+        wanted = self._candidates[:self.standby_count]
+        
+        for url in [url for url in self._standby if url not in wanted]:
+            media_player = self._standby.pop(url)
+            self._standby_profiles.pop(url, None)
+            media_player.stop()
+            self._idle.append(media_player)
+        
+        for url in wanted:
+            if url in self._standby:
+                continue
+            media_player = self._idle.pop() if self._idle else self._new_standby()
+            if media_player is None:
+                break
+            media, self._standby_profiles[url] = self._new_media(url)
+            media_player.set_media(media)
+            media_player.audio_set_mute(True)
+            media_player.play()
+            self._standby[url] = media_player
         
-        current_pos = self.get_position()
-        self.position_changed.emit(current_pos)
+        # Players beyond the pool size are released
+        while self._idle and len(self._standby) + len(self._idle) > self.standby_count:
+            media_player = self._idle.pop()
+            media_player.release()
+            self._last_reported.pop(media_player, None)
+            surface = self._surfaces.pop(media_player, None)
+            if surface is not None:
+                surface.deleteLater()
+    
+    def _new_media(self, url):
+        """Create the libVLC media of a URL with its profile options; returns (media, profile)"""
+        options, profile = media_options(url, self.profile)
+        return self.instance.media_new(url, *options), profile
+    
+    def _new_standby(self):
+        """Create a standby player rendering into a new hidden widget, or None"""
+        if self._surface_factory is None:
+            return None
+        try:
+            media_player = self.instance.media_player_new()
+            self._render_to(media_player, self._surface_factory())
+            self._attach_events(media_player)
+            return media_player
+        except Exception as e:
+            print(f"Error creating standby player: {e}")
+            return None
+    
+    def _attach_events(self, media_player):
+        """Subscribe to the playback events of a libVLC media player"""
+        vlc = self._vlc
+        events = media_player.event_manager()
+        handlers = {
+            vlc.EventType.MediaPlayerOpening: lambda event: ('state', STATE_OPENING),
+            vlc.EventType.MediaPlayerPlaying: lambda event: ('state', STATE_PLAYING),
+            vlc.EventType.MediaPlayerPaused: lambda event: ('state', STATE_PAUSED),
+            vlc.EventType.MediaPlayerStopped: lambda event: ('state', STATE_STOPPED),
+            vlc.EventType.MediaPlayerEndReached: lambda event: ('state', STATE_ENDED),
+            vlc.EventType.MediaPlayerEncounteredError: lambda event: ('state', STATE_ERROR),
+            vlc.EventType.MediaPlayerBuffering: lambda event: ('buffering', event.u.new_cache),
+            vlc.EventType.MediaPlayerTimeChanged: lambda event: ('time', event.u.new_time),
+            vlc.EventType.MediaPlayerPositionChanged: lambda event: ('position', event.u.new_position),
+            vlc.EventType.MediaPlayerLengthChanged: lambda event: ('length', event.u.new_length),
+            vlc.EventType.MediaPlayerSeekableChanged: lambda event: ('seekable', bool(event.u.new_seekable)),
+            # Timed here rather than when the event reaches the GUI thread
+            vlc.EventType.MediaPlayerVout: lambda event: ('vout', time.monotonic() if event.u.new_count else None),
+        }
+        for event_type, handler in handlers.items():
+            events.event_attach(event_type, self._handle_vlc_event, media_player, handler)
+    
+    def _handle_vlc_event(self, event, media_player, handler):
+        """Forward a libVLC event to the GUI thread (runs on a libVLC thread)
+        
+        Only calls into Qt: libVLC must not be called back from its own
+        event threads.
+        """
+        name, value = handler(event)
+        
+        # Time and position change many times per second; the display only
+        # shows whole seconds and a 1000 step slider
+        if name in ('time', 'position'):
+            if media_player is not self.media_player:
+                return
+            last = self._last_reported.setdefault(media_player, [-1, -1.0])
+            if name == 'time':
+                if value // 1000 == last[0]:
+                    return
+                last[0] = value // 1000
+            else:
+                if abs(value - last[1]) < 0.001:
+                    return
+                last[1] = value
+        
+        self._vlc_event.emit(media_player, (name, value))
+    
+    def _on_vlc_event(self, media_player, event):
+        """Emit the public signal of a libVLC event (GUI thread)"""
+        name, value = event
+        if media_player is not self.media_player:
+            # libVLC may unmute when a standby player opens its audio output
+            if name == 'state' and value == STATE_PLAYING and media_player in self._standby.values():
+                media_player.audio_set_mute(True)
+            return
+        
+        if self.session is not None:
+            self._update_session(name, value)
+        self._on_watchdog(self._watch_event(name, value))
+        
+        if name == 'state':
+            if value == STATE_ERROR:
+                # Reported first: the state change may start another source,
+                # which replaces the error shown
+                self.error_occurred.emit("Playback failed")
+            self.media_state_changed.emit(value)
+            if value == STATE_PLAYING:
+                self._fill_standby()
+            elif value in (STATE_STOPPED, STATE_ENDED, STATE_ERROR):
+                # Failed starts are not timed
+                self._started = None
+        elif name == 'buffering':
+            self.buffering_changed.emit(value)
+        elif name == 'time':
+            self.time_changed.emit(value)
+        elif name == 'position':
+            self.position_changed.emit(value)
+        elif name == 'length':
+            self.length_changed.emit(value)
+        elif name == 'seekable':
+            self.seekable_changed.emit(value)
+        elif name == 'vout' and value is not None and self._started is not None:
+            profile, started = self._started
+            self._started = None
+            elapsed = int((value - started) * 1000)
+            self.first_frame_times[profile].append(elapsed)
+            print(f"First frame after {elapsed} ms ({profile} profile)")
+            self.first_frame_shown.emit(profile, elapsed)
+    
+    def _update_session(self, name, value):
+        """Time the start-up milestones and count rebuffering of the session"""
+        session = self.session
+        if name == 'state':
+            if value == STATE_OPENING:
+                session.mark('opening')
+            elif value == STATE_PLAYING:
+                session.mark('playing')
+            elif value == STATE_ERROR:
+                session.mark('error')
+        elif name == 'buffering':
+            session.mark('buffering')
+            if value < 100 and 'playing' in session.milestones and (self._buffering or 0) >= 100:
+                session.rebuffers += 1
+            self._buffering = value
+        elif name == 'vout' and value is not None:
+            session.mark('first_frame', value)
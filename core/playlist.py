@@ -2,32 +2,37 @@ import json
 import os
 from datetime import datetime
 from core.language_manager import tr
+from core.channel_store import Channel, ChannelStore
 
 class Playlist:
     """Custom playlist manager"""
     
     def __init__(self, name="", channels=None):
         self.name = name
-        self.channels = channels or []
+        if channels is None:
+            channels = ChannelStore()
+        elif not isinstance(channels, ChannelStore):
+            channels = ChannelStore.from_channels(channels)
+        self.channels = channels
         self.created = datetime.now().isoformat()
         self.last_updated = self.created
     
     def add_channel(self, channel):
         """Add channel to playlist"""
         # Avoid duplicates by URL
-        if not any(ch.url == channel.url for ch in self.channels):
-            self.channels.append(channel)
+        if self.channels.find_url(channel.url) < 0:
+            self.channels.append_channel(channel)
             self.last_updated = datetime.now().isoformat()
             return True
         return False
     
     def remove_channel(self, channel):
         """Remove channel from playlist"""
-        for i, ch in enumerate(self.channels):
-            if ch.url == channel.url:
-                self.channels.pop(i)
-                self.last_updated = datetime.now().isoformat()
-                return True
+        row = self.channels.find_url(channel.url)
+        if row >= 0:
+            self.channels.remove(row)
+            self.last_updated = datetime.now().isoformat()
+            return True
         return False
     
     def to_dict(self):
@@ -36,7 +41,7 @@ class Playlist:
             'name': self.name,
             'created': self.created,
             'last_updated': self.last_updated,
-            'channels': [ch.__dict__ for ch in self.channels]
+            'channels': [ch.to_dict() for ch in self.channels]
         }
 
 class PlaylistManager:
@@ -68,16 +73,8 @@ class PlaylistManager:
                     playlist.created = data['created']
                     playlist.last_updated = data['last_updated']
                     
-                    from core.m3u_parser import Channel
                     for ch_data in data['channels']:
-                        channel = Channel(
-                            name=ch_data['name'],
-                            url=ch_data['url'],
-                            logo=ch_data['logo'],
-                            group=ch_data.get('group', ''),
-                            quality=ch_data.get('quality', '')
-                        )
-                        playlist.channels.append(channel)
+                        playlist.channels.append_channel(Channel.from_dict(ch_data))
                     
                     self.playlists[playlist.name] = playlist
                 except Exception as e:
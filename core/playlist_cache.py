@@ -0,0 +1,252 @@
+import os
+import sys
+import json
+import struct
+import hashlib
+from array import array
+
+from core.channel_store import ChannelStore, EXTRAS_SEPARATOR
+
+class PlaylistCache:
+    """On-disk cache of parsed playlists.
+    
+    Each entry holds the columns of a ChannelStore in a compact binary file:
+    a small JSON header followed by one blob per column. String columns are
+    stored as NUL separated UTF-8 and group codes as a raw array, so loading
+    an entry is a handful of decode/split calls instead of a full re-parse.
+    Playlists with values containing a separator are not cached.
+    
+    File entries are valid while the file's size and mtime are unchanged;
+    URL entries carry the server's ETag/Last-Modified for revalidation.
+    """
+    
+    MAGIC = b'IPTVPLC2'
+    
+    # Separates rows inside the string blobs
+    ROW_SEPARATOR = '\x00'
+    
+    STRING_COLUMNS = ('names', 'urls', 'logos', 'tvg_ids')
+    
+    def __init__(self, cache_dir=os.path.join("cache", "playlists"), max_entries=10):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+    
+    def _entry_path(self, source):
+        """Get the cache file path for a file path or URL"""
+        digest = hashlib.sha1(source.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.bin")
+    
+    @staticmethod
+    def _file_source(file_path):
+        """Get the cache source and validator of a local file"""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        return path, {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    
+    def load_file(self, file_path):
+        """Get the cached store for a local playlist file, or None"""
+        try:
+            source, validator = self._file_source(file_path)
+            return self._load(source, validator)
+        except OSError:
+            return None
+    
+    def save_file(self, file_path, store):
+        """Cache the parsed store of a local playlist file"""
+        try:
+            source, validator = self._file_source(file_path)
+            self._save(source, validator, store)
+        except OSError as e:
+            print(f"Error caching playlist {file_path}: {e}")
+    
+    def url_validator(self, url):
+        """Get the saved ETag/Last-Modified of a cached URL, or None"""
+        header = self._read_header(self._entry_path(url))
+        if not header or header.get('source') != url:
+            return None
+        return header.get('validator')
+    
+    def load_url(self, url):
+        """Get the cached store of a URL regardless of freshness, or None
+        
+        Callers are expected to revalidate with url_validator() first.
+        """
+        validator = self.url_validator(url)
+        if validator is None:
+            return None
+        return self._load(url, validator)
+    
+    def save_url(self, url, headers, store):
+        """Cache the parsed store of a URL along with its response validators"""
+        validator = {
+            'etag': headers.get('ETag', ''),
+            'last_modified': headers.get('Last-Modified', '')
+        }
+        if not validator['etag'] and not validator['last_modified']:
+            # Without a validator the entry could never be revalidated
+            return
+        try:
+            self._save(url, validator, store)
+        except OSError as e:
+            print(f"Error caching playlist {url}: {e}")
+    
+    def _read_header(self, path):
+        """Read the JSON header of a cache entry"""
+        try:
+            with open(path, 'rb') as f:
+                if f.read(len(self.MAGIC)) != self.MAGIC:
+                    return None
+                (length,) = struct.unpack('<I', f.read(4))
+                return json.loads(f.read(length).decode('utf-8'))
+        except (OSError, ValueError, struct.error):
+            return None
+    
+    def _load(self, source, validator):
+        """Load an entry if its source and validator match"""
+        path = self._entry_path(source)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        
+        try:
+            if not data.startswith(self.MAGIC):
+                return None
+            offset = len(self.MAGIC)
+            (length,) = struct.unpack_from('<I', data, offset)
+            offset += 4
+            header = json.loads(data[offset:offset + length].decode('utf-8'))
+            offset += length
+            
+            if header.get('source') != source or header.get('validator') != validator:
+                return None
+            
+            blobs = {}
+            for column, size in header['blobs']:
+                blobs[column] = data[offset:offset + size]
+                offset += size
+            if offset != len(data):
+                raise ValueError(f"entry has {len(data)} bytes, expected {offset}")
+            
+            return self._decode_store(header, blobs)
+        except (ValueError, KeyError, struct.error) as e:
+            print(f"Ignoring damaged playlist cache entry {path}: {e}")
+            return None
+    
+    def _decode_store(self, header, blobs):
+        """Rebuild a ChannelStore from decoded column blobs"""
+        rows = header['rows']
+        store = ChannelStore()
+        
+        for column in self.STRING_COLUMNS:
+            values = blobs[column].decode('utf-8').split(self.ROW_SEPARATOR) if rows else []
+            if len(values) != rows:
+                raise ValueError(f"column {column} has {len(values)} rows, expected {rows}")
+            setattr(store, column, values)
+        store.logos = list(map(sys.intern, store.logos))
+        
+        codes = array('I')
+        codes.frombytes(blobs['group_codes'])
+        if header['byteorder'] != sys.byteorder:
+            codes.byteswap()
+        store.group_codes = codes
+        
+        for group in header['groups']:
+            store.intern_group(group)
+        
+        # Extra attributes stay packed per row until ChannelStore.attributes() needs them
+        extras = blobs['extras'].decode('utf-8').split(self.ROW_SEPARATOR) if rows else []
+        if len(extras) != rows:
+            raise ValueError(f"column extras has {len(extras)} rows, expected {rows}")
+        extras = [packed or None for packed in extras]
+        store.extras = extras
+        
+        if 'qualities' in blobs:
+            qualities = blobs['qualities'].decode('utf-8').split(self.ROW_SEPARATOR)
+            if len(qualities) > rows:
+                raise ValueError(f"column qualities has {len(qualities)} rows, expected up to {rows}")
+            store.qualities = list(map(sys.intern, qualities))
+        
+        return store
+    
+    def _save(self, source, validator, store):
+        """Write an entry, replacing any previous one for the same source"""
+        rows = len(store)
+        blobs = []
+        for column in self.STRING_COLUMNS:
+            joined = self.ROW_SEPARATOR.join(getattr(store, column))
+            if joined.count(self.ROW_SEPARATOR) != max(rows - 1, 0):
+                # A value contains the separator; such playlists are not cached
+                return
+            blobs.append((column, joined.encode('utf-8')))
+        
+        blobs.append(('group_codes', store.group_codes.tobytes()))
+        
+        packed = []
+        for extras in store.extras:
+            if not extras:
+                packed.append('')
+            elif isinstance(extras, str):
+                # Still packed as loaded from the cache
+                packed.append(extras)
+            else:
+                joined = EXTRAS_SEPARATOR.join(extras)
+                if joined.count(EXTRAS_SEPARATOR) != len(extras) - 1:
+                    # A key or value contains the separator
+                    return
+                packed.append(joined)
+        packed = self.ROW_SEPARATOR.join(packed)
+        if packed.count(self.ROW_SEPARATOR) != max(rows - 1, 0):
+            return
+        blobs.append(('extras', packed.encode('utf-8')))
+        
+        if store.qualities:
+            joined = self.ROW_SEPARATOR.join(store.qualities)
+            if joined.count(self.ROW_SEPARATOR) != len(store.qualities) - 1:
+                return
+            blobs.append(('qualities', joined.encode('utf-8')))
+        
+        header = json.dumps({
+            'source': source,
+            'validator': validator,
+            'rows': rows,
+            'byteorder': sys.byteorder,
+            'groups': store.group_names,
+            'blobs': [(column, len(blob)) for column, blob in blobs]
+        }, ensure_ascii=False).encode('utf-8')
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._entry_path(source)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            for _, blob in blobs:
+                f.write(blob)
+        os.replace(temp_path, path)
+        
+        self._evict()
+    
+    def _evict(self):
+        """Keep only the max_entries most recently written entries"""
+        try:
+            entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                       if name.endswith('.bin')]
+        except OSError:
+            return
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[self.max_entries:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def clear(self):
+        """Remove all cache entries"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.bin'):
+                os.remove(os.path.join(self.cache_dir, name))
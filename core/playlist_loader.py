@@ -0,0 +1,127 @@
+import time
+import threading
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from core.m3u_parser import M3UParser
+
+class PlaylistLoader(QObject):
+    """Loads a playlist file or URL on a worker thread.
+    
+    Parsed channels are announced in batches so the UI can show them while the
+    rest of the playlist is still downloading or parsing. Each batch is a
+    (store, rows) tuple: the ChannelStore being filled and the range of rows
+    added to it since the previous batch.
+    """
+    
+    # Signals
+    channels_loaded = pyqtSignal(object)  # (ChannelStore, range of new rows)
+    progress = pyqtSignal(int, int)  # bytes processed, total bytes (0 if unknown)
+    finished = pyqtSignal()
+    cancelled = pyqtSignal()
+    error_occurred = pyqtSignal(str)
+    
+    # Minimum time between two batches, so the GUI thread is not flooded
+    BATCH_INTERVAL = 0.1
+    
+    def __init__(self, source, is_url=False, cache=None, parallel=True):
+        super().__init__()
+        
+        self.source = source
+        self.is_url = is_url
+        self.parallel = parallel
+        self.parser = M3UParser(cache=cache)
+        
+        self._cancel_event = threading.Event()
+        
+        # Created here so callers can connect to thread() before start()
+        self._thread = QThread()
+        self.moveToThread(self._thread)
+        self._thread.started.connect(self.run)
+        self.finished.connect(self._thread.quit)
+        self.cancelled.connect(self._thread.quit)
+        self.error_occurred.connect(self._thread.quit)
+    
+    def start(self):
+        """Start loading on the worker thread"""
+        self._thread.start()
+    
+    def cancel(self):
+        """Request the load to stop; emits cancelled once the worker notices"""
+        self._cancel_event.set()
+    
+    def is_cancelled(self):
+        """Check whether cancel() was called"""
+        return self._cancel_event.is_set()
+    
+    def wait(self, timeout_ms=5000):
+        """Block until the worker thread has exited"""
+        return self._thread.wait(timeout_ms)
+    
+    def run(self):
+        """Parse the source, emitting batches of rows (runs on the worker thread)"""
+        try:
+            if self.is_url:
+                self._consume(self.parser.iter_url_rows(self.source, progress=self._report_progress))
+            else:
+                try:
+                    self._consume(self.parser.iter_file_rows(
+                        self.source, parallel=self.parallel, progress=self._report_progress))
+                except UnicodeDecodeError as e:
+                    print(f"Unicode decode error: {e}. Trying with UTF-8...")
+                    self._consume(self.parser.iter_file_rows(
+                        self.source, encoding='utf-8', progress=self._report_progress))
+        except Exception as e:
+            if self.is_cancelled():
+                self.cancelled.emit()
+            else:
+                print(f"Error loading playlist {self.source}: {e}")
+                self.error_occurred.emit(str(e))
+            return
+        
+        if self.is_cancelled():
+            self.cancelled.emit()
+        else:
+            self.finished.emit()
+    
+    def _consume(self, rows):
+        """Drain a row generator, emitting a batch every BATCH_INTERVAL seconds"""
+        shown = 0  # Rows emitted so far
+        last_emit = time.monotonic()
+        try:
+            for row in rows:
+                if self._cancel_event.is_set():
+                    break
+                if row < shown:
+                    continue
+                if time.monotonic() - last_emit >= self.BATCH_INTERVAL:
+                    shown = self._emit_batch(shown)
+                    last_emit = time.monotonic()
+        finally:
+            # Closing the generator releases the file or HTTP connection
+            rows.close()
+        
+        if shown < len(self.parser.channels) and not self._cancel_event.is_set():
+            self._emit_batch(shown)
+        if not self._cancel_event.is_set():
+            # The filter panel only needs the facets once the load is over,
+            # and mirrors are only looked up when a channel is played
+            self.parser.channels.facet_index.update()
+            self.parser.channels.mirror_index.update()
+    
+    def _emit_batch(self, start):
+        """Emit the rows of the store from start on, then index them
+        
+        Returns the end of the batch. Stores filled ahead of the rows yielded
+        (cache hits, chunks of a parallel parse) go out whole in the next
+        batch. Indexing happens here rather than on the GUI thread's first
+        search, once the rows are on their way to the list.
+        """
+        store = self.parser.channels
+        end = len(store)
+        self.channels_loaded.emit((store, range(start, end)))
+        store.search_index.update()
+        return end
+    
+    def _report_progress(self, done, total):
+        """Forward parser progress to the GUI thread"""
+        self.progress.emit(done, total)
@@ -0,0 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from core.text_utils import fold_text
+
+def narrows(previous, query):
+    """Check whether every match of query is also a match of previous
+    
+    Holds when query contains previous, since both are matched as
+    substrings.
+    """
+    if not previous.strip():
+        return False
+    return fold_text(previous) in fold_text(query)
+
+class SearchEngine(QObject):
+    """Runs the searches typed into a search box on a worker thread.
+    
+    Keystrokes are debounced: a search only starts once typing pauses for
+    DEBOUNCE_INTERVAL ms. Each submit() makes every earlier search stale;
+    stale searches still queued are skipped and the results of one already
+    running are dropped, so only the latest query reaches results_ready.
+    
+    When a query extends the previous one ("bein" -> "bein sports"), it is
+    searched within the previous results instead of the whole scope. Fuzzy
+    searches rank names by similarity and are never narrowed, since a
+    longer query may match names the shorter one ranked out.
+    
+    Rows appended to a store while it loads are searched with
+    search_appended(), whose matches arrive through rows_found in the
+    order the batches were appended.
+    """
+    
+    # Signals
+    results_ready = pyqtSignal(str, object)  # query, list of matching store rows
+    rows_found = pyqtSignal(str, object)  # query, matching rows among rows appended to the store
+    
+    # Carry results from the worker thread to the GUI thread
+    _finished = pyqtSignal(int, object)
+    _appended_finished = pyqtSignal(int, str, object)
+    
+    DEBOUNCE_INTERVAL = 150  # ms
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search")
+        self._generation = 0  # Incremented by every submit() or cancel()
+        self._pending = None  # (store, query, rows, fuzzy) waiting for the debounce timer
+        self._running = {}  # Generation -> (store, query, rows, fuzzy) of submitted searches
+        self._last = None  # (store, query, rows, result) of the latest finished substring search
+        
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._dispatch)
+        self._finished.connect(self._on_finished)
+        self._appended_finished.connect(self._on_appended_finished)
+    
+    def submit(self, store, query, rows=None, delay=None, fuzzy=False):
+        """Search store for query once typing pauses
+        
+        rows optionally restricts the search to a list of store rows; pass
+        the same list object again to allow narrowing from its results.
+        fuzzy ranks the closest names first instead of matching substrings.
+        """
+        self._generation += 1
+        self._pending = (store, query, rows, fuzzy)
+        self._timer.start(self.DEBOUNCE_INTERVAL if delay is None else delay)
+    
+    def search_appended(self, store, query, rows):
+        """Search rows just appended to store for the query of the latest search
+        
+        The latest search must have finished; its results are extended with
+        the matches, which rows_found delivers unless a newer search starts.
+        """
+        # The previous results lack these rows, so they cannot be narrowed from
+        self._last = None
+        self._executor.submit(self._run_appended, self._generation, store, query, list(rows))
+    
+    def cancel(self):
+        """Drop the pending search and the results of any running one"""
+        self._generation += 1
+        self._pending = None
+        self._timer.stop()
+    
+    def is_busy(self):
+        """Check whether a search is waiting or running"""
+        return self._pending is not None or self._generation in self._running
+    
+    def reset(self):
+        """Cancel searches and forget previous results, e.g. when rows were added"""
+        self.cancel()
+        self._last = None
+    
+    def shutdown(self):
+        """Stop the worker thread"""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _dispatch(self):
+        """Start the pending search on the worker thread"""
+        if self._pending is None:
+            return
+        store, query, rows, fuzzy = self._pending
+        self._pending = None
+        
+        scope = rows
+        if self._last is not None and not fuzzy:
+            last_store, last_query, last_rows, last_result = self._last
+            if last_store is store and last_rows is rows and narrows(last_query, query):
+                scope = last_result
+        
+        generation = self._generation
+        self._running[generation] = (store, query, rows, fuzzy)
+        self._executor.submit(self._run, generation, store, query, scope, fuzzy)
+    
+    def _run(self, generation, store, query, scope, fuzzy):
+        """Run one search (worker thread)"""
+        if generation != self._generation:
+            # A newer query was typed while this one was queued
+            self._finished.emit(generation, None)
+            return
+        try:
+            result = store.fuzzy_search(query, scope) if fuzzy else store.search(query, scope)
+        except Exception as e:
+            print(f"Error searching channels for {query!r}: {e}")
+            result = None
+        self._finished.emit(generation, result)
+    
+    def _run_appended(self, generation, store, query, rows):
+        """Search appended rows (worker thread)"""
+        if generation != self._generation:
+            return
+        try:
+            result = store.search(query, rows)
+        except Exception as e:
+            print(f"Error searching channels for {query!r}: {e}")
+            return
+        self._appended_finished.emit(generation, query, result)
+    
+    def _on_appended_finished(self, generation, query, result):
+        """Deliver the matches among appended rows (GUI thread)"""
+        if generation == self._generation and result:
+            self.rows_found.emit(query, result)
+    
+    def _on_finished(self, generation, result):
+        """Deliver the results of the latest search (GUI thread)"""
+        store, query, rows, fuzzy = self._running.pop(generation)
+        if generation != self._generation or result is None:
+            return
+        self._last = None if fuzzy else (store, query, rows, result)
+        self.results_ready.emit(query, result)
@@ -0,0 +1,529 @@
+import re
+import heapq
+import bisect
+import operator
+import itertools
+import threading
+from array import array
+from collections import Counter
+
+from core.text_utils import fold_text
+
+# Words of a channel or group name
+_TOKEN_RE = re.compile(r'\w+')
+
+# Words shorter than this have no trigrams to look up, so the words
+# containing them are found by scanning the word list
+TRIGRAM_MIN_QUERY = 3
+
+# Similarity to a query word of a name word equal to it, starting with it
+# or containing it; misspelled words score below these
+_EXACT_SCORE = 1.0
+_PREFIX_SCORE = 0.9
+_INFIX_SCORE = 0.8
+
+def _trigrams(text):
+    """Get the set of three character substrings of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _bigrams(word):
+    """Get the set of two character substrings of word, padded to mark its ends"""
+    padded = f" {word} "
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+def _edit_distance(a, b, limit):
+    """Get the number of edits turning a into b, or limit + 1 if it is larger
+    
+    Edits are inserting, deleting or replacing a character, or swapping two
+    adjacent ones.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    
+    before_previous = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                distance = min(distance, before_previous[j - 2] + 1)
+            current[j] = distance
+        if min(current) > limit:
+            return limit + 1
+        before_previous, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+def _remove_row(postings, row):
+    """Remove row from a sorted posting array, shifting the rows after it down by one"""
+    if not postings or postings[-1] < row:
+        return
+    if len(postings) == 1:
+        # Most words of a large playlist are used by a single row
+        if postings[0] == row:
+            del postings[0]
+        else:
+            postings[0] -= 1
+        return
+    index = bisect.bisect_left(postings, row)
+    if postings[index] == row:
+        del postings[index]
+    postings[index:] = array('I', map(operator.sub, postings[index:], itertools.repeat(1)))
+
+class _WordRows:
+    """Rows matching one word of a fuzzy query, grouped by similarity.
+    
+    Groups are built on first use, best first; each holds the rows whose
+    most similar word has that similarity.
+    """
+    
+    def __init__(self, postings, matches):
+        by_score = {}
+        for token, score in matches.items():
+            by_score.setdefault(round(score, 3), []).append(token)
+        
+        self.scores = sorted(by_score, reverse=True)  # Similarity of each group
+        self._group_tokens = [by_score[score] for score in self.scores]
+        self._postings = postings
+        self._levels = []  # Sets of rows of the groups built so far
+    
+    def level(self, index):
+        """Get the set of rows of a group"""
+        while len(self._levels) <= index:
+            rows = set()
+            for token in self._group_tokens[len(self._levels)]:
+                rows.update(self._postings[token])
+            rows.difference_update(*self._levels)
+            self._levels.append(rows)
+        return self._levels[index]
+    
+    def head(self, index, count, size):
+        """Get the first count rows of a group, in store order, without building it
+        
+        Only groups surely holding more than size rows (and at least count)
+        are read, straight from the postings of their words; None is
+        returned for others, and when the groups before are not built yet.
+        """
+        if len(self._levels) != index:
+            return None
+        earlier = self._levels
+        postings = [self._postings[token] for token in self._group_tokens[index]]
+        if max(map(len, postings)) - sum(map(len, earlier)) <= max(size, count):
+            return None
+        
+        rows = []
+        for row, _ in itertools.groupby(heapq.merge(*postings)):
+            if not any(row in level for level in earlier):
+                rows.append(row)
+                if len(rows) == count:
+                    break
+        return rows
+    
+    def exclude(self, rows):
+        """Get the set of rows, out of the given ones, not matching the word"""
+        self.level(len(self.scores) - 1)
+        return rows.difference(*self._levels)
+
+class SearchIndex:
+    """Inverted index over the channel names and groups of a ChannelStore.
+    
+    Every word of every name has a posting list of the rows using it, and
+    the words themselves are indexed by trigram. A playlist has far fewer
+    distinct words than channels, so a substring query first finds the few
+    words that contain it through their trigrams, then merges their
+    postings. A substring made only of word characters always lies inside
+    a single word, so such queries need no further checks; queries spanning
+    several words are checked against the names of the candidate rows.
+    
+    Queries shorter than three characters have no trigram; the words
+    containing them are found by scanning the (far shorter) word list. A
+    row matches when its name or its group contains the query.
+    
+    fuzzy_search() ranks names by resemblance instead, tolerating typos. The
+    words are also indexed by their (padded) bigrams, which survive most
+    typos in short words; the words sharing enough bigrams with a query
+    word are compared to it by edit distance.
+    
+    Names, groups and queries are all compared as fold_text() keys, so case,
+    accents, Arabic diacritics and letter variants do not matter. The key
+    of each name is computed once, when its row is indexed.
+    
+    The index follows the store as it grows: rows appended since the last
+    update() are indexed on the next update() or search(), so indexing a
+    playlist that is still loading costs no more than indexing it once.
+    remove() takes out a row removed from the store and shifts the rows
+    after it in the postings.
+    """
+    
+    # Restricting a search to at most this many rows checks them one by one
+    FILTER_MAX_ROWS = 5000
+    
+    FUZZY_LIMIT = 200  # Rows returned by a fuzzy search
+    FUZZY_MAX_WORDS = 4  # Longer queries only use their longest words
+    FUZZY_WORD_MATCHES = 8  # Name words kept per query word, most similar first
+    FUZZY_CANDIDATES = 100  # Words compared by edit distance per query word
+    FUZZY_RANK_ROWS = 10000  # Larger classes of equally similar rows keep store order
+    
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.Lock()
+        self._indexed = 0  # Rows [0, _indexed) are in the index
+        
+        self._keys = []  # Folded name of every indexed row
+        self._group_keys = {}  # Group code -> folded group name
+        self._tokens = {}  # Word -> array of rows whose name contains it
+        self._sorted_tokens = []  # Keys of _tokens, sorted for prefix lookups
+        self._token_trigrams = {}  # Trigram -> list of words containing it
+        self._token_bigrams = {}  # Padded bigram -> list of words containing it
+        self._group_rows = {}  # Group code -> array of rows in the group
+    
+    def __len__(self):
+        return self._indexed
+    
+    def update(self):
+        """Index the rows appended to the store since the last update"""
+        with self._lock:
+            names = self._store.names
+            group_codes = self._store.group_codes
+            group_names = self._store.group_names
+            end = len(group_codes)
+            if end <= self._indexed:
+                return
+            
+            keys = self._keys
+            tokens = self._tokens
+            group_rows = self._group_rows
+            new_tokens = []
+            
+            for row in range(self._indexed, end):
+                key = fold_text(names[row])
+                keys.append(key)
+                for token in set(_TOKEN_RE.findall(key)):
+                    postings = tokens.get(token)
+                    if postings is None:
+                        postings = tokens[token] = array('I')
+                        new_tokens.append(token)
+                    postings.append(row)
+                
+                code = group_codes[row]
+                postings = group_rows.get(code)
+                if postings is None:
+                    postings = group_rows[code] = array('I')
+                    self._group_keys[code] = fold_text(group_names[code])
+                postings.append(row)
+            
+            if new_tokens:
+                token_trigrams = self._token_trigrams
+                token_bigrams = self._token_bigrams
+                for token in new_tokens:
+                    for gram in _trigrams(token):
+                        token_trigrams.setdefault(gram, []).append(token)
+                    for gram in _bigrams(token):
+                        token_bigrams.setdefault(gram, []).append(token)
+                self._sorted_tokens = sorted(tokens)
+            self._indexed = end
+    
+    def remove(self, row):
+        """Take out a row removed from the store; the rows after it shift down by one"""
+        with self._lock:
+            if row >= self._indexed:
+                return
+            key = self._keys.pop(row)
+            self._indexed -= 1
+            
+            for postings in self._tokens.values():
+                _remove_row(postings, row)
+            for code, postings in list(self._group_rows.items()):
+                _remove_row(postings, row)
+                if not postings:
+                    del self._group_rows[code]
+                    del self._group_keys[code]
+            
+            # Forget the words only the removed row used
+            removed = [token for token in set(_TOKEN_RE.findall(key)) if not self._tokens[token]]
+            for token in removed:
+                del self._tokens[token]
+                del self._sorted_tokens[bisect.bisect_left(self._sorted_tokens, token)]
+                for grams, index in ((_trigrams(token), self._token_trigrams),
+                                     (_bigrams(token), self._token_bigrams)):
+                    for gram in grams:
+                        words = index[gram]
+                        words.remove(token)
+                        if not words:
+                            del index[gram]
+    
+    def folded_names(self, start=0, end=None):
+        """Get the fold_text() keys of the names of rows [start, end) of the indexed rows"""
+        self.update()
+        return self._keys[start:end]
+    
+    def rows_for_group(self, code):
+        """Get the rows of a group code, in store order"""
+        self.update()
+        return self._group_rows.get(code, array('I'))
+    
+    def search(self, query, rows=None):
+        """Get the rows whose name or group contains query, in store order
+        
+        rows optionally restricts the result to a subset of store rows.
+        """
+        self.update()
+        query = fold_text(query)
+        if not query.strip():
+            return list(range(self._indexed)) if rows is None else list(rows)
+        
+        if rows is not None and len(rows) <= self.FILTER_MAX_ROWS:
+            # Checking a few rows directly is cheaper than merging postings
+            return self._filter(query, rows)
+        
+        postings = self._match_names(query)
+        for code in self._match_groups(query):
+            postings.append(self._group_rows[code])
+        
+        if rows is None and len(postings) == 1 and isinstance(postings[0], array):
+            # A single posting list is already in store order
+            return postings[0].tolist()
+        
+        matched = set()
+        for rows_matched in postings:
+            matched.update(rows_matched)
+        if rows is not None:
+            matched.intersection_update(rows)
+        return sorted(matched)
+    
+    def fuzzy_search(self, query, rows=None, limit=None):
+        """Get the rows whose name best resembles query, most similar first
+        
+        Each query word is matched to similar name words: the same word,
+        words it starts or lies inside, then words a few typos away. A word
+        matching nothing is tried as two words typed without a space. A row
+        scores the sum of the similarities of its best word for every query
+        word; ties go to the shorter name (or, among very many rows, the
+        earlier one).
+        
+        At most limit (default FUZZY_LIMIT) rows are returned. rows
+        optionally restricts the result to a subset of store rows.
+        """
+        self.update()
+        limit = limit or self.FUZZY_LIMIT
+        scope = set(rows) if rows is not None else None
+        
+        word_matches = self._fuzzy_words(fold_text(query))
+        if not word_matches:
+            return []
+        
+        # Rows of each query word grouped by the similarity of their best
+        # matching word; every combination of one group per query word (or
+        # none) is a class of equally scored rows. The result is filled from
+        # the best classes, so the groups of weak matches are rarely built.
+        words = [_WordRows(self._tokens, matches) for matches in word_matches]
+        classes = []
+        for combination in itertools.product(*(range(-1, len(word.scores)) for word in words)):
+            score = sum(words[i].scores[level] for i, level in enumerate(combination) if level >= 0)
+            if score:
+                classes.append((score, combination))
+        classes.sort(key=lambda item: item[0], reverse=True)
+        
+        keys = self._keys
+        ranked = []
+        for score, combination in classes:
+            if len(words) == 1 and scope is None:
+                # The rows of a common word are not worth collecting when only
+                # the first ones in store order are kept
+                head = words[0].head(combination[0], limit - len(ranked), self.FUZZY_RANK_ROWS)
+                if head is not None:
+                    ranked.extend(head)
+                    break
+            chosen = sorted((words[i].level(level) for i, level in enumerate(combination)
+                             if level >= 0), key=len)
+            matched = chosen[0].intersection(*chosen[1:]) if len(chosen) > 1 else chosen[0]
+            if scope is not None:
+                matched = matched & scope
+            for i, level in enumerate(combination):
+                if level < 0 and matched:
+                    matched = words[i].exclude(matched)
+            if not matched:
+                continue
+            if len(matched) <= self.FUZZY_RANK_ROWS:
+                ranked.extend(heapq.nsmallest(limit - len(ranked), matched,
+                                              key=lambda row: (len(keys[row]), row)))
+            else:
+                ranked.extend(heapq.nsmallest(limit - len(ranked), matched))
+            if len(ranked) >= limit:
+                break
+        return ranked
+    
+    def _fuzzy_words(self, query):
+        """Get a {name word: similarity} dict for each word of query"""
+        words = list(dict.fromkeys(_TOKEN_RE.findall(query)))
+        if len(words) > self.FUZZY_MAX_WORDS:
+            longest = set(sorted(words, key=len, reverse=True)[:self.FUZZY_MAX_WORDS])
+            words = [word for word in words if word in longest]
+        
+        word_matches = []
+        for word in words:
+            matches = self._similar_tokens(word)
+            if matches:
+                word_matches.append(matches)
+            elif len(word) >= 5:
+                word_matches.extend(self._split_word(word))
+        return word_matches
+    
+    def _similar_tokens(self, word):
+        """Get the indexed words most similar to word, as a {word: similarity} dict"""
+        wanted = self.FUZZY_WORD_MATCHES
+        
+        # Words starting with word outscore the others, so only the shortest
+        # of them can be kept, and weaker matches are only looked for while
+        # fewer than wanted words are found
+        matches = {}
+        for token in heapq.nsmallest(wanted, self._prefixed_tokens(word), key=len):
+            matches[token] = _EXACT_SCORE if token == word else _PREFIX_SCORE
+        if len(word) >= TRIGRAM_MIN_QUERY and len(matches) < wanted:
+            infixes = [token for token in self._tokens_containing(word) if token not in matches]
+            for token in heapq.nsmallest(wanted - len(matches), infixes, key=len):
+                matches[token] = _INFIX_SCORE
+        if len(word) >= TRIGRAM_MIN_QUERY and len(matches) < wanted:
+            matches.update(self._misspelled_tokens(word, matches))
+        
+        # Prefer the most similar words, then the shortest
+        best = heapq.nsmallest(wanted, matches.items(),
+                               key=lambda item: (-item[1], len(item[0])))
+        return dict(best)
+    
+    def _misspelled_tokens(self, word, found):
+        """Get the indexed words a few typos away from word, other than found
+        
+        Returns a {word: similarity} dict. Up to one edit is allowed in short
+        words, two in longer ones.
+        """
+        max_distance = 1 if len(word) <= 4 else 2
+        token_bigrams = self._token_bigrams
+        grams = sorted(_bigrams(word), key=lambda gram: (len(token_bigrams.get(gram, ())), gram))
+        
+        # Each edit changes at most three bigrams, so closer words share at
+        # least the remaining ones, and with them one of the rarest few.
+        # Only the words holding one of those are counted; bigrams shared by
+        # most of the words are then checked on these alone
+        needed = max(1, len(grams) - 3 * max_distance)
+        rare = len(grams) - needed + 1
+        shared = Counter()
+        for gram in grams[:rare]:
+            shared.update(token_bigrams.get(gram, ()))
+        common = grams[rare:]
+        if common:
+            for token in shared:
+                padded = f" {token} "
+                shared[token] += sum(gram in padded for gram in common)
+        
+        matches = {}
+        for token, count in shared.most_common(self.FUZZY_CANDIDATES):
+            if count < needed:
+                break
+            if token in found:
+                continue
+            distance = _edit_distance(word, token, max_distance)
+            if distance <= max_distance:
+                matches[token] = _INFIX_SCORE * (1 - distance / max(len(word), len(token)))
+        return matches
+    
+    def _split_word(self, word):
+        """Read word as two words typed without a space ("aljazera")
+        
+        The first part must be an indexed word; the split whose second part
+        matches best wins. Returns the {name word: similarity} dicts of both
+        parts, each similarity weighted by the share of word it covers, or
+        an empty list.
+        """
+        best = []
+        best_score = 0
+        for i in range(2, len(word) - 2):
+            head, tail = word[:i], word[i:]
+            if head not in self._tokens:
+                continue
+            matches = self._similar_tokens(tail)
+            head_share = len(head) / len(word)
+            tail_share = 1 - head_share
+            score = head_share + tail_share * max(matches.values(), default=0)
+            if matches and score > best_score:
+                best = [{head: head_share},
+                        {token: tail_share * similarity for token, similarity in matches.items()}]
+                best_score = score
+        return best
+    
+    def _filter(self, query, rows):
+        """Get the rows, out of the given ones, whose name or group matches query"""
+        keys = self._keys
+        group_codes = self._store.group_codes
+        groups = set(self._match_groups(query))
+        return [row for row in rows if group_codes[row] in groups or query in keys[row]]
+    
+    def _match_names(self, query):
+        """Get posting lists (or sets) whose union is the rows with a name containing query"""
+        if _TOKEN_RE.fullmatch(query):
+            return [self._tokens[token] for token in self._tokens_containing(query)]
+        return [self._match_phrase(query)]
+    
+    def _tokens_containing(self, text):
+        """Get the indexed words that contain text"""
+        if len(text) < TRIGRAM_MIN_QUERY:
+            return [token for token in self._sorted_tokens if text in token]
+        
+        candidates = None
+        for gram in _trigrams(text):
+            words = self._token_trigrams.get(gram)
+            if not words:
+                return []
+            if candidates is None or len(words) < len(candidates):
+                candidates = words
+        return [token for token in candidates if text in token]
+    
+    def _prefixed_tokens(self, prefix):
+        """Get the indexed words that start with prefix"""
+        tokens = self._sorted_tokens
+        start = bisect.bisect_left(tokens, prefix)
+        # No word character sorts after U+10FFFF
+        end = bisect.bisect_left(tokens, prefix + '\U0010ffff', start)
+        return tokens[start:end]
+    
+    def _match_phrase(self, query):
+        """Get the set of rows whose name contains a query spanning several words"""
+        keys = self._keys
+        words = list(_TOKEN_RE.finditer(query))
+        if not words:
+            # Only punctuation; nothing to look up
+            return {row for row in range(self._indexed) if query in keys[row]}
+        
+        # A query word followed by punctuation or a space must end a word of
+        # the name, one preceded by them must start one, and one between them
+        # must be a whole word. Narrow down to the rows having such words,
+        # longest (usually rarest) first, then check the full query.
+        candidates = None
+        for match in sorted(words, key=lambda match: len(match.group()), reverse=True):
+            word = match.group()
+            starts_word = match.start() > 0
+            ends_word = match.end() < len(query)
+            if starts_word and ends_word:
+                tokens = [word] if word in self._tokens else []
+            elif starts_word:
+                tokens = self._prefixed_tokens(word)
+            elif ends_word:
+                tokens = [token for token in self._tokens_containing(word) if token.endswith(word)]
+            else:
+                tokens = self._tokens_containing(word)
+            
+            rows = set()
+            for token in tokens:
+                rows.update(self._tokens[token])
+            if candidates is None:
+                candidates = rows
+            else:
+                candidates.intersection_update(rows)
+            if not candidates:
+                return candidates
+        
+        return {row for row in candidates if query in keys[row]}
+    
+    def _match_groups(self, query):
+        """Get the codes of the groups whose name contains query"""
+        return [code for code, group in list(self._group_keys.items()) if query in group]
@@ -0,0 +1,221 @@
+import time
+
+# What the watchdog asks the player to do, returned by its methods
+STALLED = 'stalled'  # The stream stopped; it will be reopened after delay seconds
+RECONNECT = 'reconnect'  # Reopen the stream now
+RECOVERED = 'recovered'  # The stalled stream plays again
+GAVE_UP = 'gave-up'  # Reopening failed max_attempts times in a row
+
+# Phases of the stream being watched
+_IDLE = 0  # Nothing to watch: stopped, or on-demand media that ended
+_WATCHING = 1  # Playing, or starting for the first time
+_WAITING = 2  # Stalled, waiting for the reconnect delay
+_RECONNECTING = 3  # Reopened, waiting for the media time to move again
+_GAVE_UP = 4
+
+class StallWatchdog:
+    """Detects streams that stopped playing and paces reopening them.
+    
+    Live streams often stall without libVLC reporting an error: the
+    server stops sending or the decoder freezes, and the last frame stays
+    on screen. A stream is stalled when its media time has not moved for
+    stall_timeout seconds (startup_timeout before it first plays) while
+    no data arrives either, i.e. the bytes read and the buffering percent
+    stand still too; when data keeps arriving it gets twice as long to
+    catch up. A live stream that ends, or a stream that fails after it
+    played, is stalled at once.
+    
+    Stalled streams are reopened after base_delay seconds, doubling with
+    every failed attempt up to max_delay; the delay starts over once a
+    stream played for stable_time seconds. After max_attempts failed
+    attempts in a row the watchdog gives up.
+    
+    The watchdog only keeps time: it is fed the player events and polled
+    with timestamps (time.monotonic() by default), and each call returns
+    the action to take (STALLED, RECONNECT, RECOVERED, GAVE_UP) or None,
+    so it can be driven by synthetic event sequences. stalls, reconnects,
+    recoveries, failures and downtime (seconds) count its actions over all
+    streams; counters() returns them as a dict.
+    """
+    
+    STALL_TIMEOUT = 8.0  # s
+    STARTUP_TIMEOUT = 20.0  # s
+    BASE_DELAY = 1.0  # s
+    MAX_DELAY = 30.0  # s
+    MAX_ATTEMPTS = 8
+    STABLE_TIME = 30.0  # s
+    
+    def __init__(self, stall_timeout=None, startup_timeout=None, base_delay=None, max_delay=None,
+                 max_attempts=None, stable_time=None):
+        self.stall_timeout = self.STALL_TIMEOUT if stall_timeout is None else stall_timeout
+        self.startup_timeout = self.STARTUP_TIMEOUT if startup_timeout is None else startup_timeout
+        self.base_delay = self.BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = self.MAX_DELAY if max_delay is None else max_delay
+        self.max_attempts = self.MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self.stable_time = self.STABLE_TIME if stable_time is None else stable_time
+        
+        # Recovery counters, over all streams
+        self.stalls = 0  # Stalls detected
+        self.reconnects = 0  # Times a stream was reopened
+        self.recoveries = 0  # Stalls that ended with the stream playing again
+        self.failures = 0  # Stalls given up on
+        self.downtime = 0.0  # s from stall to recovery, in total
+        
+        # State of the stream being watched
+        self.live = True
+        self.attempts = 0  # Reconnects since the stream last played stable_time
+        self.delay = 0.0  # s until the scheduled reconnect
+        self.position = None  # Last media time, in ms
+        self.last_downtime = 0.0  # s the last recovered stall lasted
+        self._phase = _IDLE
+        self._played = False  # Played since it was (re)opened
+        self._paused = False
+        self._progress_at = 0.0  # When the media time last moved
+        self._data_at = 0.0  # When data last arrived
+        self._read_bytes = None
+        self._buffering = None
+        self._stable_since = 0.0
+        self._stalled_at = None
+        self._reconnect_at = 0.0
+    
+    def start(self, live=True, now=None):
+        """Watch a newly played stream; live is False for on-demand media"""
+        now = time.monotonic() if now is None else now
+        self.live = live
+        self.attempts = 0
+        self.delay = 0.0
+        self.position = None
+        self._phase = _WATCHING
+        self._paused = False
+        self._stalled_at = None
+        self._reopened(now)
+    
+    def stop(self):
+        """Stop watching, e.g. when playback is stopped"""
+        self._phase = _IDLE
+    
+    def is_stalled(self):
+        """Check whether the stream is stalled and not recovered yet"""
+        return self._stalled_at is not None
+    
+    def counters(self):
+        """Get the recovery counters as a dict"""
+        return {
+            'stalls': self.stalls,
+            'reconnects': self.reconnects,
+            'recoveries': self.recoveries,
+            'failures': self.failures,
+            'downtime': round(self.downtime, 1)
+        }
+    
+    def playing(self, now=None):
+        """The player started or resumed playing"""
+        now = time.monotonic() if now is None else now
+        if self._paused:
+            # The time stood still on purpose
+            self._paused = False
+            self._progress_at = self._data_at = now
+        if not self._played:
+            self._played = True
+            self._stable_since = now
+        return None
+    
+    def paused(self):
+        """The user paused playback"""
+        self._paused = True
+        return None
+    
+    def ended(self, now=None):
+        """The player reached the end of the media"""
+        if not self.live:
+            self._phase = _IDLE
+            return None
+        # Live streams have no end: the server closed the connection
+        return self._stall(time.monotonic() if now is None else now)
+    
+    def failed(self, now=None):
+        """The player reported an error"""
+        if self._phase == _WATCHING and not self._played:
+            # Never played: a dead URL, not a stall
+            return None
+        return self._stall(time.monotonic() if now is None else now)
+    
+    def time_changed(self, ms, now=None):
+        """The media time of the player changed"""
+        now = time.monotonic() if now is None else now
+        previous, self.position = self.position, ms
+        if previous is None or ms == previous:
+            # The first time reported after opening may be stale
+            return None
+        self._progress_at = self._data_at = now
+        
+        if self._phase in (_WAITING, _RECONNECTING):
+            self.last_downtime = now - self._stalled_at
+            self.downtime += self.last_downtime
+            self.recoveries += 1
+            self._stalled_at = None
+            self._played = True
+            self._stable_since = now
+            self._phase = _WATCHING
+            return RECOVERED
+        if self.attempts and now - self._stable_since >= self.stable_time:
+            self.attempts = 0
+        return None
+    
+    def buffering(self, percent, now=None):
+        """The buffer fill percent of the player changed"""
+        if percent != self._buffering:
+            self._buffering = percent
+            self._data_at = time.monotonic() if now is None else now
+        return None
+    
+    def data_read(self, read_bytes, now=None):
+        """The player read read_bytes from the stream in total (libVLC media statistics)"""
+        if read_bytes != self._read_bytes:
+            self._read_bytes = read_bytes
+            self._data_at = time.monotonic() if now is None else now
+        return None
+    
+    def poll(self, now=None):
+        """Check the stream for a stall or a due reconnect; call this regularly"""
+        now = time.monotonic() if now is None else now
+        if self._phase == _WAITING:
+            if now < self._reconnect_at:
+                return None
+            self.attempts += 1
+            self.reconnects += 1
+            self._phase = _RECONNECTING
+            self._reopened(now)
+            return RECONNECT
+        
+        if self._phase not in (_WATCHING, _RECONNECTING) or self._paused:
+            return None
+        timeout = self.stall_timeout if self._played else self.startup_timeout
+        frozen = now - self._progress_at
+        if frozen > timeout and (now - self._data_at > timeout or frozen > 2 * timeout):
+            return self._stall(now)
+        return None
+    
+    def _stall(self, now):
+        """Schedule reopening the stream, or give up after too many attempts"""
+        if self._phase not in (_WATCHING, _RECONNECTING):
+            return None
+        if self._stalled_at is None:
+            self._stalled_at = now
+            self.stalls += 1
+        if self.attempts >= self.max_attempts:
+            self._phase = _GAVE_UP
+            self._stalled_at = None
+            self.failures += 1
+            return GAVE_UP
+        self.delay = min(self.base_delay * 2 ** self.attempts, self.max_delay)
+        self._reconnect_at = now + self.delay
+        self._phase = _WAITING
+        return STALLED
+    
+    def _reopened(self, now):
+        """Restart the clocks for a stream (re)opened at now"""
+        self._played = False
+        self._progress_at = self._data_at = now
+        self._read_bytes = None
+        self._buffering = None
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import threading
+
+from core.facet_index import HEALTH_OFFLINE, HEALTH_TIMEOUT
+
+class StreamHistory:
+    """Reliability record of every stream URL played, kept across sessions.
+    
+    For each URL: how often it was started and how often it actually
+    played, the total start-up time of the cold starts and the number of
+    times playback went back to buffering. rank() orders the mirrors of a
+    channel by it, so the one most likely to start fast is tried first.
+    
+    The history is a JSON file, rewritten after every recorded session
+    and limited to the max_entries most recently played URLs.
+    """
+    
+    # Start-up time assumed for URLs that never started cold
+    DEFAULT_STARTUP = 3000  # ms
+    
+    def __init__(self, history_file="stream_history.json", max_entries=5000):
+        self.history_file = history_file
+        self.max_entries = max_entries
+        self.entries = {}  # URL -> {attempts, successes, startup_ms, startups, rebuffers, last}
+        self._lock = threading.Lock()
+        self.load_history()
+    
+    def load_history(self):
+        """Load the history from its file"""
+        if not os.path.exists(self.history_file):
+            return
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.entries = data
+        except Exception as e:
+            print(f"Error loading stream history: {e}")
+    
+    def save_history(self):
+        """Write the history to its file"""
+        with self._lock:
+            if len(self.entries) > self.max_entries:
+                recent = sorted(self.entries.items(), key=lambda item: item[1].get('last', 0), reverse=True)
+                self.entries = dict(recent[:self.max_entries])
+            data = json.dumps(self.entries)
+        try:
+            temp_path = f"{self.history_file}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, self.history_file)
+        except OSError as e:
+            print(f"Error saving stream history: {e}")
+    
+    def record(self, url, success, startup=None, rebuffers=0):
+        """Record one attempt to play a URL
+        
+        startup is the ms from play() to the first frame, for cold starts.
+        """
+        with self._lock:
+            entry = self.entries.setdefault(url, {
+                'attempts': 0, 'successes': 0, 'startup_ms': 0, 'startups': 0, 'rebuffers': 0, 'last': 0
+            })
+            entry['attempts'] += 1
+            if success:
+                entry['successes'] += 1
+            if startup is not None:
+                entry['startup_ms'] += startup
+                entry['startups'] += 1
+            entry['rebuffers'] += rebuffers
+            entry['last'] = time.time()
+        self.save_history()
+    
+    def record_session(self, session):
+        """Record the outcome of a telemetry PlaybackSession that ended"""
+        milestones = session.milestones
+        started = 'first_frame' in milestones or 'playing' in milestones
+        if not started and 'error' not in milestones:
+            # Left before it could start or fail; says nothing about the URL
+            return
+        startup = None
+        if started and not session.standby:
+            startup = milestones.get('first_frame', milestones.get('playing'))
+        self.record(session.url, started, startup, session.rebuffers)
+    
+    def success_rate(self, url):
+        """Get the estimated chance that a URL plays, 0.5 when never tried"""
+        entry = self.entries.get(url)
+        if entry is None:
+            return 0.5
+        # Laplace smoothing, so one lucky or unlucky attempt does not dominate
+        return (entry['successes'] + 1) / (entry['attempts'] + 2)
+    
+    def startup_time(self, url):
+        """Get the average cold start-up time of a URL in ms"""
+        entry = self.entries.get(url)
+        if entry is None or not entry['startups']:
+            return self.DEFAULT_STARTUP
+        return entry['startup_ms'] / entry['startups']
+    
+    def rank(self, urls, health=None):
+        """Order mirror URLs from the most to the least promising
+        
+        URLs are ordered by success rate (in steps of 10%, so chance does not
+        outweigh speed), then start-up time, then rebuffering per play.
+        health optionally maps URLs to their last HEALTH_* check status;
+        URLs that were offline or timed out go last. Ties keep their order.
+        """
+        health = health or {}
+        
+        def key(url):
+            entry = self.entries.get(url)
+            rebuffers = entry['rebuffers'] / max(entry['successes'], 1) if entry else 0
+            return (health.get(url) in (HEALTH_OFFLINE, HEALTH_TIMEOUT),
+                    -round(self.success_rate(url), 1),
+                    self.startup_time(url),
+                    rebuffers)
+        
+        return sorted(dict.fromkeys(urls), key=key)
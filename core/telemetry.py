@@ -0,0 +1,101 @@
+import os
+import json
+import time
+from collections import deque
+
+# Cumulative libVLC media statistics turned into per-sample counts
+_COUNTERS = ('decoded_video', 'displayed_pictures', 'lost_pictures', 'decoded_audio',
+             'played_abuffers', 'lost_abuffers', 'demux_corrupted', 'demux_discontinuity')
+
+# Start-up milestones timed from play(), in the order they are reached.
+# Sessions whose stream failed also get an 'error' milestone.
+MILESTONES = ('opening', 'buffering', 'playing', 'first_frame')
+
+class PlaybackSession:
+    """Quality of service record of one channel being watched.
+    
+    Holds the time from play() to each start-up milestone (connection
+    opened, buffering started, playing, first frame) and a ring buffer of
+    the last max_samples samples of the libVLC media statistics. Bitrates
+    are in kbit/s; counters (decoded and lost pictures, lost audio
+    buffers, ...) are the increase since the previous sample, so stutter
+    shows up as non-zero lost counts in the samples it happened in.
+    """
+    
+    def __init__(self, url, profile=None, max_samples=3600):
+        self.url = url
+        self.profile = profile
+        self.started = time.time()
+        self.milestones = {}  # Milestone -> ms after play()
+        self.samples = deque(maxlen=max_samples)
+        self.rebuffers = 0  # Times playback went back to buffering
+        self.standby = False  # Opened on a standby player, so start-up was not timed
+        
+        self._start = time.monotonic()
+        self._totals = None  # Counter values of the previous sample
+    
+    def elapsed(self):
+        """Get the ms since the session started"""
+        return int((time.monotonic() - self._start) * 1000)
+    
+    def mark(self, milestone, at=None):
+        """Record when a milestone was first reached
+        
+        at is a time.monotonic() timestamp, now when None.
+        """
+        if milestone in self.milestones:
+            return
+        at = time.monotonic() if at is None else at
+        self.milestones[milestone] = int((at - self._start) * 1000)
+    
+    def sample(self, stats, buffering=None):
+        """Add a sample of libVLC media statistics and return it as a dict"""
+        totals = {name: getattr(stats, name) for name in _COUNTERS}
+        previous = self._totals or dict.fromkeys(_COUNTERS, 0)
+        self._totals = totals
+        
+        sample = {
+            't': self.elapsed(),
+            # libVLC reports bitrates in bytes per microsecond
+            'input_kbps': round(stats.input_bitrate * 8000, 1),
+            'demux_kbps': round(stats.demux_bitrate * 8000, 1),
+            'read_bytes': stats.read_bytes
+        }
+        for name in _COUNTERS:
+            # Counters restart when libVLC reopens the input
+            sample[name] = max(totals[name] - previous[name], 0)
+        if buffering is not None:
+            sample['buffering'] = buffering
+        self.samples.append(sample)
+        return sample
+    
+    def summary(self):
+        """Get the session record: URL, profile, milestones and totals"""
+        return {
+            'type': 'session',
+            'url': self.url,
+            'profile': self.profile,
+            'started': self.started,
+            'duration': self.elapsed(),
+            'milestones': self.milestones,
+            'rebuffers': self.rebuffers,
+            'standby': self.standby,
+            'totals': {name: sum(sample[name] for sample in self.samples) for name in _COUNTERS}
+        }
+    
+    def dump(self, directory=os.path.join("cache", "telemetry")):
+        """Write the session as JSON lines: the session record, then one line per sample"""
+        if not self.samples and not self.milestones:
+            return None
+        name = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        path = os.path.join(directory, f"session-{name}-{int(self.started * 1000) % 1000:03d}.jsonl")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(self.summary()) + "\n")
+                for sample in self.samples:
+                    f.write(json.dumps(dict(sample, type='sample')) + "\n")
+            return path
+        except OSError as e:
+            print(f"Error writing playback telemetry: {e}")
+            return None
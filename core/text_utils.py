@@ -0,0 +1,31 @@
+import unicodedata
+
+# Arabic letters folded to the form most people type when searching.
+# Hamza carrying alef/waw/yaa forms decompose into the base letter plus a
+# combining hamza, which fold_text() strips with the other marks.
+_ARABIC_FOLDING = str.maketrans({
+    '\u0671': '\u0627',  # alef wasla -> alef
+    '\u0629': '\u0647',  # taa marbuta -> haa
+    '\u0649': '\u064a',  # alef maksura -> yaa
+    '\u06cc': '\u064a',  # farsi yeh -> yaa
+    '\u06a9': '\u0643',  # keheh -> kaf
+    '\u0640': None,       # tatweel
+    # Arabic-Indic and extended Arabic-Indic digits -> ASCII digits
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+    **{chr(0x06f0 + i): str(i) for i in range(10)},
+})
+
+def fold_text(text):
+    """Fold text into a key for accent, case and script variant insensitive search.
+    
+    Full-width and other compatibility characters become their plain form,
+    case is folded, Latin accents and Arabic diacritics (tashkeel) are
+    removed, and Arabic letter variants (alef/hamza forms, taa marbuta,
+    alef maksura, tatweel) are unified.
+    """
+    if text.isascii():
+        return text.lower()
+    
+    text = unicodedata.normalize('NFKD', text).casefold()
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return text.translate(_ARABIC_FOLDING)
@@ -3,6 +3,7 @@ import sys
 import os
 import platform
 import ctypes
+import multiprocessing
 from PyQt6.QtWidgets import QApplication, QMessageBox
 from PyQt6.QtCore import QDir
 from PyQt6.QtGui import QIcon
@@ -253,4 +254,6 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Required for the playlist parser's worker processes in frozen builds
+    multiprocessing.freeze_support()
     main()
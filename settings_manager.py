@@ -82,6 +82,15 @@ class SettingsManager(QMainWindow):
         if os.path.exists("playlist_urls.json"):
             files.append("playlist_urls.json")
         
+        if os.path.exists("standby_players.txt"):
+            files.append("standby_players.txt")
+        
+        if os.path.exists("playback_profile.txt"):
+            files.append("playback_profile.txt")
+        
+        if os.path.exists("stream_history.json"):
+            files.append("stream_history.json")
+        
         # إضافة مجلد قوائم التشغيل المخصصة إذا كان موجودًا
         if os.path.exists("playlists") and os.path.isdir("playlists"):
             for file in os.listdir("playlists"):
@@ -205,7 +214,10 @@ class SettingsManager(QMainWindow):
             files_to_delete = [
                 "language.txt",
                 "vlc_path.txt",
-                "playlist_urls.json"
+                "playlist_urls.json",
+                "standby_players.txt",
+                "playback_profile.txt",
+                "stream_history.json"
             ]
             
             for file in files_to_delete:
@@ -195,23 +195,27 @@ QTabBar::tab:selected {
 }
 
 /* Lists */
-QListWidget {
+QListView, QTableView {
     background-color: #1e1e1e;
     border: 1px solid #2a2a2a;
     border-radius: 4px;
 }
 
-QListWidget::item {
+QListView::item {
     padding: 5px;
     border-radius: 2px;
 }
 
-QListWidget::item:selected {
+QTableView::item {
+    padding: 0px 5px;
+}
+
+QListView::item:selected, QTableView::item:selected {
     background-color: #3778b7;
     color: #f0f0f0;
 }
 
-QListWidget::item:hover:!selected {
+QListView::item:hover:!selected, QTableView::item:hover:!selected {
     background-color: #2a2a2a;
 }
 
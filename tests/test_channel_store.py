@@ -0,0 +1,121 @@
+import random
+
+import pytest
+
+from core.channel_store import Channel, ChannelStore
+from core.facet_index import FacetIndex, GROUP, COUNTRY, QUALITY, HEALTH, HEALTH_ONLINE, HEALTH_OFFLINE
+from core.mirror_index import MirrorIndex
+from core.search_index import SearchIndex
+
+WORDS = ['bein', 'sports', 'news', 'الجزيرة', 'cnn', 'hd', 'fhd', 'movies', 'kids', 'music']
+
+def random_store(rows=2000, seed=1):
+    """Build a store of random channels sharing words, groups, tvg-ids and countries"""
+    rng = random.Random(seed)
+    store = ChannelStore()
+    for row in range(rows):
+        name = ' '.join(rng.sample(WORDS, 3)) + f" {rng.randint(1, 40)}"
+        store.append(name, f"http://streams/{row}", group=rng.choice('ABCD'),
+                     tvg_id=rng.choice(['', 'x', f'id{row % 50}']),
+                     attributes={'tvg-country': rng.choice(['US', 'FR', 'QA'])},
+                     quality=rng.choice(['', '', 'HD']))
+    store.set_health((row, rng.choice([HEALTH_ONLINE, HEALTH_OFFLINE]), 10, 0) for row in range(0, rows, 3))
+    return store
+
+def assert_indexes_match_fresh(store):
+    """Check the indexes of store against indexes built from scratch"""
+    search, facets, mirrors = SearchIndex(store), FacetIndex(store), MirrorIndex(store)
+    for query in ['be', 'bein', 'spo', 'news hd', 'الجزيرة', 'a', 'cnn 1', 'ber spotrs']:
+        assert store.search(query) == search.search(query), query
+        assert store.fuzzy_search(query) == search.fuzzy_search(query), query
+    assert store.search_index._sorted_tokens == search._sorted_tokens
+    assert store.facet_counts() == facets.counts()
+    for selection in ({GROUP: {'A'}, COUNTRY: {'US'}}, {HEALTH: {HEALTH_ONLINE}}, {QUALITY: {'HD'}}):
+        assert store.filter(selection) == facets.filter(selection)
+    for row in range(0, len(store), 7):
+        channel = store[row]
+        assert store.mirrors(channel) == mirrors.mirrors(channel.tvg_id, channel.name)
+        assert row in store.mirrors(channel)
+
+def test_channel_view():
+    store = ChannelStore.from_channels([
+        Channel("CNN", "http://cnn", "http://logos/cnn.png", "News", "HD", "cnn.us",
+                {'tvg-id': 'cnn.us', 'catchup': 'default', 'group-title': 'News'}),
+        Channel("Plain", "http://plain"),
+    ])
+    channel = store[0]
+    assert (channel.name, channel.url, channel.logo, channel.group, channel.quality, channel.tvg_id) == (
+        "CNN", "http://cnn", "http://logos/cnn.png", "News", "HD", "cnn.us")
+    assert channel.row == 0 and channel.store is store
+    assert channel.get('catchup') == 'default'
+    assert channel.attributes == {'catchup': 'default', 'tvg-id': 'cnn.us',
+                                  'tvg-logo': 'http://logos/cnn.png', 'group-title': 'News'}
+    assert Channel.from_dict(channel.to_dict()).to_dict() == channel.to_dict()
+    assert store[1].quality == "" and store[1].get('catchup') == ""
+    assert store.groups == {"News", ""}
+
+def test_qualities_are_allocated_on_first_use():
+    store = ChannelStore.from_channels([Channel("A", "http://a"), Channel("B", "http://b")])
+    assert store.qualities is None
+    store.append_channel(Channel("C", "http://c", quality="4K"))
+    assert store.qualities == ['', '', '4K']
+    assert [channel.quality for channel in store] == ['', '', '4K']
+
+def test_extend_remaps_groups_and_qualities():
+    first = ChannelStore.from_channels([Channel("A", "http://a", group="G1")])
+    second = ChannelStore.from_channels([Channel("B", "http://b", group="G2", quality="SD"),
+                                         Channel("C", "http://c", group="G1")])
+    first.extend(second)
+    assert [(channel.name, channel.group, channel.quality) for channel in first] == [
+        ("A", "G1", ""), ("B", "G2", "SD"), ("C", "G1", "")]
+
+def test_remove_shifts_rows():
+    store = ChannelStore.from_channels([Channel("A", "http://a"), Channel("B", "http://b", quality="HD"),
+                                        Channel("C", "http://c")])
+    store.set_health([(2, HEALTH_ONLINE, 5, 0)])
+    store.remove(0)
+    assert [channel.name for channel in store] == ["B", "C"]
+    assert store.quality_of(0) == "HD"
+    assert store.health_of(1) == (HEALTH_ONLINE, 5, 0)
+    assert store.find_url("http://c") == 1
+
+@pytest.mark.parametrize('removals', [1, 200])
+def test_remove_updates_the_indexes(removals):
+    store = random_store()
+    store.search_index.update()
+    store.facet_index.update()
+    store.mirror_index.update()
+    indexes = (store.search_index, store.facet_index, store.mirror_index)
+    
+    rng = random.Random(removals)
+    for _ in range(removals):
+        store.remove(rng.randrange(len(store)))
+    # The indexes are kept, not rebuilt
+    assert (store.search_index, store.facet_index, store.mirror_index) == indexes
+    assert_indexes_match_fresh(store)
+    
+    for row in range(20):
+        store.append(f"late bein {row}", f"http://late/{row}", group="E", tvg_id='x')
+    assert_indexes_match_fresh(store)
+
+def test_remove_last_row_of_a_group_and_word():
+    store = ChannelStore.from_channels([Channel("Unique words", "http://a", group="Only"),
+                                        Channel("Other", "http://b", group="Rest")])
+    store.search_index.update()
+    store.remove(0)
+    assert store.search("unique") == []
+    assert store.search("only") == []
+    assert store.search("other") == [0]
+    assert store.fuzzy_search("uniqe") == []
+
+def test_groups_follow_appends_and_removals():
+    store = ChannelStore.from_channels([Channel("A", "http://a", group="G1"), Channel("B", "http://b", group="G2")])
+    assert store.groups == {"G1", "G2"}
+    store.remove(1)
+    assert store.groups == {"G1"}
+    store.append("C", "http://c", group="G2")
+    assert store.groups == {"G1", "G2"}
+    store.extend(ChannelStore.from_channels([Channel("D", "http://d", group="G3")]))
+    assert store.groups == {"G1", "G2", "G3"}
+    store.clear()
+    assert store.groups == set()
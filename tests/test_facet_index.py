@@ -0,0 +1,82 @@
+import pytest
+
+from core.channel_store import Channel, ChannelStore
+from core.facet_index import (GROUP, COUNTRY, LANGUAGE, QUALITY, CATCHUP, HEALTH, HEALTH_ONLINE,
+                              HEALTH_OFFLINE, HEALTH_TIMEOUT, HEALTH_UNCHECKED, parse_quality, has_catchup)
+
+@pytest.fixture
+def store():
+    return ChannelStore.from_channels([
+        Channel("beIN Sports 1 FHD", "http://streams/0", group="Sports",
+                attributes={'tvg-country': 'QA;AE', 'tvg-language': 'Arabic', 'catchup': 'default'}),
+        Channel("CNN HD", "http://streams/1", group="News",
+                attributes={'tvg-country': 'US', 'tvg-language': 'English'}),
+        Channel("Film", "http://streams/2", group="Movies", quality="4K",
+                attributes={'tvg-country': 'us'}),
+        # The saved quality wins over the name
+        Channel("Old 720p Movie", "http://streams/3", group="Movies", quality="SD"),
+        Channel("Kids SD", "http://streams/4", group="Kids",
+                attributes={'tvg-language': 'Arabic, English', 'tvg-rec': '3'}),
+        # Saved qualities that are no label fall back to the name
+        Channel("Mystery", "http://streams/5", group="Movies", quality="best"),
+    ])
+
+def test_counts(store):
+    counts = store.facet_counts()
+    assert counts[GROUP] == {'Sports': 1, 'News': 1, 'Movies': 3, 'Kids': 1}
+    assert counts[COUNTRY] == {'QA': 1, 'AE': 1, 'US': 2}
+    assert counts[LANGUAGE] == {'Arabic': 2, 'English': 2}
+    assert counts[QUALITY] == {'FHD': 1, 'HD': 1, '4K': 1, 'SD': 2}
+    assert counts[CATCHUP] == {True: 2, False: 4}
+    assert counts[HEALTH] == {HEALTH_ONLINE: 0, HEALTH_TIMEOUT: 0, HEALTH_OFFLINE: 0, HEALTH_UNCHECKED: 6}
+
+def test_counts_ignore_the_selection_of_their_own_facet(store):
+    counts = store.facet_counts({GROUP: {'Movies'}, QUALITY: {'SD'}})
+    assert counts[GROUP] == {'Sports': 0, 'News': 0, 'Movies': 1, 'Kids': 1}
+    assert counts[QUALITY] == {'FHD': 0, 'HD': 0, '4K': 1, 'SD': 1}
+    assert counts[COUNTRY] == {'QA': 0, 'AE': 0, 'US': 0}
+
+@pytest.mark.parametrize('selection, rows', [
+    ({}, [0, 1, 2, 3, 4, 5]),
+    ({GROUP: {'Movies'}, QUALITY: {'SD', '4K'}}, [2, 3]),
+    ({COUNTRY: {'US'}, CATCHUP: {False}}, [1, 2]),
+    ({LANGUAGE: {'English'}, GROUP: set()}, [1, 4]),
+    ({COUNTRY: {'FR'}}, []),
+])
+def test_filter(store, selection, rows):
+    assert store.filter(selection) == rows
+
+def test_health_changes_move_rows(store):
+    store.facet_index.update()
+    store.set_health([(1, HEALTH_ONLINE, 10, 0), (4, HEALTH_OFFLINE, 0, 0)])
+    assert store.filter({HEALTH: {HEALTH_ONLINE}}) == [1]
+    store.set_health([(1, HEALTH_TIMEOUT, 0, 0)])
+    assert store.filter({HEALTH: {HEALTH_ONLINE, HEALTH_TIMEOUT}}) == [1]
+    assert store.facet_counts()[HEALTH] == {HEALTH_ONLINE: 0, HEALTH_TIMEOUT: 1, HEALTH_OFFLINE: 1,
+                                            HEALTH_UNCHECKED: 4}
+
+def test_rows_appended_after_indexing_are_counted(store):
+    assert store.facet_counts()[QUALITY]['HD'] == 1
+    store.append("Movie", "http://streams/6", group="Movies", quality="HD")
+    assert store.facet_counts()[QUALITY]['HD'] == 2
+    assert store.filter({GROUP: {'Movies'}, QUALITY: {'HD'}}) == [6]
+
+@pytest.mark.parametrize('name, quality', [
+    ("beIN Sports 1080p", "FHD"),
+    ("Movies UHD", "4K"),
+    ("News SD HD", "HD"),  # The best of several
+    ("HDTV", ""),
+    ("Channel 4", ""),
+])
+def test_parse_quality(name, quality):
+    assert parse_quality(name) == quality
+
+@pytest.mark.parametrize('attributes, expected', [
+    ({'catchup': 'default'}, True),
+    ({'catchup': 'No'}, False),
+    ({'catchup-days': '0'}, False),
+    ({'catchup-days': 'x', 'timeshift': '2'}, True),
+    ({}, False),
+])
+def test_has_catchup(attributes, expected):
+    assert has_catchup(attributes) == expected
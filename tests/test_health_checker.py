@@ -0,0 +1,146 @@
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+import requests
+from PyQt6.QtCore import QCoreApplication
+
+from core.channel_store import Channel, ChannelStore
+from core.facet_index import HEALTH_ONLINE, HEALTH_OFFLINE, HEALTH_TIMEOUT
+from core.health_checker import HealthChecker, probe
+
+# Seconds the stub server takes to answer /slow, longer than the read timeout
+SLOW_DELAY = 1.5
+TIMEOUT = (1, 0.5)
+
+MASTER_PLAYLIST = (b"#EXTM3U\n"
+                   b"#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360\nlow.m3u8\n"
+                   b"#EXT-X-STREAM-INF:BANDWIDTH=2500000,RESOLUTION=1280x720\nhigh.m3u8\n")
+MEDIA_PLAYLIST = b"#EXTM3U\n#EXT-X-TARGETDURATION:4\n#EXTINF:4.0,\nsegment0.ts\n"
+SEGMENT_SIZE = 1000000  # 1 MB per 4 s segment: 2000 kbit/s
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves the stream URLs the tests check"""
+    
+    def do_HEAD(self):
+        self._answer(body=False)
+    
+    def do_GET(self):
+        self._answer(body=True)
+    
+    def _answer(self, body):
+        if self.path.startswith('/slow'):
+            time.sleep(SLOW_DELAY)
+            self._send(200, b"", 'video/mp2t', body)
+        elif self.path == '/live.ts':
+            self._send(200, b"", 'video/mp2t', body)
+        elif self.path == '/master.m3u8':
+            self._send(200, MASTER_PLAYLIST, 'application/vnd.apple.mpegurl', body)
+        elif self.path == '/media.m3u8':
+            self._send(200, MEDIA_PLAYLIST, 'application/vnd.apple.mpegurl', body)
+        elif self.path == '/segment0.ts':
+            self.send_response(200)
+            self.send_header('Content-Type', 'video/mp2t')
+            self.send_header('Content-Length', str(SEGMENT_SIZE))
+            self.end_headers()
+        else:
+            self._send(404, b"Not found", 'text/plain', body)
+    
+    def _send(self, status, data, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if body:
+            try:
+                self.wfile.write(data)
+            except OSError:
+                pass
+    
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture(scope='module')
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+@pytest.fixture
+def session():
+    with requests.Session() as session:
+        yield session
+
+def make_store(urls):
+    return ChannelStore.from_channels([Channel(name=f"Channel {i}", url=url) for i, url in enumerate(urls)])
+
+def run_check(app, checker, store, rows=None, deadline=10):
+    """Check rows and spin the event loop until the checker finishes; returns {row: result}"""
+    results = {}
+    finished = []
+    checker.results_ready.connect(lambda batch: results.update((row, rest) for row, *rest in batch))
+    checker.finished.connect(lambda: finished.append(True))
+    checker.check(store, rows)
+    end = time.monotonic() + deadline
+    while not finished and time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.01)
+    assert finished, "check did not finish"
+    return results
+
+def test_probe_online(server, session):
+    status, latency, bitrate = probe(session, f"{server}/live.ts", TIMEOUT)
+    assert status == HEALTH_ONLINE
+    assert latency >= 0
+    assert bitrate == 0
+
+def test_probe_not_found(server, session):
+    assert probe(session, f"{server}/missing.ts", TIMEOUT)[0] == HEALTH_OFFLINE
+
+def test_probe_timeout(server, session):
+    assert probe(session, f"{server}/slow.ts", TIMEOUT)[0] == HEALTH_TIMEOUT
+
+def test_probe_master_playlist_bitrate(server, session):
+    assert probe(session, f"{server}/master.m3u8", TIMEOUT)[::2] == (HEALTH_ONLINE, 2500)
+
+def test_probe_media_playlist_bitrate(server, session):
+    status, _, bitrate = probe(session, f"{server}/media.m3u8", TIMEOUT)
+    assert status == HEALTH_ONLINE
+    assert bitrate == SEGMENT_SIZE * 8 // 4 // 1000
+
+def test_probe_missing_manifest(server, session):
+    assert probe(session, f"{server}/gone.m3u8", TIMEOUT)[0] == HEALTH_OFFLINE
+
+def test_check_reports_every_row(app, server):
+    store = make_store([f"{server}/live.ts", f"{server}/missing.ts", f"{server}/master.m3u8"])
+    checker = HealthChecker(max_workers=2, timeout=TIMEOUT)
+    try:
+        results = run_check(app, checker, store)
+    finally:
+        checker.shutdown()
+    assert {row: result[0] for row, result in results.items()} == {
+        0: HEALTH_ONLINE, 1: HEALTH_OFFLINE, 2: HEALTH_ONLINE}
+    assert results[2][2] == 2500
+    assert not checker.is_running()
+
+def test_check_after_cancel_while_workers_busy(app, server):
+    # Every worker is still probing for the cancelled check when the new one starts
+    store = make_store([f"{server}/slow{i}.ts" for i in range(4)] + [f"{server}/live.ts", f"{server}/missing.ts"])
+    checker = HealthChecker(max_workers=2, timeout=(1, SLOW_DELAY * 2))
+    try:
+        checker.check(store, range(4))
+        time.sleep(0.2)
+        checker.cancel()
+        results = run_check(app, checker, store, [4, 5])
+    finally:
+        checker.shutdown()
+    assert {row: result[0] for row, result in results.items()} == {4: HEALTH_ONLINE, 5: HEALTH_OFFLINE}
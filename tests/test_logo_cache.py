@@ -0,0 +1,108 @@
+import os
+import time
+import socket
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+from PyQt6.QtCore import QCoreApplication
+
+from core.logo_cache import LogoDiskCache
+from core.logo_loader import LogoLoader
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers /busy.png with a server error and anything else with 404"""
+    
+    def do_GET(self):
+        self.send_response(503 if self.path == '/busy.png' else 404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture(scope='module')
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+def closed_port():
+    """Get a local port nothing listens on"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def save(cache, name, data, seconds_ago=0):
+    """Save a thumbnail for http://logos/<name>, last used seconds_ago"""
+    url = f"http://logos/{name}"
+    cache.save(url, 24, data, {})
+    then = time.time() - seconds_ago
+    os.utime(cache._blob_path(hashlib.sha256(data).hexdigest()), (then, then))
+    return url
+
+def wait_idle(app, loader, deadline=10):
+    """Spin the event loop until the loader has no logo in flight"""
+    end = time.monotonic() + deadline
+    while loader._queued and time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.01)
+    assert not loader._queued, "logos still loading"
+
+def test_load_returns_the_saved_thumbnail(tmp_path):
+    cache = LogoDiskCache(str(tmp_path))
+    url = save(cache, "a.png", b"a" * 100)
+    data, entry = cache.load(url, 24)
+    assert data == b"a" * 100
+    assert cache.is_fresh(entry)
+    assert cache.load(url, 32) == (None, None)
+
+def test_eviction_removes_the_url_entries_of_evicted_thumbnails(tmp_path):
+    cache = LogoDiskCache(str(tmp_path), max_bytes=250)
+    old = save(cache, "old.png", b"o" * 100, seconds_ago=60)
+    # Another URL serving the same image shares the thumbnail
+    old_mirror = save(cache, "old-mirror.png", b"o" * 100, seconds_ago=60)
+    new = save(cache, "new.png", b"n" * 100)
+    newer = save(cache, "newer.png", b"m" * 100)
+    
+    assert cache.load(old, 24) == (None, None)
+    assert cache.load(newer, 24)[0] == b"m" * 100
+    entries = set(os.listdir(tmp_path / "urls"))
+    assert entries == {os.path.basename(cache._entry_path(url)) for url in (new, newer)}
+    assert os.path.basename(cache._entry_path(old_mirror)) not in entries
+
+def test_only_temporary_failures_are_retried(app, server, tmp_path):
+    missing = f"{server}/missing.png"
+    malformed = "http://"
+    busy = f"{server}/busy.png"
+    refused = f"http://127.0.0.1:{closed_port()}/logo.png"
+    loader = LogoLoader(disk_cache=LogoDiskCache(str(tmp_path)))
+    try:
+        loader.request([missing, malformed, busy, refused])
+        wait_idle(app, loader)
+        assert loader._failed[missing] is None
+        assert loader._failed[malformed] is None
+        assert loader._failed[busy] > time.monotonic()
+        assert loader._failed[refused] > time.monotonic()
+        
+        # Nothing is retried before RETRY_DELAY
+        loader.request([missing, busy, refused])
+        assert not loader._queued
+        wait_idle(app, loader)
+        
+        # RETRY_DELAY later
+        loader._failed[busy] = loader._failed[refused] = time.monotonic()
+        loader.request([missing, malformed, busy, refused])
+        assert loader._queued == {busy, refused}
+        wait_idle(app, loader)
+    finally:
+        loader.shutdown()
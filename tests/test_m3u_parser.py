@@ -0,0 +1,87 @@
+import codecs
+
+import pytest
+
+import core.m3u_parser as m3u_parser
+from core.m3u_parser import M3UParser, parse_extinf
+
+ENTRIES = [
+    '#EXTINF:-1 tvg-id="aljazeera.qa" tvg-logo="http://logos/aj.png" group-title="أخبار",الجزيرة',
+    'http://streams/aj.m3u8',
+    '#EXTINF:-1 tvg-country="US;CA" catchup="default" group-title="News",CNN HD',
+    'http://streams/cnn.ts',
+    '# A comment between entries',
+    '#EXTINF:0,No attributes',
+    'http://streams/plain.ts',
+    '#EXTINF:-1 group-title="Sports",beIN\x85Sports\x0b1',
+    'http://streams/bein.ts',
+    '#EXTINF:-1 group-title="Broken",Entry without URL',
+    '#EXTINF:-1 tvg-name="Ünïcödé" group-title="Movies",Film 4K',
+    'rtmp://streams/film',
+]
+
+def write_playlist(path, newline='\n', bom=False, copies=50):
+    """Write a playlist repeating ENTRIES copies times, with the given line ends"""
+    lines = ['#EXTM3U x-tvg-url="http://epg"']
+    for copy in range(copies):
+        lines.extend(line.replace('streams/', f'streams/{copy}/') for line in ENTRIES)
+    data = newline.join(lines).encode('utf-8')
+    path.write_bytes((codecs.BOM_UTF8 if bom else b'') + data + newline.encode())
+    return str(path)
+
+def columns(store):
+    """Get every column of a store, for comparing two parses"""
+    return (store.names, store.urls, store.logos, store.tvg_ids,
+            [store.group_of(row) for row in range(len(store))],
+            [store.extra_attributes(row) for row in range(len(store))])
+
+def parse_parallel(path, monkeypatch, chunks):
+    """Parse a small file in worker processes, as large files would be"""
+    monkeypatch.setattr(m3u_parser.os, 'cpu_count', lambda: 2)
+    parser = M3UParser()
+    parser.PARALLEL_MIN_SIZE = 0
+    parser.PARALLEL_CHUNK_SIZE = 1024
+    ranges, _, _ = parser._plan_parallel(path)
+    assert (len(ranges) > 1) == chunks
+    rows = list(parser.iter_file_rows(path, parallel=True))
+    assert rows == list(range(len(parser.channels)))
+    return parser.channels
+
+def test_parse_extinf():
+    duration, attributes, name = parse_extinf(
+        '#EXTINF:-1 tvg-id="a.b" tvg-name=bare group-title="News, World",Name, with comma')
+    assert duration == '-1'
+    assert attributes == {'tvg-id': 'a.b', 'tvg-name': 'bare', 'group-title': 'News, World'}
+    assert name == 'Name, with comma'
+    assert parse_extinf('#EXTINF:abc,Name') is None
+
+def test_serial_parse(tmp_path):
+    parser = M3UParser()
+    assert parser.load_from_file(write_playlist(tmp_path / 'list.m3u', copies=1))
+    channels = parser.channels
+    assert channels.names == ['الجزيرة', 'CNN HD', 'No attributes', 'beIN\x85Sports\x0b1', 'Film 4K']
+    assert channels.group_of(0) == 'أخبار'
+    assert channels.group_of(2) == 'Unknown'
+    assert channels[0].logo == 'http://logos/aj.png'
+    assert channels[1].get('tvg-country') == 'US;CA'
+    assert channels[4].attributes['tvg-name'] == 'Ünïcödé'
+
+@pytest.mark.parametrize('newline, bom', [('\n', False), ('\r\n', False), ('\r\n', True), ('\r', True)])
+def test_parallel_parse_matches_serial(tmp_path, monkeypatch, newline, bom):
+    path = write_playlist(tmp_path / 'list.m3u', newline, bom)
+    serial = M3UParser()
+    assert serial.load_from_file(path)
+    assert len(serial.channels) == 5 * 50
+    # Files are split at "\n#EXTINF"; one with \r line ends is parsed as one chunk
+    parallel = parse_parallel(path, monkeypatch, chunks='\n' in newline)
+    assert columns(parallel) == columns(serial.channels)
+
+def test_failed_load_keeps_channels(tmp_path):
+    parser = M3UParser()
+    assert parser.load_from_file(write_playlist(tmp_path / 'list.m3u', copies=1))
+    channels = parser.channels
+    invalid = tmp_path / 'invalid.m3u'
+    invalid.write_text('#EXTINF:-1,No header\nhttp://streams/x\n')
+    assert not parser.load_from_file(str(invalid))
+    assert not parser.load_from_file(str(tmp_path / 'missing.m3u'))
+    assert parser.channels is channels
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt6.QtWidgets import QApplication
+
+from core.player import STATE_ERROR
+from ui.player_widget import PlayerWidget
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def widget(app, tmp_path, monkeypatch):
+    """A PlayerWidget whose player records the URLs played instead of opening them"""
+    monkeypatch.chdir(tmp_path)
+    widget = PlayerWidget()
+    widget.vlc_available = True
+    player = widget.player
+    player.media_player = object()
+    widget.played = []
+    monkeypatch.setattr(player, 'play', lambda url: widget.played.append(url) or True)
+    yield widget
+    widget.deleteLater()
+
+def fail(player):
+    """Feed the player the libVLC error event of its active stream"""
+    player._on_vlc_event(player.media_player, ('state', STATE_ERROR))
+
+def test_error_is_shown_when_no_other_source_starts(widget):
+    widget.play("http://streams/main", "Channel")
+    fail(widget.player)
+    assert widget.channel_label.text() == "Error: Playback failed"
+
+def test_mirror_started_on_failure_clears_the_error(widget):
+    # As MainWindow does when the channel has mirrors
+    widget.playback_failed.connect(lambda: widget.play("http://streams/mirror", "Channel"))
+    widget.play("http://streams/main", "Channel")
+    fail(widget.player)
+    assert widget.played == ["http://streams/main", "http://streams/mirror"]
+    assert widget.channel_label.text() == "Channel"
+    assert "#ff5555" not in widget.channel_label.styleSheet()
@@ -0,0 +1,73 @@
+import os
+
+from core.channel_store import Channel, ChannelStore, EXTRAS_SEPARATOR
+from core.playlist_cache import PlaylistCache
+
+def make_store():
+    return ChannelStore.from_channels([
+        Channel("الجزيرة", "http://streams/aj", "http://logos/aj.png", "أخبار", tvg_id="aj.qa",
+                attributes={'tvg-country': 'QA', 'catchup': 'default', 'tvg-name': 'Al Jazeera'}),
+        Channel("CNN", "http://streams/cnn", group="News", quality="HD"),
+        Channel("Plain", "http://streams/plain"),
+        Channel("Film", "http://streams/film", group="Movies", quality="4K",
+                attributes={'tvg-rec': '3'}),
+    ])
+
+def snapshot(store):
+    """Get every field of every row, for comparing two stores"""
+    return [(channel.to_dict(), store.quality_of(channel.row)) for channel in store]
+
+def save_and_load(tmp_path, store, name="list.m3u"):
+    playlist = tmp_path / name
+    playlist.write_text("#EXTM3U\n")
+    cache = PlaylistCache(str(tmp_path / "cache"))
+    cache.save_file(str(playlist), store)
+    return cache.load_file(str(playlist))
+
+def test_round_trip_keeps_every_column(tmp_path):
+    store = make_store()
+    loaded = save_and_load(tmp_path, store)
+    assert loaded is not None
+    assert snapshot(loaded) == snapshot(store)
+    assert loaded.groups == store.groups
+    assert loaded[0].get('catchup') == 'default'
+    assert loaded.qualities == ['', 'HD', '', '4K']
+
+def test_round_trip_of_a_loaded_store(tmp_path):
+    # Extras of a loaded store are still packed strings
+    loaded = save_and_load(tmp_path, make_store())
+    again = save_and_load(tmp_path, loaded, "again.m3u")
+    assert snapshot(again) == snapshot(make_store())
+
+def test_round_trip_without_qualities(tmp_path):
+    store = ChannelStore.from_channels([Channel("A", "http://a"), Channel("B", "http://b")])
+    loaded = save_and_load(tmp_path, store)
+    assert loaded.qualities is None
+    assert [channel.quality for channel in loaded] == ['', '']
+
+def test_empty_store(tmp_path):
+    assert len(save_and_load(tmp_path, ChannelStore())) == 0
+
+def test_values_with_separators_are_not_cached(tmp_path):
+    for channel in (Channel("Bad\x00name", "http://a"),
+                    Channel("A", "http://a", attributes={'tvg-name': f"x{EXTRAS_SEPARATOR}y"}),
+                    Channel("A", "http://a", quality="H\x00D")):
+        assert save_and_load(tmp_path, ChannelStore.from_channels([channel])) is None
+
+def test_changed_file_is_not_loaded(tmp_path):
+    playlist = tmp_path / "list.m3u"
+    playlist.write_text("#EXTM3U\n")
+    cache = PlaylistCache(str(tmp_path / "cache"))
+    cache.save_file(str(playlist), make_store())
+    playlist.write_text("#EXTM3U\n#EXTINF:-1,New\nhttp://new\n")
+    assert cache.load_file(str(playlist)) is None
+
+def test_damaged_entry_is_ignored(tmp_path):
+    playlist = tmp_path / "list.m3u"
+    playlist.write_text("#EXTM3U\n")
+    cache = PlaylistCache(str(tmp_path / "cache"))
+    cache.save_file(str(playlist), make_store())
+    path = cache._entry_path(os.path.abspath(playlist))
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 10)
+    assert cache.load_file(str(playlist)) is None
@@ -0,0 +1,129 @@
+import random
+
+import pytest
+
+from core.channel_store import Channel, ChannelStore
+from core.search_engine import narrows
+from core.text_utils import fold_text
+
+NAMES = [
+    ("beIN Sports 1 HD", "Sports"),
+    ("beIN Sports 2", "Sports"),
+    ("Al Jazeera", "أخبار"),
+    ("الجزيرة الإخبارية", "أخبار"),
+    ("قناة الأطفال", "Kids"),
+    ("Café Télé", "France"),
+    ("X-Men: Evolution", "Kids"),
+    ("CNN International", "News"),
+    ("MBC 1", "MBC"),
+    ("MBC Drama+", "MBC"),
+]
+
+@pytest.fixture
+def store():
+    return ChannelStore.from_channels([Channel(name, f"http://streams/{row}", group=group)
+                                       for row, (name, group) in enumerate(NAMES)])
+
+def brute_force(store, query, rows=None):
+    """Rows whose folded name or group contains the folded query"""
+    query = fold_text(query)
+    rows = range(len(store)) if rows is None else rows
+    return [row for row in rows
+            if query in fold_text(store.names[row]) or query in fold_text(store.group_of(row))]
+
+@pytest.mark.parametrize('query, expected', [
+    ("bein", [0, 1]),
+    ("SPORTS 2", [1]),
+    ("ein sp", [0, 1]),
+    ("jazeera", [2]),
+    ("الجزيره", [3]),  # Taa marbuta and haa fold together
+    ("الاطفال", [4]),  # So do the hamza forms of alef
+    ("cafe tele", [5]),
+    ("x-men", [6]),
+    ("men:", [6]),
+    ("news", [7]),  # Group name
+    ("أخبار", [2, 3]),
+    ("drama+", [9]),
+    ("nothing", []),
+])
+def test_search(store, query, expected):
+    assert store.search(query) == expected
+
+@pytest.mark.parametrize('query', ["b", "1", "n", "ma", "s ", " 1", "+", "ال", "é"])
+def test_short_queries_match_substrings(store, query):
+    assert store.search(query) == brute_force(store, query)
+
+def test_empty_query_matches_everything(store):
+    assert store.search("  ") == list(range(len(NAMES)))
+    assert store.search("", [3, 1]) == [3, 1]
+
+def test_search_within_rows(store):
+    assert store.search("bein", [1, 2, 3]) == [1]
+    # Large restrictions merge postings instead of checking rows one by one
+    store.search_index.FILTER_MAX_ROWS = 0
+    assert store.search("sports", [1, 2, 3]) == [1]
+
+def test_rows_appended_after_indexing_are_found(store):
+    assert store.search("bein") == [0, 1]
+    store.append("beIN Sports 3", "http://streams/new", group="Sports")
+    assert store.search("bein") == [0, 1, len(NAMES)]
+    assert store.rows_for_group("Sports") == [0, 1, len(NAMES)]
+
+def test_search_matches_brute_force_on_random_names():
+    rng = random.Random(7)
+    words = ['bein', 'sports', 'news', 'الجزيرة', 'hd', 'kids', 'a', 'x-men', '1', '12']
+    store = ChannelStore()
+    for row in range(2000):
+        store.append(' '.join(rng.sample(words, 3)), f"http://streams/{row}",
+                     group=rng.choice(['Arab News', 'Sport', 'Kids TV', '']))
+    rows = list(range(0, 2000, 3))
+    for query in ['a', 'e', '12', 'x-', 's k', 'ws', 'ار', 'ne', 'ts 1', 'tv', 'bein sports', 'rts h']:
+        assert store.search(query) == brute_force(store, query), query
+        assert store.search(query, rows) == brute_force(store, query, rows), query
+
+@pytest.mark.parametrize('previous, query, expected', [
+    ("bein", "bein sports", True),
+    ("b", "be", True),
+    ("sports", "bein", False),
+    (" ", "bein", False),
+])
+def test_narrows(previous, query, expected):
+    assert narrows(previous, query) == expected
+
+@pytest.mark.parametrize('query, best', [
+    ("bein sports 2", 1),
+    ("bien sprots", 1),  # Typos; ties go to the shorter name
+    ("aljazera", 2),  # Two words typed without a space
+    ("الجزيره", 3),
+    ("internatonal", 7),
+    ("mbc dramma", 9),
+])
+def test_fuzzy_search_ranks_the_closest_name_first(store, query, best):
+    assert store.fuzzy_search(query)[0] == best
+
+def test_fuzzy_search_ranking():
+    store = ChannelStore.from_channels([Channel(name, f"http://streams/{row}") for row, name in enumerate([
+        "Sports Extra", "Sport", "Sports", "beIN Sportsnet", "Supersports", "Spurts", "News"])])
+    # The same word, words starting with it, words containing it, then typos
+    assert store.fuzzy_search("sports") == [2, 0, 3, 4, 1, 5]
+    assert store.fuzzy_search("sports", limit=2) == [2, 0]
+    assert store.fuzzy_search("sports", [5, 3, 6]) == [3, 5]
+    assert store.fuzzy_search("qwzrt") == []
+
+def test_fuzzy_search_keeps_store_order_among_many_equal_rows():
+    store = ChannelStore.from_channels([Channel("Sports " + "x" * (row % 7), f"http://streams/{row}")
+                                        for row in range(300)])
+    store.search_index.FUZZY_RANK_ROWS = 100
+    assert store.fuzzy_search("sports") == list(range(200))
+    assert store.fuzzy_search("sports", list(range(250))) == list(range(200))
+    store.search_index.FUZZY_RANK_ROWS = 1000
+    assert store.fuzzy_search("sports", limit=3) == [0, 7, 14]
+
+def test_fuzzy_search_prunes_common_prefixes():
+    store = ChannelStore.from_channels([Channel(f"Sports{row}", f"http://streams/{row}") for row in range(20)]
+                                       + [Channel("Sportz", "http://streams/typo")])
+    # Eight words starting with the query leave no room for the misspelled one
+    store.search_index.update()
+    assert len(store.search_index._similar_tokens("sports")) == store.search_index.FUZZY_WORD_MATCHES
+    assert 20 not in store.fuzzy_search("sports")
+    assert store.fuzzy_search("sportx")[0] == 20
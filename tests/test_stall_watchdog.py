@@ -0,0 +1,177 @@
+from core.stall_watchdog import StallWatchdog, STALLED, RECONNECT, RECOVERED, GAVE_UP
+
+def make_watchdog(**options):
+    options.setdefault('stall_timeout', 8)
+    options.setdefault('startup_timeout', 20)
+    options.setdefault('base_delay', 1)
+    options.setdefault('max_delay', 30)
+    options.setdefault('max_attempts', 8)
+    options.setdefault('stable_time', 30)
+    return StallWatchdog(**options)
+
+def play(watchdog, start, end):
+    """Feed a stream that plays smoothly from start to end (seconds); returns the actions"""
+    actions = []
+    for now in range(start, end + 1):
+        actions.append(watchdog.time_changed(now * 1000, now))
+        actions.append(watchdog.data_read(now * 100000, now))
+        actions.append(watchdog.poll(now))
+    return [action for action in actions if action]
+
+def poll_until(watchdog, start, end):
+    """Poll every 0.5 s from start to end; returns [(time, action)] of the actions"""
+    actions = []
+    now = start
+    while now <= end:
+        action = watchdog.poll(now)
+        if action:
+            actions.append((now, action))
+        now += 0.5
+    return actions
+
+def start_playing(watchdog, now=0):
+    watchdog.start(live=True, now=now)
+    watchdog.playing(now)
+
+def test_smooth_playback_never_stalls():
+    watchdog = make_watchdog()
+    start_playing(watchdog)
+    assert play(watchdog, 0, 120) == []
+    assert watchdog.counters()['stalls'] == 0
+
+def test_stall_detected_after_timeout():
+    watchdog = make_watchdog()
+    start_playing(watchdog)
+    play(watchdog, 0, 10)
+    # Time and data stop at 10 s
+    assert poll_until(watchdog, 10.5, 18) == []
+    assert poll_until(watchdog, 18.5, 18.5) == [(18.5, STALLED)]
+    assert watchdog.is_stalled()
+    assert watchdog.delay == 1
+
+def test_data_arriving_doubles_the_timeout():
+    watchdog = make_watchdog()
+    start_playing(watchdog)
+    play(watchdog, 0, 10)
+    for now in range(11, 26):
+        watchdog.data_read(now * 100000, now)
+        assert watchdog.poll(now) is None
+    watchdog.data_read(2600000, 26)
+    assert watchdog.poll(26.5) == STALLED
+
+def test_startup_timeout_before_first_play():
+    watchdog = make_watchdog()
+    watchdog.start(now=0)
+    assert poll_until(watchdog, 0, 20) == []
+    assert watchdog.poll(20.5) == STALLED
+
+def test_backoff_doubles_up_to_max_delay():
+    watchdog = make_watchdog(max_delay=10, max_attempts=10)
+    start_playing(watchdog)
+    play(watchdog, 0, 10)
+    now = 19
+    assert watchdog.poll(now) == STALLED
+    delays = []
+    for _ in range(6):
+        delays.append(watchdog.delay)
+        assert watchdog.poll(now + watchdog.delay - 0.1) is None
+        now += watchdog.delay
+        assert watchdog.poll(now) == RECONNECT
+        # The reopened stream fails right away
+        assert watchdog.failed(now + 0.5) == STALLED
+        now += 0.5
+    assert delays == [1, 2, 4, 8, 10, 10]
+    assert watchdog.reconnects == 6
+    assert watchdog.stalls == 1
+
+def test_recovery_after_reconnect():
+    watchdog = make_watchdog()
+    start_playing(watchdog)
+    play(watchdog, 0, 10)
+    assert watchdog.poll(19) == STALLED
+    assert watchdog.poll(20) == RECONNECT
+    watchdog.playing(21)
+    assert watchdog.time_changed(0, 21) == RECOVERED
+    assert not watchdog.is_stalled()
+    assert watchdog.last_downtime == 2
+    assert watchdog.counters() == {'stalls': 1, 'reconnects': 1, 'recoveries': 1, 'failures': 0, 'downtime': 2.0}
+
+def test_stable_playback_resets_the_backoff():
+    watchdog = make_watchdog()
+    start_playing(watchdog)
+    play(watchdog, 0, 10)
+    assert watchdog.poll(19) == STALLED
+    assert watchdog.poll(20) == RECONNECT
+    assert watchdog.time_changed(0, 21) == RECOVERED
+    assert watchdog.attempts == 1
+    
+    # A stall soon after the recovery keeps backing off
+    play(watchdog, 21, 25)
+    assert watchdog.poll(34) == STALLED
+    assert watchdog.delay == 2
+    assert watchdog.poll(36) == RECONNECT
+    assert watchdog.time_changed(0, 37) == RECOVERED
+    
+    # Playing stable_time after it starts over from base_delay
+    play(watchdog, 37, 70)
+    assert watchdog.attempts == 0
+    assert watchdog.poll(79) == STALLED
+    assert watchdog.delay == 1
+
+def test_gives_up_after_max_attempts():
+    watchdog = make_watchdog(max_attempts=3)
+    start_playing(watchdog)
+    play(watchdog, 0, 10)
+    actions = poll_until(watchdog, 11, 19)
+    now = 19
+    for _ in range(3):
+        now += watchdog.delay
+        actions.append((now, watchdog.poll(now)))
+        actions.append((now + 0.5, watchdog.failed(now + 0.5)))
+        now += 0.5
+    assert [action for _, action in actions] == [STALLED, RECONNECT, STALLED, RECONNECT, STALLED, RECONNECT, GAVE_UP]
+    assert watchdog.counters()['failures'] == 1
+    assert poll_until(watchdog, now, now + 100) == []
+
+def test_zero_attempts_gives_up_at_once():
+    watchdog = make_watchdog(max_attempts=0)
+    start_playing(watchdog)
+    play(watchdog, 0, 5)
+    assert watchdog.ended(6) == GAVE_UP
+    assert watchdog.reconnects == 0
+
+def test_live_end_stalls_at_once():
+    watchdog = make_watchdog()
+    start_playing(watchdog)
+    play(watchdog, 0, 5)
+    assert watchdog.ended(6) == STALLED
+    assert watchdog.poll(7) == RECONNECT
+
+def test_on_demand_end_is_not_a_stall():
+    watchdog = make_watchdog()
+    watchdog.start(live=False, now=0)
+    watchdog.playing(0)
+    play(watchdog, 0, 5)
+    assert watchdog.ended(6) is None
+    assert poll_until(watchdog, 6, 100) == []
+
+def test_error_before_playing_is_left_to_the_caller():
+    watchdog = make_watchdog()
+    watchdog.start(now=0)
+    assert watchdog.failed(1) is None
+
+def test_pause_is_not_a_stall():
+    watchdog = make_watchdog()
+    start_playing(watchdog)
+    play(watchdog, 0, 5)
+    watchdog.paused()
+    assert poll_until(watchdog, 6, 100) == []
+    watchdog.playing(100)
+    assert play(watchdog, 101, 120) == []
+
+def test_stop_stops_watching():
+    watchdog = make_watchdog()
+    start_playing(watchdog)
+    play(watchdog, 0, 5)
+    watchdog.stop()
+    assert poll_until(watchdog, 6, 100) == []
@@ -0,0 +1,120 @@
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt6.QtGui import QPixmap, QColor
+
+from core.channel_store import ChannelStore
+from core.facet_index import HEALTH_ONLINE, HEALTH_OFFLINE, HEALTH_TIMEOUT, HEALTH_TEXTS
+from core.language_manager import tr
+
+class ChannelListModel(QAbstractListModel):
+    """List model over a subset of the rows of a ChannelStore.
+    
+    The model only holds an index array of store rows. Names, tooltips and
+    icons are produced in data() when the view asks for them, which for a
+    view with fixed row heights means only for the visible rows.
+    Filtering replaces the index array with a model reset.
+    
+    Logos are not loaded by the model; icons come from the pixmaps already
+    loaded by the LogoLoader, and a blank icon stands in until then so all
+    rows keep the same size.
+    """
+    
+    # Role returning a Channel view of the row
+    ChannelRole = Qt.ItemDataRole.UserRole
+    
+    # Channels whose stream did not answer the last health check are dimmed
+    DEAD_COLOR = QColor("#808080")
+    
+    def __init__(self, logo_loader=None, icon_size=24, parent=None):
+        super().__init__(parent)
+        
+        self._store = ChannelStore()
+        self._rows = []
+        self._logo_loader = logo_loader
+        
+        self._placeholder = QPixmap(icon_size, icon_size)
+        self._placeholder.fill(Qt.GlobalColor.transparent)
+    
+    @property
+    def store(self):
+        """The ChannelStore the model reads from"""
+        return self._store
+    
+    @property
+    def rows(self):
+        """Store rows shown by the model, in display order"""
+        return self._rows
+    
+    def set_rows(self, store, rows):
+        """Show the given rows of a store, replacing the current ones"""
+        self.beginResetModel()
+        self._store = store
+        self._rows = list(rows)
+        self.endResetModel()
+    
+    def append_rows(self, rows):
+        """Append store rows to the end of the model"""
+        rows = list(rows)
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+    
+    def channel(self, index):
+        """Get the Channel shown at a model index, or None"""
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        return self._store.channel(self._rows[index.row()])
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        
+        row = self._rows[index.row()]
+        store = self._store
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            return store.names[row]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            tooltip = f"{tr('Group:')} {store.group_of(row) or tr('Unknown')}"
+            quality = store.quality_of(row)
+            if quality:
+                tooltip += f"\n{tr('Quality:')} {quality}"
+            status, latency, bitrate = store.health_of(row)
+            if status in (HEALTH_ONLINE, HEALTH_OFFLINE, HEALTH_TIMEOUT):
+                tooltip += f"\n{tr('Status:')} {tr(HEALTH_TEXTS[status])}"
+                if status == HEALTH_ONLINE:
+                    tooltip += f", {latency} ms"
+                    if bitrate:
+                        tooltip += f", {bitrate} kb/s"
+            return tooltip
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if store.health_of(row)[0] in (HEALTH_OFFLINE, HEALTH_TIMEOUT):
+                return self.DEAD_COLOR
+            return None
+        if role == Qt.ItemDataRole.DecorationRole:
+            logo = store.logos[row]
+            pixmap = self._logo_loader.pixmap(logo) if logo and self._logo_loader else None
+            return pixmap if pixmap is not None else self._placeholder
+        if role == self.ChannelRole:
+            return store.channel(row)
+        return None
+    
+    def logos_changed(self):
+        """Repaint the icons after new logos were loaded"""
+        if self._rows:
+            # The view only repaints the rows it shows
+            self.dataChanged.emit(self.index(0), self.index(len(self._rows) - 1),
+                                  [Qt.ItemDataRole.DecorationRole])
+    
+    def health_changed(self):
+        """Repaint the rows after new stream health check results"""
+        if self._rows:
+            self.dataChanged.emit(self.index(0), self.index(len(self._rows) - 1),
+                                  [Qt.ItemDataRole.ForegroundRole, Qt.ItemDataRole.ToolTipRole])
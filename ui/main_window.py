@@ -2,7 +2,7 @@ import os
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                            QTabWidget, QPushButton, QLineEdit, QComboBox,
                            QLabel, QToolBar, QMenu, QMenuBar, QStatusBar,
-                           QMessageBox, QFileDialog)
+                           QMessageBox, QFileDialog, QProgressBar, QCheckBox)
 from PyQt6.QtGui import QIcon, QAction, QActionGroup
 from PyQt6.QtCore import Qt, QSize, QTranslator, QEvent
 
@@ -10,6 +10,13 @@ from ui.player_widget import PlayerWidget
 from ui.playlist_widget import PlaylistWidget
 from ui.dialogs import AddPlaylistDialog, AboutDialog, URLInputDialog
 from core.m3u_parser import M3UParser
+from core.playlist_cache import PlaylistCache
+from core.playlist_loader import PlaylistLoader
+from core.logo_loader import LogoLoader
+from core.facet_index import (GROUP, COUNTRY, LANGUAGE, QUALITY, CATCHUP, HEALTH, QUALITIES,
+                              HEALTH_STATUSES, HEALTH_TEXTS, HEALTH_ONLINE)
+from core.health_checker import HealthChecker
+from core.stream_history import StreamHistory
 from core.playlist import PlaylistManager
 from core.language_manager import LanguageManager, tr
 from core.url_history import PlaylistURLManager  # إضافة استيراد مدير سجل الروابط
@@ -21,11 +28,31 @@ class MainWindow(QMainWindow):
         super().__init__()
         
         # Initialize components
-        self.m3u_parser = M3UParser()
+        self.playlist_cache = PlaylistCache()
+        self.m3u_parser = M3UParser(cache=self.playlist_cache)
         self.playlist_manager = PlaylistManager()
         self.language_manager = LanguageManager()
         self.url_manager = PlaylistURLManager()  # إنشاء مدير سجل الروابط
         
+        # Channel logos, shared by all channel lists
+        self.logo_loader = LogoLoader(parent=self)
+        
+        # Background playlist loading
+        self.playlist_loader = None
+        self._running_loaders = []  # Kept alive until their threads exit
+        
+        # Stream health checks of the loaded playlist
+        self.health_checker = HealthChecker(parent=self)
+        self._checked_store = None
+        
+        # Channels played, for zapping back to the last one
+        self.current_channel = None
+        self.last_channel = None
+        
+        # Reliability of the streams played, for choosing between mirrors
+        self.stream_history = StreamHistory()
+        self._mirrors = []  # Mirror URLs of the current channel not tried yet
+        
         # تعيين أيقونة النافذة
         app_icon_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
                                   "resources", "icons", "app_icon.png")
@@ -58,6 +85,9 @@ class MainWindow(QMainWindow):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText(tr("Search channels..."))
         search_layout.addWidget(self.search_input)
+        self.fuzzy_check = QCheckBox(tr("Fuzzy"))
+        self.fuzzy_check.setToolTip(tr("Rank channels by similarity, tolerating typos"))
+        search_layout.addWidget(self.fuzzy_check)
         left_layout.addLayout(search_layout)
         
         # Tabs for different playlists
@@ -65,12 +95,12 @@ class MainWindow(QMainWindow):
         self.tabs.setTabPosition(QTabWidget.TabPosition.North)
         
         # Main playlists tab
-        self.all_channels_widget = PlaylistWidget()
+        self.all_channels_widget = PlaylistWidget(logo_loader=self.logo_loader)
         self.tabs.addTab(self.all_channels_widget, tr("All Channels"))
         
         # Add playlists from playlist manager
         for name, playlist in self.playlist_manager.playlists.items():
-            playlist_widget = PlaylistWidget()
+            playlist_widget = PlaylistWidget(logo_loader=self.logo_loader)
             playlist_widget.set_channels(playlist.channels)
             self.tabs.addTab(playlist_widget, name)
         
@@ -82,13 +112,61 @@ class MainWindow(QMainWindow):
         
         left_layout.addWidget(self.tabs)
         
-        # Filter UI
+        # Filter UI; every filter value shows how many channels choosing it
+        # would list, given the other filters
+        self.filter_panel = QWidget()
+        filter_panel_layout = QVBoxLayout(self.filter_panel)
+        filter_panel_layout.setContentsMargins(0, 0, 0, 0)
+        
         filter_layout = QHBoxLayout()
         filter_layout.addWidget(QLabel(tr("Category:")))
         self.category_combo = QComboBox()
         self.category_combo.addItem(tr("All"))
         filter_layout.addWidget(self.category_combo)
-        left_layout.addLayout(filter_layout)
+        filter_panel_layout.addLayout(filter_layout)
+        
+        facet_layout = QHBoxLayout()
+        facet_layout.addWidget(QLabel(tr("Country:")))
+        self.country_combo = QComboBox()
+        self.country_combo.addItem(tr("All"))
+        facet_layout.addWidget(self.country_combo)
+        facet_layout.addWidget(QLabel(tr("Language:")))
+        self.language_combo = QComboBox()
+        self.language_combo.addItem(tr("All"))
+        facet_layout.addWidget(self.language_combo)
+        facet_layout.addWidget(QLabel(tr("Quality:")))
+        self.quality_combo = QComboBox()
+        self.quality_combo.addItem(tr("All"))
+        facet_layout.addWidget(self.quality_combo)
+        self.catchup_check = QCheckBox(tr("Catch-up"))
+        facet_layout.addWidget(self.catchup_check)
+        filter_panel_layout.addLayout(facet_layout)
+        
+        health_layout = QHBoxLayout()
+        health_layout.addWidget(QLabel(tr("Status:")))
+        self.health_combo = QComboBox()
+        self.health_combo.addItem(tr("All"))
+        health_layout.addWidget(self.health_combo)
+        health_layout.addWidget(QLabel(tr("Sort:")))
+        self.sort_combo = QComboBox()
+        self.sort_combo.addItem(tr("Playlist order"))
+        self.sort_combo.addItem(tr("Name"), 'name')
+        self.sort_combo.addItem(tr("Response time"), 'latency')
+        self.sort_combo.addItem(tr("Bitrate"), 'bitrate')
+        health_layout.addWidget(self.sort_combo)
+        self.check_button = QPushButton(tr("Check Streams"))
+        self.check_button.setToolTip(tr("Check which channels are online"))
+        health_layout.addWidget(self.check_button)
+        filter_panel_layout.addLayout(health_layout)
+        
+        self.facet_combos = {
+            GROUP: self.category_combo,
+            COUNTRY: self.country_combo,
+            LANGUAGE: self.language_combo,
+            QUALITY: self.quality_combo,
+            HEALTH: self.health_combo
+        }
+        left_layout.addWidget(self.filter_panel)
         
         main_layout.addWidget(left_panel, 1)
         
@@ -103,6 +181,17 @@ class MainWindow(QMainWindow):
         self.statusBar = QStatusBar()
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage(tr("Ready"))
+        
+        # Playlist loading progress and cancel button
+        self.load_progress = QProgressBar()
+        self.load_progress.setMaximumWidth(200)
+        self.load_progress.setVisible(False)
+        self.statusBar.addPermanentWidget(self.load_progress)
+        
+        self.cancel_load_button = QPushButton(tr("Cancel"))
+        self.cancel_load_button.setVisible(False)
+        self.cancel_load_button.clicked.connect(self.cancel_playlist_load)
+        self.statusBar.addPermanentWidget(self.cancel_load_button)
     
     def _setup_menu_bar(self):
         """Setup menu bar"""
@@ -149,6 +238,54 @@ class MainWindow(QMainWindow):
         stop_action.triggered.connect(self.player_widget.stop)
         playback_menu.addAction(stop_action)
         
+        playback_menu.addSeparator()
+        
+        next_action = QAction(tr("&Next Channel"), self)
+        next_action.setShortcut("Ctrl+Down")
+        next_action.triggered.connect(lambda: self.play_neighbour(1))
+        playback_menu.addAction(next_action)
+        
+        previous_action = QAction(tr("P&revious Channel"), self)
+        previous_action.setShortcut("Ctrl+Up")
+        previous_action.triggered.connect(lambda: self.play_neighbour(-1))
+        playback_menu.addAction(previous_action)
+        
+        last_action = QAction(tr("&Last Channel"), self)
+        last_action.setShortcut("Ctrl+Backspace")
+        last_action.triggered.connect(self.play_last_channel)
+        playback_menu.addAction(last_action)
+        
+        stats_action = QAction(tr("Show &Statistics"), self)
+        stats_action.setShortcut("Ctrl+I")
+        stats_action.setCheckable(True)
+        stats_action.toggled.connect(self.player_widget.set_stats_visible)
+        playback_menu.addAction(stats_action)
+        
+        # Number of channels kept open so switching to them is instant
+        standby_menu = playback_menu.addMenu(tr("Fast Zapping"))
+        standby_action_group = QActionGroup(self)
+        standby_action_group.setExclusive(True)
+        for count in range(4):
+            text = tr("Off") if count == 0 else tr("{count} standby channels").format(count=count)
+            standby_action = QAction(text, self)
+            standby_action.setCheckable(True)
+            standby_action.setChecked(self.player_widget.standby_count() == count)
+            standby_action.triggered.connect(lambda checked, count=count: self.player_widget.set_standby_count(count))
+            standby_action_group.addAction(standby_action)
+            standby_menu.addAction(standby_action)
+        
+        # Buffering trade-off; automatic picks low latency for live streams
+        profile_menu = playback_menu.addMenu(tr("Playback Profile"))
+        profile_action_group = QActionGroup(self)
+        profile_action_group.setExclusive(True)
+        for profile, text in [(None, "Automatic")] + list(PlayerWidget.PROFILE_TEXTS.items()):
+            profile_action = QAction(tr(text), self)
+            profile_action.setCheckable(True)
+            profile_action.setChecked(self.player_widget.profile() == profile)
+            profile_action.triggered.connect(lambda checked, profile=profile: self.player_widget.set_profile(profile))
+            profile_action_group.addAction(profile_action)
+            profile_menu.addAction(profile_action)
+        
         # Settings menu
         settings_menu = menu_bar.addMenu(tr("&Settings"))
         
@@ -204,8 +341,18 @@ class MainWindow(QMainWindow):
         """Connect signals to slots"""
         self.add_tab_button.clicked.connect(self.add_new_playlist)
         self.search_input.textChanged.connect(self.search_channels)
-        self.category_combo.currentTextChanged.connect(self.filter_by_category)
+        self.fuzzy_check.toggled.connect(self.all_channels_widget.set_fuzzy)
+        for combo in self.facet_combos.values():
+            combo.currentIndexChanged.connect(self.apply_filters)
+        self.catchup_check.toggled.connect(self.apply_filters)
+        self.sort_combo.currentIndexChanged.connect(self.apply_filters)
+        self.check_button.clicked.connect(self.toggle_health_check)
+        self.health_checker.results_ready.connect(self._on_health_results)
+        self.health_checker.progress.connect(self._on_health_progress)
+        self.health_checker.finished.connect(self._on_health_finished)
         self.all_channels_widget.channel_selected.connect(self.play_channel)
+        self.player_widget.playback_failed.connect(self._on_playback_failed)
+        self.player_widget.session_ended.connect(self.stream_history.record_session)
     
     def change_language(self, language):
         """Change application language"""
@@ -227,20 +374,7 @@ class MainWindow(QMainWindow):
         
         if file_path:
             self.statusBar.showMessage(tr("Loading playlist: {file_path}...").format(file_path=file_path))
-            try:
-                success = self.m3u_parser.load_from_file(file_path)
-                
-                if success:
-                    self._update_after_playlist_load()
-                else:
-                    QMessageBox.critical(self, tr("Error"), tr("Failed to load playlist: {file_path}").format(file_path=file_path))
-            except Exception as e:
-                QMessageBox.critical(
-                    self, 
-                    tr("Error"), 
-                    tr("Error loading playlist {file_path}: {error}").format(file_path=file_path, error=str(e))
-                )
-                print(f"Detailed error loading playlist: {e}")
+            self._start_loading(file_path)
     
     def open_playlist_url(self):
         """Open M3U playlist from URL"""
@@ -252,31 +386,146 @@ class MainWindow(QMainWindow):
                 self.url_manager.add_url(url)
                 
                 self.statusBar.showMessage(tr("Loading playlist from URL..."))
-                try:
-                    success = self.m3u_parser.load_from_url(url)
-                    
-                    if success:
-                        self._update_after_playlist_load()
-                    else:
-                        QMessageBox.critical(self, tr("Error"), tr("Failed to load playlist from URL"))
-                except Exception as e:
-                    QMessageBox.critical(
-                        self, 
-                        tr("Error"), 
-                        tr("Error loading playlist from URL: {error}").format(error=str(e))
-                    )
-                    print(f"Detailed error loading URL playlist: {e}")
+                self._start_loading(url, is_url=True)
+    
+    def _start_loading(self, source, is_url=False):
+        """Load a playlist in the background, showing channels as they arrive"""
+        self._stop_loading()
+        self._stop_health_check()
+        
+        loader = PlaylistLoader(source, is_url=is_url, cache=self.playlist_cache)
+        loader.channels_loaded.connect(self._on_channels_loaded)
+        loader.progress.connect(self._on_load_progress)
+        loader.finished.connect(self._on_load_finished)
+        loader.cancelled.connect(self._on_load_cancelled)
+        loader.error_occurred.connect(self._on_load_error)
+        loader.thread().finished.connect(lambda: self._running_loaders.remove(loader))
+        self.playlist_loader = loader
+        self._running_loaders.append(loader)
+        
+        self.load_progress.setRange(0, 0)
+        self.load_progress.setVisible(True)
+        self.cancel_load_button.setVisible(True)
+        self.filter_panel.setEnabled(False)
+        
+        loader.start()
+    
+    def cancel_playlist_load(self):
+        """Cancel the playlist load in progress, keeping the channels loaded so far"""
+        if self.playlist_loader is None:
+            return
+        # The rows are adopted once the worker stops adding to them
+        self.playlist_loader.cancel()
+        self.cancel_load_button.setVisible(False)
+        self.statusBar.showMessage(tr("Cancelling..."))
+    
+    def _on_load_cancelled(self):
+        """Adopt the channels parsed before a load was cancelled"""
+        loader = self.sender()
+        if loader is not self.playlist_loader:
+            return
+        self.playlist_loader = None
+        self._end_loading()
+        
+        # Rows parsed after the last batch were not shown yet
+        self.m3u_parser = loader.parser
+        self.all_channels_widget.set_channels(self.m3u_parser.channels)
+        self._update_after_playlist_load()
+        self.statusBar.showMessage(tr("Loading cancelled after {count} channels").format(count=len(self.m3u_parser.channels)))
+    
+    def _stop_loading(self):
+        """Stop listening to the current loader and ask it to cancel"""
+        loader = self.playlist_loader
+        if loader is None:
+            return None
+        
+        # The worker may be blocked on the network until its read timeout, so
+        # do not wait for it here; it stays in _running_loaders until it exits
+        loader.cancel()
+        self.playlist_loader = None
+        self._end_loading()
+        return loader
+    
+    def closeEvent(self, event):
+        """Stop background loading before the window closes"""
+        self._stop_loading()
+        for loader in list(self._running_loaders):
+            loader.wait(1000)
+        self.logo_loader.shutdown()
+        self.health_checker.shutdown()
+        self.player_widget.end_session()
+        super().closeEvent(event)
+    
+    def _end_loading(self):
+        """Hide the loading controls"""
+        self.load_progress.setVisible(False)
+        self.cancel_load_button.setVisible(False)
+        self.filter_panel.setEnabled(True)
+    
+    def _on_channels_loaded(self, batch):
+        """Show a batch of channels from the background loader"""
+        if self.sender() is not self.playlist_loader:
+            return
+        store, rows = batch
+        self.all_channels_widget.append_rows(store, rows)
+        self.statusBar.showMessage(tr("Loading... {count} channels").format(count=len(store)))
+    
+    def _on_load_progress(self, done, total):
+        """Update the loading progress bar"""
+        if self.sender() is not self.playlist_loader:
+            return
+        if total > 0:
+            self.load_progress.setRange(0, 100)
+            self.load_progress.setValue(min(100, done * 100 // total))
+        else:
+            self.load_progress.setRange(0, 0)
+    
+    def _on_load_finished(self):
+        """Adopt the parser of a completed load"""
+        loader = self.sender()
+        if loader is not self.playlist_loader:
+            return
+        self.playlist_loader = None
+        self._end_loading()
+        self.m3u_parser = loader.parser
+        self._update_after_playlist_load()
+    
+    def _on_load_error(self, error):
+        """Report a failed playlist load"""
+        loader = self.sender()
+        if loader is not self.playlist_loader:
+            return
+        self.playlist_loader = None
+        self._end_loading()
+        self.statusBar.showMessage(tr("Ready"))
+        if loader.is_url:
+            QMessageBox.critical(
+                self, 
+                tr("Error"), 
+                tr("Error loading playlist from URL: {error}").format(error=error)
+            )
+        else:
+            QMessageBox.critical(
+                self, 
+                tr("Error"), 
+                tr("Error loading playlist {file_path}: {error}").format(file_path=loader.source, error=error)
+            )
     
     def _update_after_playlist_load(self):
         """Update UI after loading a playlist"""
-        # Update channels list
-        self.all_channels_widget.set_channels(self.m3u_parser.channels)
+        # Update channels list; rows normally arrived in batches already
+        if self.all_channels_widget.channels is not self.m3u_parser.channels:
+            self.all_channels_widget.set_channels(self.m3u_parser.channels)
         
-        # Update categories filter
-        self.category_combo.clear()
-        self.category_combo.addItem(tr("All"))
-        for group in sorted(self.m3u_parser.groups):
-            self.category_combo.addItem(group)
+        # Reset the filters to the new playlist without re-filtering the list
+        self.catchup_check.blockSignals(True)
+        self.catchup_check.setChecked(False)
+        self.catchup_check.blockSignals(False)
+        for combo in list(self.facet_combos.values()) + [self.sort_combo]:
+            combo.blockSignals(True)
+            combo.setCurrentIndex(0)
+            combo.blockSignals(False)
+        self._update_filter_counts({})
         
         self.statusBar.showMessage(tr("Loaded {count} channels").format(count=len(self.m3u_parser.channels)))
     
@@ -285,12 +534,103 @@ class MainWindow(QMainWindow):
         self.all_channels_widget.search(query)
     
     def filter_by_category(self, category):
-        """Filter channels by category/group"""
-        if category == tr("All"):
-            self.all_channels_widget.set_channels(self.m3u_parser.channels)
+        """Filter channels by category/group, keeping the other filters and the search query"""
+        index = self.category_combo.findData(category)
+        self.category_combo.setCurrentIndex(max(index, 0))
+    
+    def apply_filters(self):
+        """Show the channels matching the selected filters, keeping the search query"""
+        channels = self.m3u_parser.channels
+        selection = self._filter_selection()
+        rows = channels.filter(selection) if selection else None
+        sort = self.sort_combo.currentData()
+        if sort is not None:
+            rows = channels.sorted_rows(range(len(channels)) if rows is None else rows, sort)
+        self.all_channels_widget.set_channels(channels, rows)
+        self._update_filter_counts(selection)
+    
+    def _filter_selection(self):
+        """Get the selected filters as a {facet: set of values} selection"""
+        selection = {}
+        for facet, combo in self.facet_combos.items():
+            value = combo.currentData()
+            if value is not None:
+                selection[facet] = {value}
+        if self.catchup_check.isChecked():
+            selection[CATCHUP] = {True}
+        return selection
+    
+    def _update_filter_counts(self, selection):
+        """Refill the filters with the values of the playlist and their channel counts"""
+        counts = self.m3u_parser.channels.facet_counts(selection)
+        
+        for facet, combo in self.facet_combos.items():
+            current = combo.currentData()
+            if facet == QUALITY:
+                values = [quality for quality in QUALITIES if quality in counts[facet]]
+            elif facet == HEALTH:
+                values = [status for status in HEALTH_STATUSES if status in counts[facet]]
+            else:
+                values = sorted(counts[facet])
+            
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem(tr("All"))
+            for value in values:
+                count = counts[facet][value]
+                # Values no channel would match are hidden unless selected
+                if count or value == current:
+                    label = tr(HEALTH_TEXTS[value]) if facet == HEALTH else value
+                    combo.addItem(f"{label} ({count})", value)
+            combo.setCurrentIndex(max(combo.findData(current), 0) if current is not None else 0)
+            combo.blockSignals(False)
+        
+        self.catchup_check.setText(tr("Catch-up ({count})").format(count=counts[CATCHUP].get(True, 0)))
+    
+    def toggle_health_check(self):
+        """Start checking the streams of the playlist, or stop the check in progress"""
+        if self.health_checker.is_running():
+            self._stop_health_check()
+            self.statusBar.showMessage(tr("Ready"))
+            return
+        
+        channels = self.m3u_parser.channels
+        if not len(channels):
+            return
+        self._checked_store = channels
+        self.check_button.setText(tr("Stop Checking"))
+        self.statusBar.showMessage(tr("Checking {count} channels...").format(count=len(channels)))
+        self.health_checker.check(channels)
+    
+    def _stop_health_check(self):
+        """Cancel the stream check in progress"""
+        self.health_checker.cancel()
+        self.check_button.setText(tr("Check Streams"))
+    
+    def _on_health_results(self, results):
+        """Store a batch of stream check results in the playlist"""
+        if self._checked_store is not self.m3u_parser.channels:
+            return
+        self._checked_store.set_health(results)
+        self.all_channels_widget.model.health_changed()
+    
+    def _on_health_progress(self, done, total):
+        """Show how far the stream check got"""
+        self.statusBar.showMessage(tr("Checked {done} of {total} channels").format(done=done, total=total))
+    
+    def _on_health_finished(self):
+        """Show the stream check outcome, re-filtering the list by it if needed"""
+        self.check_button.setText(tr("Check Streams"))
+        channels = self.m3u_parser.channels
+        if self._checked_store is not channels:
+            return
+        counts = channels.facet_counts()[HEALTH]
+        self.statusBar.showMessage(tr("{online} of {total} channels online").format(
+            online=counts.get(HEALTH_ONLINE, 0), total=len(channels)))
+        if self.health_combo.currentData() is not None or self.sort_combo.currentData() is not None:
+            self.apply_filters()
         else:
-            filtered = self.m3u_parser.get_channels_by_group(category)
-            self.all_channels_widget.set_channels(filtered)
+            self._update_filter_counts(self._filter_selection())
     
     def add_new_playlist(self):
         """Add new custom playlist"""
@@ -301,15 +641,67 @@ class MainWindow(QMainWindow):
                 playlist = self.playlist_manager.create_playlist(name)
                 
                 # Add new tab for playlist
-                playlist_widget = PlaylistWidget()
+                playlist_widget = PlaylistWidget(logo_loader=self.logo_loader)
                 new_tab_index = self.tabs.addTab(playlist_widget, name)
                 self.tabs.setCurrentIndex(new_tab_index)
     
     def play_channel(self, channel):
-        """Play selected channel"""
+        """Play selected channel, from its most reliable mirror"""
         if channel:
             self.statusBar.showMessage(tr("Playing: {channel_name}").format(channel_name=channel.name))
-            self.player_widget.play(channel.url, channel.name)
+            urls = self._mirror_urls(channel)
+            if self.player_widget.play(urls[0], channel.name):
+                if self.current_channel is not None and self.current_channel.url != channel.url:
+                    self.last_channel = self.current_channel
+                self.current_channel = channel
+                self._mirrors = urls[1:]
+                self._prepare_zapping(channel)
+    
+    def _mirror_urls(self, channel):
+        """Get the URLs of a channel and its duplicates in the playlist, best first
+        
+        Duplicates share the tvg-id or the normalized name of the channel,
+        in the list the channel was selected from. They are ranked by their
+        playback history and last stream check.
+        """
+        channels = channel.store
+        if channels is None:
+            return [channel.url]
+        rows = channels.mirrors(channel)
+        health = {channels.urls[row]: channels.health_of(row)[0] for row in rows}
+        return self.stream_history.rank([channel.url] + [channels.urls[row] for row in rows], health)
+    
+    def _on_playback_failed(self):
+        """Switch to the next mirror when the stream of the current channel fails"""
+        if self.current_channel is None or not self._mirrors:
+            return
+        url = self._mirrors.pop(0)
+        self.statusBar.showMessage(tr("Stream failed, trying another source: {channel_name}").format(
+            channel_name=self.current_channel.name))
+        self.player_widget.play(url, self.current_channel.name)
+    
+    def play_neighbour(self, step):
+        """Play the channel step rows away in the current list"""
+        widget = self.tabs.currentWidget()
+        if isinstance(widget, PlaylistWidget):
+            widget.play_neighbour(step)
+    
+    def play_last_channel(self):
+        """Switch back to the channel watched before the current one"""
+        if self.last_channel is not None:
+            self.play_channel(self.last_channel)
+    
+    def _prepare_zapping(self, channel):
+        """Pre-open the channels likely to be played after channel"""
+        widget = self.sender()
+        if not isinstance(widget, PlaylistWidget):
+            widget = self.tabs.currentWidget()
+        previous, following = widget.neighbours(channel) if isinstance(widget, PlaylistWidget) else (None, None)
+        
+        # Zapping forward is the most common, then back to the last channel
+        candidates = [following, self.last_channel, previous]
+        self.player_widget.prepare([self._mirror_urls(candidate)[0] for candidate in candidates
+                                    if candidate is not None])
     
     def show_about_app(self):
         """Show information about the app"""
@@ -396,7 +788,7 @@ class MainWindow(QMainWindow):
         
         # Re-add all playlists
         for name, playlist in self.playlist_manager.playlists.items():
-            playlist_widget = PlaylistWidget()
+            playlist_widget = PlaylistWidget(logo_loader=self.logo_loader)
             playlist_widget.set_channels(playlist.channels)
             playlist_widget.channel_selected.connect(self.play_channel)
             self.tabs.addTab(playlist_widget, name)
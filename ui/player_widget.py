@@ -1,10 +1,13 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                           QSlider, QLabel, QFrame, QMessageBox)
-from PyQt6.QtCore import Qt, pyqtSlot
+                           QSlider, QLabel, QFrame, QMessageBox, QStackedWidget)
+from PyQt6.QtCore import Qt, QPoint, pyqtSignal, pyqtSlot
 from PyQt6.QtGui import QIcon
 import os
 import sys
 from core.language_manager import tr
+from core.player import (STATE_OPENING, STATE_BUFFERING, STATE_PLAYING, STATE_PAUSED,
+                         STATE_STOPPED, STATE_ENDED, STATE_ERROR)
+from core.playback_profiles import LOW_LATENCY, SMOOTH
 
 # Function to get Python architecture
 def get_python_arch():
@@ -13,6 +16,33 @@ def get_python_arch():
 class PlayerWidget(QWidget):
     """Video player widget"""
     
+    # Status shown for each media state
+    STATE_TEXTS = {
+        STATE_OPENING: "Opening...",
+        STATE_PLAYING: "Playing",
+        STATE_PAUSED: "Paused",
+        STATE_STOPPED: "Stopped",
+        STATE_ENDED: "Ended",
+        STATE_ERROR: "Error"
+    }
+    
+    # Names of the playback profiles
+    PROFILE_TEXTS = {
+        LOW_LATENCY: "Low latency",
+        SMOOTH: "Smooth"
+    }
+    
+    # Signals
+    playback_failed = pyqtSignal()  # The stream being played failed to open or broke off
+    session_ended = pyqtSignal(object)  # Telemetry PlaybackSession of the channel left
+    
+    # Number of channels kept open for zapping, stored in this file
+    STANDBY_FILE = "standby_players.txt"
+    DEFAULT_STANDBY_COUNT = 2
+    
+    # Forced playback profile, stored in this file (automatic when missing)
+    PROFILE_FILE = "playback_profile.txt"
+    
     def __init__(self):
         super().__init__()
         
@@ -63,13 +93,23 @@ class PlayerWidget(QWidget):
         self.channel_label.setStyleSheet("font-weight: bold; font-size: 14px;")
         info_layout.addWidget(self.channel_label)
         info_layout.addStretch()
+        self.status_label = QLabel()
+        info_layout.addWidget(self.status_label)
         layout.addLayout(info_layout)
         
-        # Video display area
-        self.video_frame = QFrame()
-        self.video_frame.setFrameShape(QFrame.Shape.Box)
-        self.video_frame.setStyleSheet("background-color: #1e1e1e;")
-        layout.addWidget(self.video_frame, 1)
+        # Video display area; standby players render into hidden frames
+        # stacked behind the visible one
+        self.video_stack = QStackedWidget()
+        self.video_frame = self._new_video_frame()
+        layout.addWidget(self.video_stack, 1)
+        
+        # Playback statistics overlay. A native window, so it stays above the
+        # native window libVLC renders into.
+        self.stats_overlay = QLabel(self)
+        self.stats_overlay.setAttribute(Qt.WidgetAttribute.WA_NativeWindow)
+        self.stats_overlay.setStyleSheet(
+            "background-color: #1e1e1e; color: #e0e0e0; font-family: monospace; padding: 6px;")
+        self.stats_overlay.hide()
         
         # Controls area
         controls_layout = QHBoxLayout()
@@ -80,11 +120,7 @@ class PlayerWidget(QWidget):
         
         # Play/pause button
         self.play_button = QPushButton()
-        play_icon_path = os.path.join(icons_dir, "play.png")
-        if os.path.exists(play_icon_path):
-            self.play_button.setIcon(QIcon(play_icon_path))
-        else:
-            self.play_button.setText("▶")
+        self._set_play_icon(False)
         self.play_button.setToolTip(tr("Play/Pause"))
         self.play_button.setFixedSize(36, 36)
         controls_layout.addWidget(self.play_button)
@@ -151,11 +187,24 @@ class PlayerWidget(QWidget):
         
         self.player.time_changed.connect(self.update_time)
         self.player.position_changed.connect(self.update_position)
+        self.player.length_changed.connect(self.update_length)
+        self.player.media_state_changed.connect(self.on_state_changed)
+        self.player.buffering_changed.connect(self.on_buffering)
+        self.player.seekable_changed.connect(self.on_seekable_changed)
         self.player.error_occurred.connect(self.on_error)
+        self.player.surface_changed.connect(self.video_stack.setCurrentWidget)
+        self.player.first_frame_shown.connect(self.on_first_frame)
+        self.player.telemetry_sampled.connect(self.on_telemetry)
+        self.player.session_ended.connect(self.session_ended)
+        self.player.reconnecting.connect(self.on_reconnecting)
+        self.player.stream_recovered.connect(self.on_recovered)
         
         # Set video frame for player now that player is initialized
         if hasattr(self, 'player'):
             self.player.set_widget(self.video_frame)
+            self.player.set_surface_factory(self._new_video_frame)
+            self.player.set_standby_count(self._load_standby_count())
+            self.player.set_profile(self._load_profile())
     
     def play(self, url, name):
         """Play a channel"""
@@ -166,40 +215,111 @@ class PlayerWidget(QWidget):
         self.current_channel_name = name
         self.channel_label.setText(name)
         self.channel_label.setStyleSheet("font-weight: bold; font-size: 14px;")
+        self.status_label.setToolTip("")
         
-        success = self.player.play(url)  # Make sure player.py's play() method accepts the URL parameter
-        if success:
-            icons_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "icons")
-            pause_icon_path = os.path.join(icons_dir, "pause.png")
-            if os.path.exists(pause_icon_path):
-                self.play_button.setIcon(QIcon(pause_icon_path))
-            else:
-                self.play_button.setText("⏸️")
+        # The duration and seekability of the new media arrive as player events
+        self.progress_slider.setValue(0)
+        self.time_label.setText("00:00:00")
+        self.duration_label.setText("00:00:00")
         
-        return success
+        return self.player.play(url)  # Make sure player.py's play() method accepts the URL parameter
+    
+    def prepare(self, urls):
+        """Pre-open the channels most likely to be played next, most likely first"""
+        if not hasattr(self, 'player') or not self.vlc_available:
+            return
+        self.player.prepare(urls)
+    
+    def standby_count(self):
+        """Get how many channels are kept open for zapping"""
+        if not hasattr(self, 'player'):
+            return 0
+        return self.player.standby_count
+    
+    def set_standby_count(self, count):
+        """Set and save how many channels are kept open for zapping"""
+        if not hasattr(self, 'player'):
+            return
+        self.player.set_standby_count(count)
+        try:
+            with open(self.STANDBY_FILE, "w") as f:
+                f.write(str(count))
+        except OSError as e:
+            print(f"Error saving standby player count: {e}")
+    
+    def _load_standby_count(self):
+        """Load the saved number of standby players"""
+        try:
+            with open(self.STANDBY_FILE, "r") as f:
+                return max(int(f.read().strip()), 0)
+        except (OSError, ValueError):
+            return self.DEFAULT_STANDBY_COUNT
+    
+    def profile(self):
+        """Get the forced playback profile, or None when chosen from each URL"""
+        if not hasattr(self, 'player'):
+            return None
+        return self.player.profile
+    
+    def set_profile(self, profile):
+        """Set and save the forced playback profile (None chooses it from each URL)"""
+        if not hasattr(self, 'player'):
+            return
+        self.player.set_profile(profile)
+        try:
+            with open(self.PROFILE_FILE, "w") as f:
+                f.write(profile or "")
+        except OSError as e:
+            print(f"Error saving playback profile: {e}")
+    
+    def _load_profile(self):
+        """Load the saved playback profile"""
+        try:
+            with open(self.PROFILE_FILE, "r") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+    
+    def end_session(self):
+        """Write the telemetry of the channel being watched, e.g. before quitting"""
+        if hasattr(self, 'player'):
+            self.player.end_session()
+    
+    def set_stats_visible(self, visible):
+        """Show or hide the playback statistics overlay"""
+        self.stats_overlay.setVisible(visible)
+        if visible:
+            self.stats_overlay.setText(tr("Waiting for statistics..."))
+            self._place_stats_overlay()
+    
+    def resizeEvent(self, event):
+        """Keep the statistics overlay in the corner of the video"""
+        super().resizeEvent(event)
+        self._place_stats_overlay()
+    
+    def _place_stats_overlay(self):
+        """Move the statistics overlay to the top left corner of the video"""
+        if self.stats_overlay.isVisible():
+            self.stats_overlay.adjustSize()
+            self.stats_overlay.move(self.video_stack.geometry().topLeft() + QPoint(8, 8))
+            self.stats_overlay.raise_()
+    
+    def _new_video_frame(self):
+        """Add a video frame to the stack; only the current one is shown"""
+        frame = QFrame()
+        frame.setFrameShape(QFrame.Shape.Box)
+        frame.setStyleSheet("background-color: #1e1e1e;")
+        self.video_stack.addWidget(frame)
+        return frame
     
     def toggle_play(self):
         """Toggle play/pause"""
         if not hasattr(self, 'player') or not self.vlc_available:
             self.on_error(tr("VLC is not available. Please install VLC media player."))
             return
-            
-        icons_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "icons")
-        play_icon_path = os.path.join(icons_dir, "play.png")
-        pause_icon_path = os.path.join(icons_dir, "pause.png")
         
-        if self.player.is_playing():
-            self.player.pause()
-            if os.path.exists(play_icon_path):
-                self.play_button.setIcon(QIcon(play_icon_path))
-            else:
-                self.play_button.setText("▶")
-        else:
-            self.player.pause()  # In VLC, pause toggles play/pause
-            if os.path.exists(pause_icon_path):
-                self.play_button.setIcon(QIcon(pause_icon_path))
-            else:
-                self.play_button.setText("⏸️")
+        # In VLC, pause toggles play/pause; the button follows the state change
+        self.player.pause()
     
     def stop(self):
         """Stop playback"""
@@ -207,15 +327,26 @@ class PlayerWidget(QWidget):
             return
             
         self.player.stop()
-        icons_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "icons")
-        play_icon_path = os.path.join(icons_dir, "play.png")
-        if os.path.exists(play_icon_path):
-            self.play_button.setIcon(QIcon(play_icon_path))
-        else:
-            self.play_button.setText("▶")
         self.progress_slider.setValue(0)
         self.time_label.setText("00:00:00")
     
+    def _set_play_icon(self, playing):
+        """Show the pause icon while playing, the play icon otherwise"""
+        icons_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "icons")
+        icon_path = os.path.join(icons_dir, "pause.png" if playing else "play.png")
+        if os.path.exists(icon_path):
+            self.play_button.setIcon(QIcon(icon_path))
+        else:
+            self.play_button.setText("⏸️" if playing else "▶")
+    
+    @staticmethod
+    def _format_time(time_ms):
+        """Format a time in ms as HH:MM:SS"""
+        hours = time_ms // (3600 * 1000)
+        minutes = (time_ms % (3600 * 1000)) // (60 * 1000)
+        seconds = (time_ms % (60 * 1000)) // 1000
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    
     def set_volume(self, volume):
         """Set player volume"""
         if not hasattr(self, 'player') or not self.vlc_available:
@@ -231,20 +362,12 @@ class PlayerWidget(QWidget):
     @pyqtSlot(int)
     def update_time(self, time_ms):
         """Update current time display"""
-        hours = time_ms // (3600 * 1000)
-        minutes = (time_ms % (3600 * 1000)) // (60 * 1000)
-        seconds = (time_ms % (60 * 1000)) // 1000
-        
-        self.time_label.setText(f"{hours:02d}:{minutes:02d}:{seconds:02d}")
-        
-        # Update duration if not set
-        if self.duration_label.text() == "00:00:00":
-            length = self.player.get_length()
-            if length > 0:
-                hours = length // (3600 * 1000)
-                minutes = (length % (3600 * 1000)) // (60 * 1000)
-                seconds = (length % (60 * 1000)) // 1000
-                self.duration_label.setText(f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+        self.time_label.setText(self._format_time(time_ms))
+    
+    @pyqtSlot(int)
+    def update_length(self, length_ms):
+        """Update duration display"""
+        self.duration_label.setText(self._format_time(max(length_ms, 0)))
     
     @pyqtSlot(float)
     def update_position(self, position):
@@ -253,6 +376,72 @@ class PlayerWidget(QWidget):
         if not self.progress_slider.isSliderDown():
             self.progress_slider.setValue(int(position * 1000))
     
+    @pyqtSlot(int)
+    def on_state_changed(self, state):
+        """Update the play button and status as soon as the media state changes"""
+        self._set_play_icon(state in (STATE_OPENING, STATE_BUFFERING, STATE_PLAYING))
+        text = self.STATE_TEXTS.get(state)
+        if text is not None:
+            self.status_label.setText(tr(text))
+        if state in (STATE_STOPPED, STATE_ENDED, STATE_ERROR):
+            self.progress_slider.setValue(0)
+        if state == STATE_ERROR:
+            self.playback_failed.emit()
+    
+    @pyqtSlot(float)
+    def on_buffering(self, percent):
+        """Show buffering progress until the stream plays smoothly"""
+        if percent < 100:
+            self.status_label.setText(tr("Buffering {percent}%").format(percent=int(percent)))
+        elif self.player.is_playing():
+            self.status_label.setText(tr("Playing"))
+    
+    @pyqtSlot(str, int)
+    def on_first_frame(self, profile, elapsed):
+        """Show how long the stream took to start"""
+        self.status_label.setToolTip(tr("First frame after {seconds:.2f} s ({profile})").format(
+            seconds=elapsed / 1000, profile=tr(self.PROFILE_TEXTS.get(profile, profile))))
+    
+    @pyqtSlot(object)
+    def on_telemetry(self, sample):
+        """Show the latest statistics sample in the overlay"""
+        if not self.stats_overlay.isVisible():
+            return
+        session = self.player.session
+        lines = [
+            tr("Input: {kbps:.0f} kb/s  Demux: {demux:.0f} kb/s").format(
+                kbps=sample['input_kbps'], demux=sample['demux_kbps']),
+            tr("Frames: {decoded} decoded, {lost} lost").format(
+                decoded=sample['decoded_video'], lost=sample['lost_pictures']),
+            tr("Audio buffers lost: {lost}").format(lost=sample['lost_abuffers'])
+        ]
+        if session is not None:
+            milestones = "  ".join(f"{name} {ms} ms" for name, ms in session.milestones.items())
+            lines.append(tr("Start: {milestones}").format(milestones=milestones or "-"))
+            lines.append(tr("Rebuffering: {count}").format(count=session.rebuffers))
+        counters = self.player.watchdog.counters()
+        lines.append(tr("Stalls: {stalls}  Recovered: {recoveries}  Reconnects: {reconnects}").format(**counters))
+        self.stats_overlay.setText("\n".join(lines))
+        self._place_stats_overlay()
+    
+    @pyqtSlot(int, int)
+    def on_reconnecting(self, attempt, delay):
+        """Show that the stalled stream is about to be reopened"""
+        self.status_label.setText(tr("Reconnecting in {seconds} s (attempt {attempt})").format(
+            seconds=round(delay / 1000), attempt=attempt))
+    
+    @pyqtSlot(int)
+    def on_recovered(self, downtime):
+        """Clear the error left by a stall once the stream plays again"""
+        self.channel_label.setText(self.current_channel_name)
+        self.channel_label.setStyleSheet("font-weight: bold; font-size: 14px;")
+        self.status_label.setToolTip(tr("Recovered after {seconds:.1f} s").format(seconds=downtime / 1000))
+    
+    @pyqtSlot(bool)
+    def on_seekable_changed(self, seekable):
+        """Only allow seeking media that supports it (not live streams)"""
+        self.progress_slider.setEnabled(seekable)
+    
     @pyqtSlot(str)
     def on_error(self, message):
         """Handle player errors"""
@@ -1,8 +1,11 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QListWidget, QListWidgetItem, QMenu
-from PyQt6.QtCore import pyqtSignal, Qt
-from PyQt6.QtGui import QIcon, QAction
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTableView, QHeaderView, QAbstractItemView, QMenu
+from PyQt6.QtCore import pyqtSignal, Qt, QTimer, QPoint, QSize
+from PyQt6.QtGui import QAction
 
 from core.language_manager import tr
+from core.channel_store import ChannelStore
+from core.search_engine import SearchEngine
+from ui.channel_model import ChannelListModel
 
 class PlaylistWidget(QWidget):
     """Widget for displaying and managing channel playlist"""
@@ -10,11 +13,30 @@ class PlaylistWidget(QWidget):
     # Signals
     channel_selected = pyqtSignal(object)  # Emitted when a channel is selected for playback
     
-    def __init__(self):
+    # Delay before requesting logos after scrolling, so fast scrolling does
+    # not queue logos for rows that are only on screen for a moment
+    LOGO_REQUEST_DELAY = 50  # ms
+    
+    def __init__(self, logo_loader=None):
         super().__init__()
         
-        self.channels = []
-        self.current_displayed = []
+        self.channels = ChannelStore()
+        self.channel_rows = []  # Row numbers into self.channels shown by this widget
+        self.query = ""
+        self.fuzzy = False  # Rank names by similarity instead of matching substrings
+        
+        # Debounced searches, run off the GUI thread
+        self.search_engine = SearchEngine(self)
+        self.search_engine.results_ready.connect(self._on_search_results)
+        self.search_engine.rows_found.connect(self._on_rows_found)
+        
+        # Logos of the rows on screen, loaded by the shared LogoLoader
+        self.logo_loader = logo_loader
+        self._visible_logos = set()
+        self._logo_timer = QTimer(self)
+        self._logo_timer.setSingleShot(True)
+        self._logo_timer.setInterval(self.LOGO_REQUEST_DELAY)
+        self._logo_timer.timeout.connect(self._request_visible_logos)
         
         # Setup UI
         self._setup_ui()
@@ -27,68 +49,208 @@ class PlaylistWidget(QWidget):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         
-        # Channel list widget
-        self.list_widget = QListWidget()
-        self.list_widget.setAlternatingRowColors(True)
-        self.list_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        layout.addWidget(self.list_widget)
+        # Channel list view; the model only materializes the visible rows.
+        # A single column QTableView with fixed row heights is used instead of
+        # a QListView, which visits every row of the model when laying out
+        # (about a second per reset with 500k channels).
+        icon_size = self.logo_loader.ICON_SIZE if self.logo_loader else 24
+        self.model = ChannelListModel(self.logo_loader, icon_size, self)
+        self.list_view = QTableView()
+        self.list_view.setModel(self.model)
+        self.list_view.setIconSize(QSize(icon_size, icon_size))
+        self.list_view.horizontalHeader().hide()
+        self.list_view.horizontalHeader().setStretchLastSection(True)
+        self.list_view.verticalHeader().hide()
+        self.list_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.list_view.verticalHeader().setDefaultSectionSize(
+            max(self.fontMetrics().height(), icon_size) + 6)
+        self.list_view.setShowGrid(False)
+        self.list_view.setWordWrap(False)
+        self.list_view.setTabKeyNavigation(False)
+        self.list_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.list_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.list_view.setAlternatingRowColors(True)
+        self.list_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.list_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        layout.addWidget(self.list_view)
     
     def _connect_signals(self):
         """Connect signals to slots"""
-        self.list_widget.itemDoubleClicked.connect(self._on_item_double_clicked)
-        self.list_widget.customContextMenuRequested.connect(self._show_context_menu)
+        self.list_view.doubleClicked.connect(self._on_item_double_clicked)
+        self.list_view.customContextMenuRequested.connect(self._show_context_menu)
+        
+        if self.logo_loader:
+            self.logo_loader.logo_loaded.connect(self._on_logo_loaded)
+            self.list_view.verticalScrollBar().valueChanged.connect(self._schedule_logo_request)
+            self.model.modelReset.connect(self._schedule_logo_request)
+            self.model.rowsInserted.connect(self._schedule_logo_request)
+    
+    def showEvent(self, event):
+        """Request logos for the rows that became visible"""
+        super().showEvent(event)
+        self._schedule_logo_request()
     
-    def set_channels(self, channels):
-        """Set or update channel list"""
+    def resizeEvent(self, event):
+        """Request logos for rows uncovered by the resize"""
+        super().resizeEvent(event)
+        self._schedule_logo_request()
+    
+    @property
+    def current_displayed(self):
+        """Subset of channel_rows matching the search, in display order"""
+        return self.model.rows
+    
+    def set_channels(self, channels, rows=None):
+        """Set or update channel list
+        
+        channels may be a ChannelStore or any iterable of Channel objects.
+        rows optionally restricts the display to a subset of store rows, e.g.
+        a category; the active search query then runs within those rows.
+        """
+        if not isinstance(channels, ChannelStore):
+            channels = ChannelStore.from_channels(channels)
         self.channels = channels
-        self.current_displayed = channels
+        self.channel_rows = list(range(len(channels))) if rows is None else list(rows)
+        self.search_engine.reset()
         self._update_list()
     
+    def append_rows(self, channels, rows):
+        """Append newly loaded rows of a ChannelStore while it is being filled
+        
+        A store other than the current one replaces the displayed list. While
+        a query is active the rows are searched on the search engine's thread
+        and shown once they match.
+        """
+        if channels is not self.channels:
+            self.channels = channels
+            self.channel_rows = []
+            self.model.set_rows(channels, [])
+        
+        self.channel_rows.extend(rows)
+        if not self.query:
+            # Earlier results lack the new rows, so they can no longer be narrowed from
+            self.search_engine.reset()
+            self.model.append_rows(rows)
+        elif self.fuzzy or self.search_engine.is_busy():
+            # Fuzzy results are ranked, so new rows may belong anywhere in them,
+            # and a search still running has to be repeated to include them
+            self.search_engine.reset()
+            self._submit_search(delay=0)
+        else:
+            self.search_engine.search_appended(self.channels, self.query, rows)
+    
     def search(self, query):
-        """Filter channels by search query"""
+        """Filter channels by search query
+        
+        The search runs once typing pauses; clearing the query shows all
+        channels right away.
+        """
+        self.query = query
         if not query:
-            self.current_displayed = self.channels
+            self.search_engine.cancel()
+            self._update_list()
         else:
-            query = query.lower()
-            self.current_displayed = [ch for ch in self.channels if query in ch.name.lower()]
-        
-        self._update_list()
+            self._submit_search()
+    
+    def set_fuzzy(self, fuzzy):
+        """Switch between substring search and fuzzy ranked search"""
+        self.fuzzy = fuzzy
+        if self.query:
+            self._submit_search(delay=0)
+    
+    def _submit_search(self, delay=None):
+        """Hand the current query to the search engine"""
+        # Showing every row needs no restriction; otherwise pass the same
+        # list each time so the engine can narrow from earlier results
+        rows = None if len(self.channel_rows) == len(self.channels) else self.channel_rows
+        self.search_engine.submit(self.channels, self.query, rows, delay, self.fuzzy)
+    
+    def _on_search_results(self, query, rows):
+        """Show the results of the latest search"""
+        if query == self.query:
+            self.model.set_rows(self.channels, rows)
+    
+    def _on_rows_found(self, query, rows):
+        """Show the matches among rows appended while the search was shown"""
+        if query == self.query:
+            self.model.append_rows(rows)
     
     def _update_list(self):
-        """Update the list widget with current channels"""
-        self.list_widget.clear()
+        """Reset the model to the rows matching the current query"""
+        if not self.query:
+            self.model.set_rows(self.channels, self.channel_rows)
+        else:
+            self._submit_search(delay=0)
+    
+    def _schedule_logo_request(self):
+        """Request the visible logos once scrolling or resizing settles"""
+        if self.logo_loader:
+            self._logo_timer.start()
+    
+    def _visible_rows(self):
+        """Get the range of model rows currently on screen"""
+        count = self.model.rowCount()
+        first = self.list_view.indexAt(QPoint(0, 0))
+        if not first.isValid():
+            return range(0)
+        last = self.list_view.indexAt(QPoint(0, self.list_view.viewport().height() - 1))
+        return range(first.row(), last.row() + 1 if last.isValid() else count)
+    
+    def _request_visible_logos(self):
+        """Ask the logo loader for the logos of the rows on screen"""
+        if not self.isVisible():
+            return
         
-        for channel in self.current_displayed:
-            item = QListWidgetItem(channel.name)
-            
-            # Set tooltip with more details
-            tooltip = f"Group: {channel.group or 'Unknown'}"
-            if channel.quality:
-                tooltip += f"\nQuality: {channel.quality}"
-            item.setToolTip(tooltip)
-            
-            # Store the channel object in the item
-            item.setData(Qt.ItemDataRole.UserRole, channel)
-            
-            # Add icon if available
-            if channel.logo:
-                item.setIcon(QIcon(channel.logo))
-            
-            self.list_widget.addItem(item)
+        rows = self.model.rows
+        logos = self.channels.logos
+        visible = self._visible_rows()
+        if not visible and rows:
+            # The view has not laid out its first rows yet
+            self._logo_timer.start()
+            return
+        self._visible_logos = {logos[rows[i]] for i in visible}
+        self.logo_loader.request(self._visible_logos)
     
-    def _on_item_double_clicked(self, item):
+    def _on_logo_loaded(self, logo):
+        """Show a logo delivered by the logo loader"""
+        if logo in self._visible_logos:
+            self.model.logos_changed()
+    
+    def neighbours(self, channel):
+        """Get (previous, next) channels shown around channel when it is the current one
+        
+        Either is None when missing.
+        """
+        index = self.list_view.currentIndex()
+        current = self.model.channel(index)
+        if current is None or current.url != channel.url:
+            return None, None
+        return (self.model.channel(self.model.index(index.row() - 1)),
+                self.model.channel(self.model.index(index.row() + 1)))
+    
+    def play_neighbour(self, step):
+        """Select and play the channel step rows away from the current one"""
+        count = self.model.rowCount()
+        if not count:
+            return
+        current = self.list_view.currentIndex()
+        row = current.row() + step if current.isValid() else 0
+        index = self.model.index(min(max(row, 0), count - 1))
+        self.list_view.setCurrentIndex(index)
+        self.list_view.scrollTo(index)
+        channel = self.model.channel(index)
+        if channel:
+            self.channel_selected.emit(channel)
+    
+    def _on_item_double_clicked(self, index):
         """Handle double click on channel item"""
-        channel = item.data(Qt.ItemDataRole.UserRole)
+        channel = self.model.channel(index)
         if channel:
             self.channel_selected.emit(channel)
     
     def _show_context_menu(self, position):
         """Show context menu for channel item"""
-        item = self.list_widget.itemAt(position)
-        if not item:
-            return
-        
-        channel = item.data(Qt.ItemDataRole.UserRole)
+        channel = self.model.channel(self.list_view.indexAt(position))
         if not channel:
             return
         
@@ -126,7 +288,7 @@ class PlaylistWidget(QWidget):
             menu.addMenu(add_to_playlist_menu)
         
         # Display the menu
-        menu.exec(self.list_widget.mapToGlobal(position))
+        menu.exec(self.list_view.viewport().mapToGlobal(position))
 
     def _add_to_playlist(self, channel, playlist_name):
         """Add a channel to an existing playlist"""